@@ -0,0 +1,126 @@
+"""``Idempotency-Key`` support for create endpoints.
+
+Clients that retry a ``POST`` after a timeout send the same
+``Idempotency-Key`` header. The first request runs normally; its response
+(status, body, content type, ``Location``) is stored in the default cache
+(Valkey) together with a fingerprint of the request. A retry with the same
+key and payload replays the stored response without touching the view, so
+no database writes happen twice. Reusing a key for a different payload is
+rejected with 422.
+
+While the first request is still running, a short-lived lock makes
+duplicates wait (polling the cache) for its result instead of repeating the
+work; if it is not ready in time they get 409 with ``Retry-After``.
+Only responses returned by the view are stored, and not server errors, 409
+or 429. Raised errors (e.g. validation failures) just release the lock: a
+retry validates again, and failed validation writes nothing. Keys are scoped
+per endpoint and per user.
+"""
+import hashlib
+import json
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+DEFAULT_TTL = getattr(settings, 'IDEMPOTENCY_TTL', 24 * 60 * 60)
+LOCK_TIMEOUT = 30  # seconds a crashed first request can hold a key
+WAIT_TIMEOUT = 10  # seconds a duplicate waits for the first result
+POLL_INTERVAL = 0.05
+UNSTORED_STATUSES = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+
+
+def fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(f'{request.method}\n{request.path}\n{body}'.encode()).hexdigest()
+
+
+def _cache_key(scope, request, key):
+    user = request.user.pk if request.user and request.user.is_authenticated else 'anon'
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'idempotency:{scope}:{user}:{digest}'
+
+
+def _replay(record):
+    response = HttpResponse(record['content'], status=record['status'], content_type=record['content_type'])
+    if record.get('location'):
+        response['Location'] = record['location']
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def _error(detail, code):
+    return Response({'detail': detail}, status=code)
+
+
+def idempotent(scope, ttl=DEFAULT_TTL):
+    """Honour ``Idempotency-Key`` on a DRF view method (typically ``create``)."""
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if key is None:
+                return view_method(self, request, *args, **kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+                return _error(f'{HEADER} must be 1-{MAX_KEY_LENGTH} printable characters.',
+                              status.HTTP_400_BAD_REQUEST)
+            cache_key = _cache_key(scope, request, key)
+            lock_key = f'{cache_key}:lock'
+            request_fingerprint = fingerprint(request)
+            token = uuid.uuid4().hex
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while True:
+                record = cache.get(cache_key)
+                if record is None and cache.add(lock_key, token, LOCK_TIMEOUT):
+                    # The first request may have finished between the two calls
+                    record = cache.get(cache_key)
+                    if record is None:
+                        break
+                    cache.delete(lock_key)
+                if record is not None:
+                    if record['fingerprint'] != request_fingerprint:
+                        return _error(f'{HEADER} was already used for a different request.',
+                                      status.HTTP_422_UNPROCESSABLE_ENTITY)
+                    return _replay(record)
+                if time.monotonic() >= deadline:
+                    response = _error(f'A request with this {HEADER} is still in progress.',
+                                      status.HTTP_409_CONFLICT)
+                    response['Retry-After'] = '1'
+                    return response
+                time.sleep(POLL_INTERVAL)
+
+            def release():
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            except BaseException:
+                release()
+                raise
+            if response.status_code >= 500 or response.status_code in UNSTORED_STATUSES:
+                release()
+                return response
+
+            def store(rendered):
+                cache.set(cache_key, {
+                    'fingerprint': request_fingerprint,
+                    'status': rendered.status_code,
+                    'content': rendered.content,
+                    'content_type': rendered['Content-Type'],
+                    'location': rendered.get('Location'),
+                }, ttl)
+                release()
+            response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
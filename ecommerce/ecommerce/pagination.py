@@ -1,8 +1,244 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from datetime import date, datetime, time
+
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     """Pagination allowing clients to specify ?page_size= while enforcing a max."""
     page_size = 20
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+
+def estimate_count(queryset):
+    """Return the planner's row estimate for ``queryset`` without executing it.
+
+    Uses ``EXPLAIN`` so the figure comes from table statistics (reltuples and
+    column histograms) rather than a ``COUNT(*)``. Returns ``None`` on
+    databases other than PostgreSQL.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    if isinstance(plan, list):  # psycopg returns the raw JSON array
+        plan = plan[0]
+    return int(plan['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination that never runs ``COUNT(*)`` or ``OFFSET``.
+
+    The queryset's existing ordering (usually set by ``OrderingFilter``) is
+    extended with the primary key as a tiebreaker, and each page is fetched
+    with a ``WHERE (sort columns) > (boundary row)`` predicate, so deep pages
+    cost the same as the first one. Cursors are signed, opaque tokens carrying
+    the boundary row's sort values.
+
+    Clients opt into a planner-based row estimate with ``?estimate=true``.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    estimate_query_param = 'estimate'
+    cursor_salt = 'ecommerce.pagination.keyset'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.estimated_count = None
+        if request.query_params.get(self.estimate_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.estimated_count = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+        ordering = [(name, desc != reverse) for name, desc in self.ordering]
+        queryset = queryset.order_by(*[('-' if desc else '') + name for name, desc in ordering])
+        if cursor is not None:
+            values = self.parse_values(queryset, cursor['v'])
+            queryset = queryset.filter(self.seek_filter(ordering, values, self.nullable_fields(queryset)))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Return ``[(field, descending), ...]`` ending with the pk tiebreaker."""
+        pk_name = queryset.model._meta.pk.name
+        ordering = []
+        for item in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(item, str) or item == '?':
+                raise TypeError('KeysetPagination only supports ordering by field names.')
+            name = item.lstrip('-')
+            ordering.append((pk_name if name == 'pk' else name, item.startswith('-')))
+        if not any(name == pk_name for name, _ in ordering):
+            last_desc = ordering[-1][1] if ordering else False
+            ordering.append((pk_name, last_desc))
+        return ordering
+
+    def seek_filter(self, ordering, values, nullable=()):
+        """Build ``(a, b, pk) > (x, y, z)`` as OR-ed prefix comparisons.
+
+        NULLs follow PostgreSQL's default placement (last when ascending,
+        first when descending) for the columns named in ``nullable``. The
+        leading ``a >= x`` bound is redundant but lets PostgreSQL turn the
+        predicate into a single index range scan on the first sort column; it
+        is only added when the first column cannot be NULL.
+        """
+        clauses = Q()
+        equal = Q()
+        for (name, desc), value in zip(ordering, values):
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if desc else None
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f"{name}__{'lt' if desc else 'gt'}": value})
+                if name in nullable and not desc:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            if after is not None:
+                clauses |= equal & after
+            equal &= same
+        (first, first_desc), first_value = ordering[0], values[0]
+        if first not in nullable and first_value is not None:
+            clauses = Q(**{f"{first}__{'lte' if first_desc else 'gte'}": first_value}) & clauses
+        return clauses
+
+    def nullable_fields(self, queryset):
+        nullable = set()
+        for name, _ in self.ordering:
+            if name in queryset.query.annotations:
+                nullable.add(name)  # computed values may always be NULL
+            elif queryset.model._meta.get_field(name).null:
+                nullable.add(name)
+        return nullable
+
+    def parse_values(self, queryset, raw_values):
+        values = []
+        for (name, _), raw in zip(self.ordering, raw_values):
+            if name in queryset.query.annotations:
+                field = queryset.query.annotations[name].output_field
+            else:
+                field = queryset.model._meta.get_field(name)
+            try:
+                values.append(field.to_python(raw))
+            except Exception:
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = signing.loads(token, salt=self.cursor_salt)
+        except signing.BadSignature:
+            raise NotFound(self.invalid_cursor_message)
+        expected = [('-' if desc else '') + name for name, desc in self.ordering]
+        if cursor.get('o') != expected or len(cursor.get('v', [])) != len(expected):
+            # Cursor was issued for a different ?ordering=
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for name, _ in self.ordering:
+            # pages are model instances or, on the fast list path, values() dicts
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            if isinstance(value, (datetime, date, time)):
+                value = value.isoformat()
+            elif value is not None and not isinstance(value, (str, int, float)):
+                value = str(value)
+            values.append(value)
+        payload = {
+            'o': [('-' if desc else '') + name for name, desc in self.ordering],
+            'v': values,
+            'r': reverse,
+        }
+        token = signing.dumps(payload, salt=self.cursor_salt, compress=True)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.estimated_count is not None:
+            payload['estimated_count'] = self.estimated_count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'estimated_count': {'type': 'integer', 'example': 2000000},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque keyset cursor taken from a previous next/previous link.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.estimate_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include a planner-based estimated_count instead of an exact count.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,97 @@
+"""Faster JSON and opt-in MessagePack renderers/parsers for the API.
+
+``FastJSONRenderer`` / ``FastJSONParser`` use ``orjson`` when it is
+installed. ``orjson`` handles UUIDs, datetimes and dict/list subclasses
+natively; anything else (``Decimal``, lazy strings, querysets) goes through
+DRF's own encoder, so the output matches ``rest_framework.renderers.JSONRenderer``
+(compact separators, UTF-8, ``Z`` for UTC, U+2028/U+2029 escaped). One
+difference: ``orjson`` renders a NaN or infinite float as ``null``, where
+DRF (``STRICT_JSON``) raises ``ValueError``. Finding them first would mean
+walking every response, so serializers that can produce such floats must
+reject them themselves. Without ``orjson`` both classes behave exactly like
+DRF's.
+
+``MessagePackRenderer`` / ``MessagePackParser`` add ``application/msgpack``
+for internal service-to-service consumers. They need the ``msgpack``
+package and are only enabled when ``API_ENABLE_MSGPACK`` is set.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+_drf_default = JSONEncoder().default
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """Drop-in ``JSONRenderer`` backed by ``orjson`` when available."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=_drf_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; let the stdlib encoder handle it
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safety escaping as DRF's JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in ``JSONParser`` backed by ``orjson`` when available."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImproperlyConfigured("API_ENABLE_MSGPACK requires the 'msgpack' package.")
+
+
+def _msgpack_default(obj):
+    # Reduce non-native types to the same values the JSON renderers emit
+    return _drf_default(obj)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        _require_msgpack()
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        _require_msgpack()
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
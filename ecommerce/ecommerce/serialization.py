@@ -0,0 +1,97 @@
+"""Fast path for flat list serializers.
+
+DRF's ``ModelSerializer.to_representation`` walks every field of every
+object, calling ``get_attribute`` and building a ``ReturnDict`` row by row.
+For list endpoints whose serializer only exposes plain model columns, the
+same output can be built from ``values()`` rows: the queryset skips model
+instantiation and each column is converted with the field's own
+``to_representation`` (or not at all where that is the identity, e.g.
+strings and booleans). The rendered JSON is byte-identical to the regular
+path, which is still used whenever a serializer has method fields, nested
+serializers or related fields.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+
+# Fields whose to_representation() returns database values unchanged
+IDENTITY_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.SlugField,
+    serializers.IntegerField, serializers.BooleanField,
+)
+
+
+def flat_plan(serializer):
+    """Return ``[(name, source, convert), ...]`` for ``serializer``, or ``None`` if it is not flat.
+
+    ``convert`` is ``None`` when the column value can be emitted as is.
+    """
+    model = serializer.Meta.model
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField,
+                              RelatedField, ManyRelatedField)):
+            return None
+        source = field.source
+        if source == '*' or '.' in source:
+            return None
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+        if type(field) in IDENTITY_FIELDS or (type(field) is serializers.JSONField and not field.binary):
+            convert = None
+        else:
+            convert = field.to_representation
+        plan.append((name, source, convert))
+    return plan
+
+
+def serialize_rows(plan, rows):
+    """Build representation dicts from ``values()`` rows, mirroring ``to_representation``."""
+    data = []
+    for row in rows:
+        item = {}
+        for name, source, convert in plan:
+            value = row[source]
+            item[name] = value if convert is None or value is None else convert(value)
+        data.append(item)
+    return data
+
+
+class FastListMixin:
+    """ViewSet mixin serving ``list`` from ``values()`` rows when the serializer is flat.
+
+    Set ``fast_list_serialization = False`` on a view to always use the
+    regular serializer path.
+    """
+
+    fast_list_serialization = True
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        plan = flat_plan(serializer) if self.fast_list_serialization else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        sources = [source for _, source, _ in plan]
+        # Sort keys are needed by keyset cursors even when they are not rendered
+        for item in queryset.query.order_by or queryset.model._meta.ordering:
+            name = item.lstrip('-') if isinstance(item, str) else None
+            if name == 'pk':
+                name = queryset.model._meta.pk.name
+            if name and name not in sources:
+                sources.append(name)
+        pk_name = queryset.model._meta.pk.name
+        if pk_name not in sources:
+            sources.append(pk_name)
+        rows = queryset.prefetch_related(None).values(*sources)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_rows(plan, page))
+        return Response(serialize_rows(plan, rows))
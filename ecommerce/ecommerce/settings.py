@@ -24,6 +24,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 from dotenv import load_dotenv
 import os
+import sys
 import certifi
 
 load_dotenv()
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'products',
     'payments',
@@ -198,17 +200,39 @@ REDIS_DB_BROKER = os.getenv('REDIS_DB_BROKER', '1')
 REDIS_DB_RESULT = os.getenv('REDIS_DB_RESULT', '2')
 REDIS_URL_BASE = os.getenv('REDIS_URL_BASE', f'redis://{REDIS_HOST}:{REDIS_PORT}')
 
+# Cache location, first match wins:
+#   `manage.py test`  -> TEST_CACHE_URL (default: local Redis DB 15); tests call cache.clear()
+#                        and delete keys, so they never touch the configured Valkey
+#   CACHE_URL         -> any redis://, rediss:// or unix:// URL (local redis-server, redislite socket)
+#   VALKEY_HOST       -> managed Valkey over TLS
+#   otherwise         -> local Redis at REDIS_URL_BASE / REDIS_DB_CACHE
+# On Render, REDIS_URL (below) replaces all of these.
+TESTING = sys.argv[1:2] == ['test']
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": f"rediss://default:{os.getenv('VALKEY_PASSWORD')}@{os.getenv('VALKEY_HOST')}:{os.getenv('VALKEY_PORT')}/0",
+        "LOCATION": os.getenv('CACHE_URL', f"{REDIS_URL_BASE}/{REDIS_DB_CACHE}"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-            "PASSWORD": os.getenv('VALKEY_PASSWORD'),
-            "SSL": True,  # important for Aiven Valkey
         }
     }
 }
+if TESTING:
+    CACHES['default']['LOCATION'] = os.getenv('TEST_CACHE_URL', f"{REDIS_URL_BASE}/15")
+elif os.getenv('VALKEY_HOST') and not os.getenv('CACHE_URL'):
+    CACHES['default']['LOCATION'] = (
+        f"rediss://default:{os.getenv('VALKEY_PASSWORD')}@{os.getenv('VALKEY_HOST')}:{os.getenv('VALKEY_PORT')}/0"
+    )
+    CACHES['default']['OPTIONS'].update({
+        "PASSWORD": os.getenv('VALKEY_PASSWORD'),
+        "SSL": True,  # important for Aiven Valkey
+    })
+# Catalog responses are invalidated by a version bump on write, so they can live long.
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', str(6 * 60 * 60)))
+# Let variants switched with `manage.py hot_inventory enable` keep their stock in Valkey
+# (products.hot_inventory). Disable every hot variant before turning this off again.
+INVENTORY_HOT_MODE = os.getenv('INVENTORY_HOT_MODE', 'false').lower() == 'true'
  # Session configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
@@ -243,6 +267,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'notifications.tasks.update_low_stocks_alerts',  # function name has plural 'stocks'
         'schedule': 1800.0,  # Every 30 minutes
     },
+    'release-expired-stock-reservations': {
+        'task': 'notifications.tasks.release_expired_stock_reservations',
+        'schedule': 60.0,  # Every minute; reservations live 15 minutes
+    },
+    'reconcile-hot-inventory': {
+        'task': 'notifications.tasks.reconcile_hot_inventory',
+        'schedule': 10.0,  # Write Valkey stock changes back to Postgres; a no-op when the journal is empty
+    },
+    'ensure-order-partitions': {
+        'task': 'notifications.tasks.ensure_order_partitions',
+        'schedule': 86400.0,  # Daily; keeps three months of partitions ahead once orders are partitioned
+    },
+    'refresh-sales-rollups': {
+        'task': 'notifications.tasks.refresh_sales_rollups',
+        'schedule': 300.0,  # Every 5 minutes; only the hours of changed orders are recomputed
+    },
 }
 
 # In development, you can execute Celery tasks locally without a broker
@@ -258,8 +298,26 @@ if not DEBUG and not os.getenv('CELERY_BROKER_URL') and 'CELERY_TASK_ALWAYS_EAGE
     CELERY_TASK_EAGER_PROPAGATES = False  # type: ignore
 
 # Django REST Framework defaults
+# JSON goes through orjson when it is installed (same output as DRF's renderer).
+# MessagePack (application/msgpack) is opt-in for internal consumers and needs the msgpack package.
+API_ENABLE_MSGPACK = os.getenv('API_ENABLE_MSGPACK', 'false').lower() == 'true'
+API_RENDERER_CLASSES = [
+    'ecommerce.renderers.FastJSONRenderer',
+    'rest_framework.renderers.BrowsableAPIRenderer',
+]
+API_PARSER_CLASSES = [
+    'ecommerce.renderers.FastJSONParser',
+    'rest_framework.parsers.FormParser',
+    'rest_framework.parsers.MultiPartParser',
+]
+if API_ENABLE_MSGPACK:
+    API_RENDERER_CLASSES.append('ecommerce.renderers.MessagePackRenderer')
+    API_PARSER_CLASSES.append('ecommerce.renderers.MessagePackParser')
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'ecommerce.pagination.StandardResultsSetPagination',
+    'DEFAULT_RENDERER_CLASSES': API_RENDERER_CLASSES,
+    'DEFAULT_PARSER_CLASSES': API_PARSER_CLASSES,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
     ],
@@ -363,7 +421,8 @@ if os.getenv('RENDER'):  # Render sets RENDER=1 and provides RENDER_EXTERNAL_URL
     # If REDIS_URL provided by Render redis add-on unify usage
     if redis_url := os.getenv('REDIS_URL'):
         # Use the single redis instance for cache, broker & results (different DB indexes optional)
-        CACHES['default']['LOCATION'] = f"{redis_url}/{REDIS_DB_CACHE}"
+        if not TESTING:
+            CACHES['default']['LOCATION'] = f"{redis_url}/{REDIS_DB_CACHE}"
         CELERY_BROKER_URL = f"{redis_url}/{REDIS_DB_BROKER}"
         CELERY_RESULT_BACKEND = f"{redis_url}/{REDIS_DB_RESULT}"
 
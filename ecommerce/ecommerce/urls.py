@@ -23,7 +23,7 @@ import time
 from rest_framework.routers import DefaultRouter
 
 from users.views_api import UserViewSet, verify_email_view
-from products.views_api import ProductViewSet
+from products.views_api import CategoryViewSet, OrderViewSet, ProductViewSet, SalesReportViewSet
 from payments.views_api import PaymentViewSet
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -35,7 +35,10 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, Spec
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'products', ProductViewSet, basename='product')
+router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'sales', SalesReportViewSet, basename='sales')
 
 def health_view(request):
     started = time.time()
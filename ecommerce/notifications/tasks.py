@@ -134,12 +134,54 @@ def send_abandoned_cart_email(cart_id):
 
 @shared_task
 def update_low_stocks_alerts():
-    """Update low stock alerts for products."""
+    """Alert admins once per variant when stock falls to the low-stock threshold.
+
+    The flag is cleared again once a variant is restocked above the
+    threshold, so the next shortage alerts again.
+    """
+    from django.core.mail import mail_admins
+    from products.inventory import LOW_STOCK_THRESHOLD
     from products.models import ProductVariant
-    
-    low_stock_variants = ProductVariant.objects.filter(stock__lte=5, low_stock_alert_sent=False)
-    
-    for variant in low_stock_variants:
-        # Logic to notify admin or update alert status
-        variant.low_stock_alert_sent = True
-        variant.save()
\ No newline at end of file
+
+    ProductVariant.objects.filter(stock__gt=LOW_STOCK_THRESHOLD, low_stock_alert_sent=True).update(
+        low_stock_alert_sent=False,
+    )
+    low_stock = ProductVariant.objects.filter(
+        stock__lte=LOW_STOCK_THRESHOLD, low_stock_alert_sent=False, is_active=True,
+    )
+    rows = list(low_stock.values_list('pk', 'sku', 'stock'))
+    if not rows:
+        return 0
+    lines = [f"{sku}: {stock} left" for _, sku, stock in rows]
+    logger.warning("Low stock for %d variant(s): %s", len(rows), ', '.join(lines))
+    mail_admins(f"Low stock for {len(rows)} variant(s)", '\n'.join(lines), fail_silently=True)
+    ProductVariant.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(low_stock_alert_sent=True)
+    return len(rows)
+
+
+@shared_task
+def release_expired_stock_reservations():
+    """Return units held by expired cart reservations to stock."""
+    from products.inventory import release_expired
+    return release_expired()
+
+
+@shared_task
+def reconcile_hot_inventory():
+    """Apply Valkey stock changes of hot variants to ``ProductVariant.stock``."""
+    from products.hot_inventory import reconcile
+    return reconcile()
+
+
+@shared_task
+def ensure_order_partitions():
+    """Pre-create the coming months' ``orders``/``order_items`` partitions (no-op until they are partitioned)."""
+    from products.partitioning import ensure_partitions
+    return len(ensure_partitions())
+
+
+@shared_task
+def refresh_sales_rollups():
+    """Fold orders created or changed since the last run into the hourly/daily sales rollups."""
+    from products.sales import refresh
+    return refresh()
@@ -1,3 +1,40 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from .models import Payment
+from .views_api import PaymentViewSet
+
+
+class PaymentFastListTests(APITestCase):
+    def setUp(self):
+        for i, status in enumerate(['pending', 'succeeded', 'failed']):
+            Payment.objects.create(gateway='stripe', amount=f'{i}.10', status=status, reference=None if i else 'ref-0')
+
+    def fetch(self, url, fast):
+        cache.clear()
+        with mock.patch.object(PaymentViewSet, 'fast_list_serialization', fast):
+            return self.client.get(url).content
+
+    def test_output_is_byte_identical(self):
+        for query in ('', '?ordering=amount', '?status=failed'):
+            url = reverse('payment-list') + query
+            self.assertEqual(self.fetch(url, True), self.fetch(url, False))
+
+
+class PaymentIdempotencyTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(username='payer', email='payer@example.com', password='x')
+        self.client.force_authenticate(user)
+
+    def test_retried_create_makes_one_payment(self):
+        url = reverse('payment-list')
+        body = {'gateway': 'stripe', 'amount': '19.99', 'reference': 'ch_1'}
+        first = self.client.post(url, body, format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        second = self.client.post(url, body, format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertEqual(first.data['id'], second.json()['id'])
+        self.assertEqual(Payment.objects.count(), 1)
@@ -5,9 +5,11 @@ from .models import Payment
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from .serializers import PaymentSerializer
+from ecommerce.idempotency import idempotent
+from ecommerce.serialization import FastListMixin
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -26,3 +28,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @method_decorator(cache_page(30))  # 30 second cache
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @idempotent('payments')
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
@@ -1,11 +1,13 @@
 from django.contrib import admin
-from .models import Category, Product, ProductVariant, Order, OrderItem
+from .models import Category, Product, ProductVariant, StockReservation, Order, OrderItem
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-	list_display = ('name', 'slug', 'is_active', 'created_at')
+	list_display = ('name', 'slug', 'parent', 'depth', 'is_active', 'created_at')
 	search_fields = ('name', 'slug')
+	readonly_fields = ('path', 'depth')
+	ordering = ('path',)
 
 
 @admin.register(Product)
@@ -17,8 +19,16 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(ProductVariant)
 class ProductVariantAdmin(admin.ModelAdmin):
-	list_display = ('product', 'name', 'sku', 'price', 'is_active')
+	list_display = ('product', 'name', 'sku', 'price', 'stock', 'is_active')
 	search_fields = ('name', 'sku')
+	# Changed only through products.inventory (`manage.py restock`); ProductVariant.save() ignores it anyway
+	readonly_fields = ('stock', 'low_stock_alert_sent')
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+	list_display = ('variant', 'cart_key', 'quantity', 'expires_at')
+	search_fields = ('cart_key', 'variant__sku')
 
 
 @admin.register(Order)
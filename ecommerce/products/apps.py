@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .suggest import set_similarity_threshold
+        connection_created.connect(set_similarity_threshold)
+        from . import signals  # noqa: F401
@@ -0,0 +1,65 @@
+"""Batch product lookup (``/api/products/batch/?ids=...`` or ``?skus=...``).
+
+Each product's detail representation is cached on its own, under the
+catalog generation, keyed by the lookup value. A batch reads all keys with
+one ``get_many`` and loads only the misses: one product query plus one
+query per prefetched relation, however many products are missing. Unknown
+values are reported in ``missing`` instead of failing the batch.
+"""
+import uuid
+
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+
+from .cache import DEFAULT_TIMEOUT, jittered, versioned_key
+
+MAX_BATCH_SIZE = 200
+# query parameter -> (model lookup, key of the value in the representation)
+LOOKUPS = {'ids': ('pk', 'id'), 'skus': ('sku', 'sku')}
+
+
+def _normalize(param, value):
+    if param == 'ids':
+        try:
+            return str(uuid.UUID(value))
+        except ValueError:
+            return None
+    return value
+
+
+def parse_lookup(params):
+    """Return ``(param, values, invalid)`` with values de-duplicated in request order."""
+    given = [param for param in LOOKUPS if params.get(param)]
+    if len(given) != 1:
+        raise ValidationError({'detail': 'Pass exactly one of ?ids= or ?skus=.'})
+    param = given[0]
+    raw = [v.strip() for v in params[param].split(',') if v.strip()]
+    if len(raw) > MAX_BATCH_SIZE:
+        raise ValidationError({param: f'At most {MAX_BATCH_SIZE} values per request.'})
+    values, invalid = {}, []
+    for value in raw:
+        normalized = _normalize(param, value)
+        if normalized is None:
+            invalid.append(value)
+        else:
+            values.setdefault(normalized, None)
+    values = list(values)
+    return param, values, invalid
+
+
+def fetch(param, values, load):
+    """Return ``(found, missing)``; ``found`` maps each value to its representation.
+
+    ``load(values)`` must return serialized products for the given lookup
+    values; it is only called for cache misses.
+    """
+    lookup, key_field = LOOKUPS[param]
+    keys = {value: versioned_key('catalog', 'product', lookup, value) for value in values}
+    cached = cache.get_many(list(keys.values()))
+    found = {value: cached[key] for value, key in keys.items() if key in cached}
+    misses = [value for value in values if value not in found]
+    if misses:
+        loaded = {str(item[key_field]): item for item in load(lookup, misses)}
+        cache.set_many({keys[value]: item for value, item in loaded.items() if value in keys}, jittered(DEFAULT_TIMEOUT))
+        found.update((value, item) for value, item in loaded.items() if value in keys)
+    return found, [value for value in values if value not in found]
@@ -0,0 +1,104 @@
+"""Versioned caching for catalog reads.
+
+Every cached catalog response is stored under a key that embeds a generation
+counter kept in the default cache (Valkey). Model signals bump the counter on
+any catalog write, which makes all older entries unreachable at once, so
+entries can live for hours without ever serving stale data. Old generations
+simply age out through their TTL.
+
+Hit/miss counters are kept next to the generation counter so the hit rate
+can be checked across all web processes (``manage.py catalog_cache``).
+"""
+import hashlib
+import random
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+VERSION_KEY = 'catalog:version:{namespace}'
+STATS_KEY = 'catalog:stats:{name}'
+DEFAULT_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 6 * 60 * 60)
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:  # key missing or evicted
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def get_version(namespace='catalog'):
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(namespace='catalog'):
+    """Invalidate every entry cached under ``namespace``."""
+    return _incr(VERSION_KEY.format(namespace=namespace))
+
+
+def versioned_key(namespace, *parts):
+    digest = hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()
+    return f'{namespace}:v{get_version(namespace)}:{digest}'
+
+
+def jittered(timeout):
+    """Spread expiries by +/-10% so entries written together don't all miss together."""
+    return int(timeout * random.uniform(0.9, 1.1))
+
+
+def record(name):
+    _incr(STATS_KEY.format(name=name))
+
+
+def get_stats():
+    hits = cache.get(STATS_KEY.format(name='hits')) or 0
+    misses = cache.get(STATS_KEY.format(name='misses')) or 0
+    total = hits + misses
+    return {
+        'version': get_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_stats():
+    cache.delete_many([STATS_KEY.format(name='hits'), STATS_KEY.format(name='misses')])
+
+
+def cache_catalog_response(timeout=DEFAULT_TIMEOUT, namespace='catalog'):
+    """Cache rendered 200 responses of a DRF view method under the catalog version.
+
+    Keys cover the full path (query string included) and the negotiated
+    format. The browsable API is never cached because it renders per-user
+    chrome.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            fmt = request.accepted_renderer.format
+            if fmt == 'api':
+                return view_method(self, request, *args, **kwargs)
+            key = versioned_key(namespace, request.get_full_path(), fmt)
+            cached = cache.get(key)
+            if cached is not None:
+                record('hits')
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            record('misses')
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                def store(rendered):
+                    cache.set(key, (rendered.content, rendered['Content-Type']), jittered(timeout))
+                response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,73 @@
+"""Validators for conditional GETs (``If-None-Match`` / ``If-Modified-Since``).
+
+Used with ``django.views.decorators.http.condition`` so unchanged resources
+answer ``304 Not Modified`` before any serializer runs.
+
+Detail validators come from one indexed query: the product's ``updated_at``
+plus the newest variant and category timestamps and the variant count. The
+count catches deleted variants. Link changes touch ``Product.updated_at``
+(see ``products.signals``). List validators need no query at all because the
+catalog generation counter already changes on every catalog write.
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from .cache import get_version
+from .models import Category, Product, ProductVariant
+
+
+def _product_state(request, pk):
+    """Fetch (and memoize on the request) the timestamps describing product ``pk``."""
+    cache_attr = '_product_state'
+    state = getattr(request, cache_attr, None)
+    if state is None or state[0] != pk:
+        variants = ProductVariant.objects.filter(product=OuterRef('pk')).order_by().values('product')
+        categories = Category.objects.filter(products=OuterRef('pk')).order_by().values('products')
+        try:
+            row = (
+                Product.objects.filter(pk=pk)
+                .annotate(
+                    variants_modified=Subquery(variants.annotate(m=Max('updated_at')).values('m')),
+                    variant_count=Subquery(variants.annotate(n=Count('pk')).values('n')),
+                    categories_modified=Subquery(categories.annotate(m=Max('updated_at')).values('m')),
+                )
+                .values_list('updated_at', 'variants_modified', 'variant_count', 'categories_modified')
+                .first()
+            )
+        except (ValidationError, ValueError):  # malformed pk; let the view produce the 404
+            row = None
+        state = (pk, row)
+        setattr(request, cache_attr, state)
+    return state[1]
+
+
+def _format(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return getattr(renderer, 'format', '')
+
+
+def product_etag(request, pk=None, **kwargs):
+    row = _product_state(request, pk)
+    if row is None:
+        return None
+    updated_at, variants_modified, variant_count, categories_modified = row
+    raw = (
+        f'{updated_at.isoformat()}|{variants_modified}|{variant_count or 0}|{categories_modified}'
+        f"|{_format(request)}|{request.GET.get('fields', '')}|{request.GET.get('expand', '')}"
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def product_last_modified(request, pk=None, **kwargs):
+    row = _product_state(request, pk)
+    if row is None:
+        return None
+    updated_at, variants_modified, _, categories_modified = row
+    return max(t for t in (updated_at, variants_modified, categories_modified) if t is not None)
+
+
+def catalog_list_etag(request, *args, **kwargs):
+    raw = f'{get_version()}|{request.get_full_path()}|{_format(request)}'
+    return hashlib.sha1(raw.encode()).hexdigest()
@@ -0,0 +1,120 @@
+"""Full catalog dumps as NDJSON or CSV, produced in constant memory.
+
+Products are read through a server-side cursor (``iterator(chunk_size=...)``)
+as plain ``values()`` rows. Each chunk then gets its variants and category
+slugs from two ``IN`` queries, is encoded, and is handed to the caller before
+the next chunk is read. Memory therefore depends on the chunk size, never on
+the catalog size, and the query count grows by two per chunk.
+"""
+import csv
+import io
+import json
+import zlib
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Product, ProductVariant
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+DEFAULT_CHUNK_SIZE = 2000
+
+PRODUCT_FIELDS = (
+    'id', 'sku', 'name', 'slug', 'short_description', 'description', 'price', 'compare_price',
+    'attributes', 'is_active', 'is_digital', 'weight', 'dimensions',
+    'min_variant_price', 'max_variant_price', 'active_variant_count', 'created_at', 'updated_at',
+)
+VARIANT_FIELDS = ('id', 'sku', 'name', 'price', 'attributes', 'is_active')
+CSV_COLUMNS = (*PRODUCT_FIELDS, 'categories', 'variants')
+CATEGORY_SEPARATOR = '|'
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_products(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield product dicts (ordered by pk) with ``variants`` and ``categories`` attached."""
+    rows = (
+        queryset.prefetch_related(None)
+        .order_by('pk')
+        .values(*PRODUCT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    through = Product.categories.through
+    for chunk in _chunks(rows, chunk_size):
+        ids = [row['id'] for row in chunk]
+        variants = defaultdict(list)
+        for variant in (
+            ProductVariant.objects.filter(product_id__in=ids)
+            .order_by('product_id', 'sku')
+            .values('product_id', *VARIANT_FIELDS)
+        ):
+            variants[variant.pop('product_id')].append(variant)
+        categories = defaultdict(list)
+        for product_id, slug in (
+            through.objects.filter(product_id__in=ids)
+            .order_by('category__slug')
+            .values_list('product_id', 'category__slug')
+        ):
+            categories[product_id].append(slug)
+        for row in chunk:
+            row['categories'] = categories.get(row['id'], [])
+            row['variants'] = variants.get(row['id'], [])
+        yield from chunk
+
+
+def _ndjson_chunks(products, chunk_size):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in _chunks(products, chunk_size):
+        yield ''.join(encoder.encode(row) + '\n' for row in chunk)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':'))
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(products, chunk_size):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    header = out.getvalue()
+    out.seek(0)
+    out.truncate()
+    yield header
+    for chunk in _chunks(products, chunk_size):
+        for row in chunk:
+            row['categories'] = CATEGORY_SEPARATOR.join(row['categories'])
+            writer.writerow([_csv_value(row[column]) for column in CSV_COLUMNS])
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_catalog(queryset, fmt='ndjson', chunk_size=DEFAULT_CHUNK_SIZE, compress=False):
+    """Return an iterator of encoded ``bytes`` for ``queryset`` in ``fmt``."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown export format {fmt!r}.')
+    encode = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+    chunks = (text.encode('utf-8') for text in encode(iter_products(queryset, chunk_size), chunk_size))
+    return gzip_stream(chunks) if compress else chunks
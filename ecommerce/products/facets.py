@@ -0,0 +1,126 @@
+"""Facet counts for the product list.
+
+Facets are computed over the already-filtered product queryset in three
+aggregate queries:
+
+1. products per category (GROUP BY on the product/category through table),
+2. products per price bucket (one row of conditional ``COUNT ... FILTER``),
+3. products per attribute value for product *and* variant attributes (one
+   ``UNION ALL`` over ``jsonb_each_text``; the ``?|`` key-existence
+   pre-filter is served by the ``attributes`` GIN indexes).
+
+Results are cached under the catalog generation, keyed by the normalized
+filter parameters, so any catalog write invalidates them.
+"""
+import re
+from decimal import Decimal
+
+from django.db import connections
+from django.db.models import Count, Q
+
+from .models import Product, ProductVariant
+
+DEFAULT_ATTRIBUTE_KEYS = ('color', 'size', 'brand')
+MAX_ATTRIBUTE_KEYS = 10
+MAX_VALUES_PER_KEY = 50
+# Upper bounds of the price buckets; the last bucket is open-ended.
+PRICE_BUCKETS = (Decimal('25'), Decimal('50'), Decimal('100'), Decimal('250'), Decimal('500'))
+# Parameters that change presentation, not the matched set.
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'cursor', 'pagination', 'estimate', 'format', 'facet_keys'}
+
+_KEY_RE = re.compile(r'^[A-Za-z0-9_\-]{1,64}$')
+
+
+def parse_keys(raw):
+    """Attribute keys requested via ``?facet_keys=a,b`` (validated), else the defaults."""
+    if not raw:
+        return DEFAULT_ATTRIBUTE_KEYS
+    keys = [k for k in (part.strip() for part in raw.split(',')) if _KEY_RE.match(k)]
+    return tuple(dict.fromkeys(keys))[:MAX_ATTRIBUTE_KEYS] or DEFAULT_ATTRIBUTE_KEYS
+
+
+def normalize_params(params, keys):
+    """Stable representation of the filter parameters for cache keys."""
+    items = sorted(
+        (name, value)
+        for name in params
+        if name not in IGNORED_PARAMS
+        for value in sorted(params.getlist(name))
+    )
+    return repr((items, keys))
+
+
+def category_facets(product_ids):
+    through = Product.categories.through
+    rows = (
+        through.objects.filter(product_id__in=product_ids)
+        .values('category_id', 'category__slug', 'category__name')
+        .annotate(count=Count('*'))
+        .order_by('-count', 'category__name')
+    )
+    return [
+        {'id': r['category_id'], 'slug': r['category__slug'], 'name': r['category__name'], 'count': r['count']}
+        for r in rows
+    ]
+
+
+def price_facets(queryset):
+    bounds = [None, *PRICE_BUCKETS, None]
+    buckets = list(zip(bounds, bounds[1:]))
+    aggregates = {}
+    for i, (low, high) in enumerate(buckets):
+        condition = Q()
+        if low is not None:
+            condition &= Q(price__gte=low)
+        if high is not None:
+            condition &= Q(price__lt=high)
+        aggregates[f'bucket_{i}'] = Count('pk', filter=condition)
+    counts = queryset.order_by().aggregate(**aggregates)
+    return [
+        {'min': low, 'max': high, 'count': counts[f'bucket_{i}']}
+        for i, (low, high) in enumerate(buckets)
+    ]
+
+
+def attribute_facets(product_ids, keys):
+    inner_sql, inner_params = product_ids.query.sql_with_params()
+    keys = list(keys)
+    sql = f"""
+        SELECT 'product', kv.key, kv.value, COUNT(*)
+        FROM {Product._meta.db_table} p CROSS JOIN LATERAL jsonb_each_text(p.attributes) kv
+        WHERE p.id IN ({inner_sql}) AND p.attributes ?| %s AND kv.key = ANY(%s)
+        GROUP BY kv.key, kv.value
+        UNION ALL
+        SELECT 'variant', kv.key, kv.value, COUNT(DISTINCT v.product_id)
+        FROM {ProductVariant._meta.db_table} v CROSS JOIN LATERAL jsonb_each_text(v.attributes) kv
+        WHERE v.product_id IN ({inner_sql}) AND v.is_active AND v.attributes ?| %s AND kv.key = ANY(%s)
+        GROUP BY kv.key, kv.value
+    """
+    params = [*inner_params, keys, keys, *inner_params, keys, keys]
+    facets = {'product': {k: [] for k in keys}, 'variant': {k: [] for k in keys}}
+    with connections[product_ids.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        for source, key, value, count in cursor.fetchall():
+            facets[source][key].append({'value': value, 'count': count})
+    for by_key in facets.values():
+        for key, values in by_key.items():
+            values.sort(key=lambda v: (-v['count'], v['value'] or ''))
+            del values[MAX_VALUES_PER_KEY:]
+    return facets
+
+
+def compute_facets(queryset, keys=DEFAULT_ATTRIBUTE_KEYS):
+    queryset = queryset.order_by()
+    product_ids = queryset.values('pk')
+    price = price_facets(queryset)
+    if queryset.query.is_empty():
+        attributes = {source: {k: [] for k in keys} for source in ('product', 'variant')}
+    else:
+        attributes = attribute_facets(product_ids, keys)
+    return {
+        'total': sum(bucket['count'] for bucket in price),
+        'categories': category_facets(product_ids),
+        'price': price,
+        'attributes': attributes['product'],
+        'variant_attributes': attributes['variant'],
+    }
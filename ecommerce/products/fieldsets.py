@@ -0,0 +1,109 @@
+"""Sparse fieldsets (``?fields=``) and relation expansion (``?expand=``).
+
+The selected field names drive three things at once: which fields the
+serializer renders, which columns the queryset loads (``only()``) and which
+relations are prefetched. A client asking for ``?fields=id,name,price``
+therefore costs one narrow query, while ``?expand=variants`` on a list adds
+exactly one prefetch query.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+
+MAX_FIELDS = 50
+_NAME_RE = re.compile(r'^[a-z_][a-z0-9_]{0,63}$')
+
+
+def parse_field_list(raw):
+    """``'id, name,price'`` -> ``('id', 'name', 'price')``; invalid names are dropped."""
+    if not raw:
+        return ()
+    names = (part.strip() for part in raw.split(','))
+    return tuple(dict.fromkeys(n for n in names if _NAME_RE.match(n)))[:MAX_FIELDS]
+
+
+class SparseFieldsetMixin:
+    """ModelSerializer mixin honouring ``fields`` / ``expand`` from the serializer context.
+
+    ``Meta.expandable_fields`` maps a field name to ``(serializer_class, kwargs)``
+    for relations that are only rendered on request. ``Meta.prefetch_filters``
+    maps a relation to lookups applied to its prefetch queryset. Selection
+    applies to the root serializer only; nested serializers keep their own
+    fields.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        expand = self.context.get('expand') or ()
+        for name, (serializer_class, kwargs) in getattr(self.Meta, 'expandable_fields', {}).items():
+            if name in expand and name not in fields:
+                fields[name] = serializer_class(read_only=True, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            selected = {name: field for name, field in fields.items() if name in requested or name in expand}
+            if selected:
+                return selected
+        return fields
+
+    def _is_root(self):
+        return self.root is self or self.root is self.parent
+
+    @classmethod
+    def selected_field_names(cls, requested=(), expand=()):
+        names = list(cls.Meta.fields)
+        names += [n for n in getattr(cls.Meta, 'expandable_fields', {}) if n in expand and n not in names]
+        if requested:
+            narrowed = [n for n in names if n in requested or n in expand]
+            if narrowed:
+                return narrowed
+        return names
+
+    @classmethod
+    def nested_serializer_class(cls, name):
+        field = cls._declared_fields.get(name)
+        if field is not None:
+            return type(getattr(field, 'child', field))
+        expandable = getattr(cls.Meta, 'expandable_fields', {})
+        return expandable[name][0] if name in expandable else None
+
+    @classmethod
+    def projection(cls, requested=(), expand=()):
+        """Return ``(columns, prefetches)`` needed to render the selected fields.
+
+        Relations become ``Prefetch`` objects whose querysets load only the
+        nested serializer's columns (plus the join key) and apply
+        ``Meta.prefetch_filters``.
+        """
+        columns, relations = model_columns(cls.Meta.model, cls.selected_field_names(requested, expand))
+        filters = getattr(cls.Meta, 'prefetch_filters', {})
+        prefetches = []
+        for name, model_field in relations:
+            queryset = model_field.related_model._default_manager.filter(**filters.get(name, {}))
+            nested = cls.nested_serializer_class(name)
+            if nested is not None:
+                nested_columns, _ = model_columns(model_field.related_model, nested.Meta.fields)
+                if model_field.one_to_many:
+                    nested_columns.append(model_field.field.name)  # the FK the prefetch joins on
+                queryset = queryset.only(*nested_columns)
+            prefetches.append(Prefetch(name, queryset=queryset))
+        return columns, prefetches
+
+
+def model_columns(model, names):
+    """Split serializer field ``names`` into concrete columns (pk first) and ``(name, field)`` relations."""
+    opts = model._meta
+    columns = [opts.pk.name]
+    relations = []
+    for name in names:
+        try:
+            model_field = opts.get_field(name)
+        except FieldDoesNotExist:  # serializer-only field (method field, annotation)
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            relations.append((name, model_field))
+        elif model_field.concrete and name not in columns:
+            columns.append(name)
+    return columns, relations
@@ -1,20 +1,125 @@
+import json
+import math
+import re
+
 import django_filters
-from .models import Product
+from django.db.models import Q
+from rest_framework import filters
+from .models import Product, ProductVariant
+from .search import search_products
+from .tree import get_subtree_ids
 from django.utils import timezone
 
 
+ATTRIBUTE_PARAM_PREFIX = 'attr.'
+VARIANT_ATTRIBUTE_PARAM_PREFIX = 'vattr.'
+MAX_ATTRIBUTE_VALUES = 20
+_ATTRIBUTE_KEY_RE = re.compile(r'^[A-Za-z0-9_\-]{1,64}$')
+
+
+def attribute_values(raw_values):
+    """Expand ``['red,blue', '42']`` into JSON values; numbers/booleans also match their typed form."""
+    values = []
+    for raw in raw_values:
+        for value in raw.split(','):
+            value = value.strip()
+            if not value:
+                continue
+            values.append(value)
+            try:
+                typed = json.loads(value)
+            except ValueError:
+                continue
+            # NaN, Infinity and overflowing literals (1e999) parse to floats that are not valid JSON
+            if isinstance(typed, (bool, int)) or (isinstance(typed, float) and math.isfinite(typed)):
+                values.append(typed)
+    return values[:MAX_ATTRIBUTE_VALUES]
+
+
+def attribute_lookups(data, prefix):
+    """Map ``{prefix}<key>`` query params to ``{key: [values]}``."""
+    lookups = {}
+    for param in data:
+        if not param.startswith(prefix):
+            continue
+        key = param[len(prefix):]
+        values = attribute_values(data.getlist(param) if hasattr(data, 'getlist') else [data[param]])
+        if _ATTRIBUTE_KEY_RE.match(key) and values:
+            lookups[key] = values
+    return lookups
+
+
+def containment_filter(lookups, field='attributes'):
+    """AND across keys, OR across values; each test is a GIN-indexable ``@>``."""
+    condition = Q()
+    for key, values in lookups.items():
+        any_value = Q()
+        for value in values:
+            any_value |= Q(**{f'{field}__contains': {key: value}})
+        condition &= any_value
+    return condition
+
+
 class ProductFilter(django_filters.FilterSet):
+    q = django_filters.CharFilter(method='filter_q', label='Full-text search')
     min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
     max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
     created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lte')
     category = django_filters.CharFilter(field_name='categories__slug', lookup_expr='exact')
+    category_tree = django_filters.CharFilter(method='filter_category_tree', label='Category slug, including subcategories')
+    # bounds on the cheapest active variant (Product.min_variant_price)
+    cheapest_variant_min = django_filters.NumberFilter(field_name='min_variant_price', lookup_expr='gte')
+    cheapest_variant_max = django_filters.NumberFilter(field_name='min_variant_price', lookup_expr='lte')
+    has_variants = django_filters.BooleanFilter(method='filter_has_variants', label='Has active variants')
     is_active = django_filters.BooleanFilter(field_name='is_active')
     is_digital = django_filters.BooleanFilter(field_name='is_digital')
 
     class Meta:
         model = Product
         fields = [
-            'is_active', 'is_digital', 'category', 'min_price', 'max_price',
-            'created_after', 'created_before'
-        ]
\ No newline at end of file
+            'q', 'is_active', 'is_digital', 'category', 'category_tree', 'min_price', 'max_price',
+            'created_after', 'created_before', 'cheapest_variant_min', 'cheapest_variant_max', 'has_variants'
+        ]
+
+    def filter_queryset(self, queryset):
+        """Apply declared filters plus dynamic ``attr.<key>`` / ``vattr.<key>`` filters.
+
+        ``attr.color=red,blue`` keeps products whose ``attributes`` contain
+        either value; ``vattr.size=L`` keeps products with an active variant
+        matching all given variant keys.
+        """
+        queryset = super().filter_queryset(queryset)
+        product_lookups = attribute_lookups(self.data, ATTRIBUTE_PARAM_PREFIX)
+        if product_lookups:
+            queryset = queryset.filter(containment_filter(product_lookups))
+        variant_lookups = attribute_lookups(self.data, VARIANT_ATTRIBUTE_PARAM_PREFIX)
+        if variant_lookups:
+            variants = ProductVariant.objects.filter(containment_filter(variant_lookups), is_active=True)
+            queryset = queryset.filter(pk__in=variants.values('product_id'))
+        return queryset
+
+    def filter_q(self, queryset, name, value):
+        return search_products(queryset, value)
+
+    def filter_has_variants(self, queryset, name, value):
+        if value is None:
+            return queryset
+        return queryset.filter(active_variant_count__gt=0) if value else queryset.filter(active_variant_count=0)
+
+    def filter_category_tree(self, queryset, name, value):
+        ids = get_subtree_ids(value)
+        if not ids:
+            return queryset.none()
+        # semi-join on the through table: each product appears once, no DISTINCT needed
+        links = Product.categories.through.objects.filter(category_id__in=ids).values('product_id')
+        return queryset.filter(pk__in=links)
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that ranks full-text matches first when no ?ordering= is given."""
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', *self.get_default_ordering(view)]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,218 @@
+"""Valkey-resident stock for flash-sale variants, written back to Postgres.
+
+Even conditional ``UPDATE`` decrements (``products.inventory``) serialize every
+checkout of one variant on its row lock. A variant switched to *hot* mode
+keeps its live level in a Valkey counter instead:
+
+* ``enable(variant_ids)`` copies ``stock`` into ``{inventory}:stock:<id>``.
+* Every change runs one Lua script that checks all counters of an order,
+  applies all deltas or none, and appends ``seq:variant_id:delta`` entries to
+  the ``{inventory}:journal`` list in the same atomic step.
+* ``reconcile()`` (Celery, every few seconds) applies new journal entries to
+  ``ProductVariant.stock`` and records the last applied ``seq`` in
+  ``HotStockSync`` within the same transaction. Entries are trimmed from the
+  journal only after that commit, so a crash at any point either replays
+  entries that the high-water mark then skips, or leaves them for the next
+  run: nothing is lost and nothing is applied twice.
+* ``disable(variant_ids)`` drops the counters and applies the remaining
+  journal while holding the variant rows, so the database takes over exactly
+  where Valkey stopped.
+
+While a variant is hot its database ``stock`` trails the counter by the
+unreconciled journal and must not be edited directly. Valkey is not part of
+the database transaction: if a transaction rolls back after a hot decrement,
+those units stay taken (an undersell, never an oversell) until the variant is
+disabled, corrected and enabled again. The mode is off unless
+``INVENTORY_HOT_MODE`` is set; journal durability then depends on Valkey
+persistence (AOF) being enabled. All keys share the ``{inventory}`` hash tag
+so the scripts also work on a clustered Valkey.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django_redis import get_redis_connection
+
+from .models import HotStockSync, ProductVariant
+
+STOCK_KEY = '{{inventory}}:stock:{variant_id}'
+HOT_SET_KEY = '{inventory}:hot'
+JOURNAL_KEY = '{inventory}:journal'
+SEQ_KEY = '{inventory}:journal:seq'
+SYNC_NAME = 'journal'
+RECONCILE_BATCH = 10000
+
+# KEYS: counters..., journal, seq. ARGV: variant_id, delta pairs in KEYS order.
+# Returns {missing, short}: 1-based positions of counters that do not exist
+# (variant not hot) or would go negative. Nothing is changed unless both are empty.
+ADJUST_SCRIPT = """
+local n = #KEYS - 2
+local missing, short = {}, {}
+for i = 1, n do
+  local level = redis.call('GET', KEYS[i])
+  if not level then
+    missing[#missing + 1] = i
+  elseif tonumber(level) + tonumber(ARGV[2 * i]) < 0 then
+    short[#short + 1] = i
+  end
+end
+if #missing > 0 or #short > 0 then
+  return {missing, short}
+end
+for i = 1, n do
+  local delta = tonumber(ARGV[2 * i])
+  redis.call('INCRBY', KEYS[i], delta)
+  local seq = redis.call('INCR', KEYS[n + 2])
+  redis.call('RPUSH', KEYS[n + 1], seq .. ':' .. ARGV[2 * i - 1] .. ':' .. delta)
+end
+return {{}, {}}
+"""
+
+# KEYS: journal. ARGV: high-water mark. Drops leading entries with seq <= mark.
+TRIM_SCRIPT = """
+local mark = tonumber(ARGV[1])
+local dropped = 0
+while true do
+  local head = redis.call('LINDEX', KEYS[1], 0)
+  if not head or tonumber(string.match(head, '^(%d+):')) > mark then
+    return dropped
+  end
+  redis.call('LPOP', KEYS[1])
+  dropped = dropped + 1
+end
+"""
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _stock_key(variant_id):
+    return STOCK_KEY.format(variant_id=variant_id)
+
+
+def hot_ids(variant_ids):
+    """Return the subset of ``variant_ids`` currently in hot mode (empty when the mode is off)."""
+    variant_ids = list(variant_ids)
+    if not variant_ids or not getattr(settings, 'INVENTORY_HOT_MODE', False):
+        return set()
+    flags = _redis().smismember(HOT_SET_KEY, [str(variant_id) for variant_id in variant_ids])
+    return {variant_id for variant_id, flag in zip(variant_ids, flags) if flag}
+
+
+def adjust(deltas):
+    """Apply ``{variant_id: delta}`` to the hot counters, all or nothing.
+
+    Returns ``(shortages, fallback)``: ``shortages`` maps variants that would go
+    negative to the units requested (nothing was applied), ``fallback`` lists
+    variants that are no longer hot and must go through the database. The
+    remaining deltas are applied whenever ``shortages`` is empty.
+    """
+    script = _redis().register_script(ADJUST_SCRIPT)
+    pending = sorted((variant_id, delta) for variant_id, delta in deltas.items() if delta)
+    fallback = []
+    while pending:
+        keys = [_stock_key(variant_id) for variant_id, _ in pending] + [JOURNAL_KEY, SEQ_KEY]
+        args = [value for variant_id, delta in pending for value in (str(variant_id), delta)]
+        missing, short = script(keys=keys, args=args)
+        if short:
+            return {pending[i - 1][0]: -pending[i - 1][1] for i in short}, fallback
+        if not missing:
+            break
+        # Disabled since hot_ids() was read: retry the others, hand these to the database
+        gone = {i - 1 for i in missing}
+        fallback += [pending[i][0] for i in sorted(gone)]
+        pending = [item for i, item in enumerate(pending) if i not in gone]
+    return {}, fallback
+
+
+def levels(variant_ids):
+    """Live counter values for ``variant_ids`` (``None`` for variants that are not hot)."""
+    variant_ids = list(variant_ids)
+    values = _redis().mget([_stock_key(variant_id) for variant_id in variant_ids])
+    return {variant_id: None if value is None else int(value) for variant_id, value in zip(variant_ids, values)}
+
+
+def journal_length():
+    return _redis().llen(JOURNAL_KEY)
+
+
+def enable(variant_ids):
+    """Move the stock of ``variant_ids`` into Valkey counters; returns the ids switched."""
+    enabled = []
+    r = _redis()
+    with transaction.atomic():
+        mark = _lock_mark()
+        # A flushed Valkey restarts the sequence; entries at or below the mark would be skipped
+        if int(r.get(SEQ_KEY) or 0) < mark.applied_seq:
+            r.set(SEQ_KEY, mark.applied_seq)
+        for variant_id, stock in (
+            ProductVariant.objects.filter(pk__in=variant_ids).order_by('pk').select_for_update()
+            .values_list('pk', 'stock')
+        ):
+            if r.set(_stock_key(variant_id), stock, nx=True):
+                r.sadd(HOT_SET_KEY, str(variant_id))
+                enabled.append(variant_id)
+    return enabled
+
+
+def disable(variant_ids):
+    """Return ``variant_ids`` to database-only stock; returns the journal entries applied."""
+    with transaction.atomic():
+        # Same lock order as reconcile(): sync mark first, then variant rows
+        _lock_mark()
+        ids = list(
+            ProductVariant.objects.filter(pk__in=variant_ids).order_by('pk').select_for_update()
+            .values_list('pk', flat=True)
+        )
+        if ids:
+            r = _redis()
+            r.srem(HOT_SET_KEY, *[str(variant_id) for variant_id in ids])
+            r.delete(*[_stock_key(variant_id) for variant_id in ids])
+        # Checkouts now fall back to the database and wait on the row locks
+        # until the remaining journal has been applied.
+        return reconcile(limit=None)
+
+
+def _lock_mark():
+    mark, _ = HotStockSync.objects.select_for_update().get_or_create(pk=SYNC_NAME)
+    return mark
+
+
+def _parse(entry):
+    seq, variant_id, delta = entry.decode().split(':')
+    return int(seq), variant_id, int(delta)
+
+
+def reconcile(limit=RECONCILE_BATCH):
+    """Apply up to ``limit`` new journal entries to ``ProductVariant.stock``; returns the number applied."""
+    r = _redis()
+    with transaction.atomic():
+        mark = _lock_mark()
+        deltas = Counter()
+        last = mark.applied_seq
+        applied = 0
+        start = 0
+        while limit is None or applied < limit:
+            entries = r.lrange(JOURNAL_KEY, start, start + RECONCILE_BATCH - 1)
+            if not entries:
+                break
+            start += len(entries)
+            for entry in entries:
+                seq, variant_id, delta = _parse(entry)
+                if seq <= last:
+                    continue  # applied before a crash, not trimmed yet
+                deltas[variant_id] += delta
+                last = seq
+                applied += 1
+                if limit is not None and applied >= limit:
+                    break
+        for variant_id, delta in sorted(deltas.items()):
+            if delta:
+                ProductVariant.objects.filter(pk=variant_id).update(stock=F('stock') + delta)
+        if last != mark.applied_seq:
+            mark.applied_seq = last
+            mark.save(update_fields=['applied_seq', 'updated_at'])
+        transaction.on_commit(lambda: r.register_script(TRIM_SCRIPT)(keys=[JOURNAL_KEY], args=[last]))
+    return applied
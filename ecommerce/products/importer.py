@@ -0,0 +1,295 @@
+"""Bulk catalog loading through PostgreSQL ``COPY``.
+
+Each feed (products, variants, category links) is streamed row by row into a
+temporary staging table with ``COPY ... FROM STDIN``, then merged into the
+real tables with one set-based statement:
+
+* products and variants are upserted by ``sku``
+  (``INSERT ... ON CONFLICT (sku) DO UPDATE``). Rows whose values did not
+  change are skipped so unchanged feed lines create no dead tuples;
+* category links are inserted straight into the ``Product.categories``
+  through table (``ON CONFLICT DO NOTHING``).
+
+Rows are never held in memory, so feed size only affects run time. Model
+signals do not fire; the importer refreshes the denormalized variant columns
+and ``Product.updated_at`` itself, and the caller bumps the catalog cache
+generation once the transaction has committed.
+"""
+import csv
+import gzip
+import io
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.text import slugify
+
+from .models import Category, Product, ProductVariant
+from .variant_stats import refresh_variant_stats
+
+FORMATS = ('csv', 'jsonl')
+
+PRODUCT_COLUMNS = (
+    'sku', 'name', 'slug', 'description', 'short_description', 'price', 'compare_price',
+    'attributes', 'is_active', 'is_digital', 'weight', 'dimensions',
+)
+VARIANT_COLUMNS = ('sku', 'product_sku', 'name', 'price', 'attributes', 'is_active')
+LINK_COLUMNS = ('product_sku', 'category_slug')
+
+
+@dataclass
+class ImportResult:
+    feed: str
+    staged: int = 0
+    rejected: int = 0
+    written: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return self.staged / self.seconds if self.seconds else 0.0
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise ValueError(f"Cannot tell the format of {path!r}; pass --format.")
+
+
+def open_feed(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def read_records(handle, fmt):
+    """Yield one dict per feed row (CSV header row or one JSON object per line)."""
+    if fmt == 'csv':
+        yield from csv.DictReader(handle)
+        return
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _text(value):
+    """Serialize a feed value for a text staging column; '' means NULL/default."""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value).strip()
+
+
+class CopyStream:
+    """File-like adapter feeding a generator of CSV lines to ``copy_expert``."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _csv_lines(records, columns, prepare, result):
+    """Turn feed records into staging CSV lines, counting staged and rejected rows."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for line_no, record in enumerate(records, start=1):
+        if not isinstance(record, dict):  # a JSONL line holding an array, string or number
+            row, reason = None, 'not an object'
+        else:
+            row, reason = prepare(record), 'missing required column'
+        if row is None:
+            result.rejected += 1
+            if len(result.errors) < 10:
+                result.errors.append(f'line {line_no}: {reason}')
+            continue
+        writer.writerow([line_no, *(_text(row.get(c)) for c in columns)])
+        result.staged += 1
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+
+
+def _prepare_product(record):
+    if not _text(record.get('sku')) or not _text(record.get('name')) or not _text(record.get('price')):
+        return None
+    if not _text(record.get('slug')):
+        record = {**record, 'slug': slugify(_text(record['sku']))}
+    return record
+
+
+def _prepare_variant(record):
+    if not _text(record.get('sku')) or not _text(record.get('product_sku')) or not _text(record.get('price')):
+        return None
+    if not _text(record.get('name')):
+        record = {**record, 'name': _text(record['sku'])}
+    return record
+
+
+def _prepare_link(record):
+    if not _text(record.get('product_sku')) or not _text(record.get('category_slug')):
+        return None
+    return record
+
+
+def _stage(cursor, table, columns, lines):
+    definition = ', '.join(f'{c} text' for c in columns)
+    cursor.execute(f'CREATE TEMP TABLE {table} (line bigint, {definition}) ON COMMIT DROP')
+    cursor.copy_expert(
+        f"COPY {table} (line, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        CopyStream(lines),
+    )
+    cursor.execute(f'ANALYZE {table}')
+
+
+def _latest(table, key):
+    """Staging rows deduplicated on ``key``; the last line of the feed wins."""
+    return f'(SELECT DISTINCT ON ({key}) * FROM {table} ORDER BY {key}, line DESC)'
+
+
+def _upsert_products(cursor):
+    table = Product._meta.db_table
+    cursor.execute(f"""
+        INSERT INTO {table} AS t (
+            id, sku, name, slug, description, short_description, price, compare_price, attributes,
+            is_active, is_digital, weight, dimensions, active_variant_count, created_at, updated_at
+        )
+        SELECT
+            gen_random_uuid(), s.sku, s.name, s.slug, COALESCE(s.description, ''),
+            COALESCE(s.short_description, ''), s.price::numeric, NULLIF(s.compare_price, '')::numeric,
+            COALESCE(NULLIF(s.attributes, '')::jsonb, '{{}}'), COALESCE(NULLIF(s.is_active, '')::boolean, true),
+            COALESCE(NULLIF(s.is_digital, '')::boolean, false), NULLIF(s.weight, '')::numeric,
+            COALESCE(NULLIF(s.dimensions, '')::jsonb, '{{}}'), 0, now(), now()
+        FROM {_latest('import_products', 'sku')} s
+        ON CONFLICT (sku) DO UPDATE SET
+            name = EXCLUDED.name, slug = EXCLUDED.slug, description = EXCLUDED.description,
+            short_description = EXCLUDED.short_description, price = EXCLUDED.price,
+            compare_price = EXCLUDED.compare_price, attributes = EXCLUDED.attributes,
+            is_active = EXCLUDED.is_active, is_digital = EXCLUDED.is_digital, weight = EXCLUDED.weight,
+            dimensions = EXCLUDED.dimensions, updated_at = EXCLUDED.updated_at
+        WHERE (t.name, t.slug, t.description, t.short_description, t.price, t.compare_price, t.attributes,
+               t.is_active, t.is_digital, t.weight, t.dimensions)
+            IS DISTINCT FROM
+              (EXCLUDED.name, EXCLUDED.slug, EXCLUDED.description, EXCLUDED.short_description, EXCLUDED.price,
+               EXCLUDED.compare_price, EXCLUDED.attributes, EXCLUDED.is_active, EXCLUDED.is_digital,
+               EXCLUDED.weight, EXCLUDED.dimensions)
+    """)
+    return cursor.rowcount, 0
+
+
+def _upsert_variants(cursor):
+    table = ProductVariant._meta.db_table
+    products = Product._meta.db_table
+    # Products that lose a variant to another product need their stats refreshed too
+    cursor.execute(f"""
+        CREATE TEMP TABLE import_previous_products ON COMMIT DROP AS
+        SELECT DISTINCT v.product_id
+        FROM {_latest('import_variants', 'sku')} s
+        JOIN {table} v ON v.sku = s.sku
+        JOIN {products} p ON p.sku = s.product_sku
+        WHERE v.product_id <> p.id
+    """)
+    # Feeds never touch stock: new variants start at 0, updates keep the current level
+    cursor.execute(f"""
+        INSERT INTO {table} AS t (
+            id, product_id, sku, name, price, attributes, is_active, stock, low_stock_alert_sent,
+            created_at, updated_at
+        )
+        SELECT
+            gen_random_uuid(), p.id, s.sku, s.name, s.price::numeric,
+            COALESCE(NULLIF(s.attributes, '')::jsonb, '{{}}'), COALESCE(NULLIF(s.is_active, '')::boolean, true),
+            0, false, now(), now()
+        FROM {_latest('import_variants', 'sku')} s
+        JOIN {products} p ON p.sku = s.product_sku
+        ON CONFLICT (sku) DO UPDATE SET
+            product_id = EXCLUDED.product_id, name = EXCLUDED.name, price = EXCLUDED.price,
+            attributes = EXCLUDED.attributes, is_active = EXCLUDED.is_active, updated_at = EXCLUDED.updated_at
+        WHERE (t.product_id, t.name, t.price, t.attributes, t.is_active)
+            IS DISTINCT FROM
+              (EXCLUDED.product_id, EXCLUDED.name, EXCLUDED.price, EXCLUDED.attributes, EXCLUDED.is_active)
+    """)
+    written = cursor.rowcount
+    cursor.execute(f"""
+        SELECT count(*) FROM {_latest('import_variants', 'sku')} s
+        WHERE NOT EXISTS (SELECT 1 FROM {products} p WHERE p.sku = s.product_sku)
+    """)
+    skipped = cursor.fetchone()[0]
+    # One UPDATE for every product the feed mentions and every product a variant moved away from
+    refresh_variant_stats(Product.objects.filter(
+        Q(sku__in=RawSQL('SELECT product_sku FROM import_variants', ()))
+        | Q(pk__in=RawSQL('SELECT product_id FROM import_previous_products', ())),
+    ))
+    return written, skipped
+
+
+def _insert_links(cursor):
+    through = Product.categories.through
+    product_column = through._meta.get_field('product').column
+    category_column = through._meta.get_field('category').column
+    products = Product._meta.db_table
+    cursor.execute(f"""
+        WITH inserted AS (
+            INSERT INTO {through._meta.db_table} ({product_column}, {category_column})
+            SELECT DISTINCT p.id, c.id
+            FROM import_links s
+            JOIN {products} p ON p.sku = s.product_sku
+            JOIN {Category._meta.db_table} c ON c.slug = s.category_slug
+            ON CONFLICT DO NOTHING
+            RETURNING {product_column}
+        ), touched AS (
+            -- link changes invalidate product validators, as products.signals does
+            UPDATE {products} SET updated_at = now()
+            WHERE id IN (SELECT {product_column} FROM inserted)
+            RETURNING 1
+        )
+        SELECT (SELECT count(*) FROM inserted), (SELECT count(*) FROM touched)
+    """)
+    written = cursor.fetchone()[0]
+    cursor.execute(f"""
+        SELECT count(*) FROM import_links s
+        WHERE NOT EXISTS (SELECT 1 FROM {products} p WHERE p.sku = s.product_sku)
+           OR NOT EXISTS (SELECT 1 FROM {Category._meta.db_table} c WHERE c.slug = s.category_slug)
+    """)
+    return written, cursor.fetchone()[0]
+
+
+FEEDS = {
+    'products': ('import_products', PRODUCT_COLUMNS, _prepare_product, _upsert_products),
+    'variants': ('import_variants', VARIANT_COLUMNS, _prepare_variant, _upsert_variants),
+    'links': ('import_links', LINK_COLUMNS, _prepare_link, _insert_links),
+}
+
+
+def import_feed(feed, records):
+    """Stage ``records`` for ``feed`` and merge them. Must run inside a transaction."""
+    table, columns, prepare, merge = FEEDS[feed]
+    result = ImportResult(feed)
+    started = time.monotonic()
+    with connection.cursor() as cursor:
+        _stage(cursor, table, columns, _csv_lines(records, columns, prepare, result))
+        result.written, result.skipped = merge(cursor)
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,228 @@
+"""Contention-safe stock handling for ``ProductVariant``.
+
+A single-variant decrement is one conditional statement:
+
+    UPDATE product_variants SET stock = stock - q WHERE id = %s AND stock >= q
+
+The row lock taken by the UPDATE serializes concurrent buyers of the same
+variant without a ``SELECT ... FOR UPDATE`` round trip, and the ``WHERE``
+clause makes overselling impossible: a decrement either applies in full or
+touches no row. Multi-variant operations lock all rows with one
+``SELECT ... ORDER BY id FOR UPDATE`` (so two carts containing the same
+variants can never deadlock), check the levels and apply every line with one
+``UPDATE ... CASE``: two queries whatever the number of lines.
+
+Variants switched to hot mode keep their live level in Valkey instead; see
+``products.hot_inventory``. Callers do not need to know which mode a variant
+is in. Hot membership is read before the row locks, and ``enable()`` switches
+a variant while holding its row lock, so a database change re-checks it once
+the rows are locked and retries through Valkey if a variant was switched in
+the meantime.
+
+Reservations hold units for a cart for ``RESERVATION_TTL``. Reserved units are
+subtracted from ``stock`` immediately; expired reservations are returned by
+``release_expired`` (run periodically by Celery), and placing the order
+consumes them.
+"""
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import hot_inventory
+from .models import ProductVariant, StockReservation
+
+RESERVATION_TTL = timedelta(minutes=15)
+LOW_STOCK_THRESHOLD = 5
+
+
+class OutOfStock(Exception):
+    """Raised when at least one variant cannot cover the requested quantity."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages  # {variant_id: requested quantity}
+        super().__init__(f"Insufficient stock for {len(shortages)} variant(s).")
+
+
+class _SwitchedToHot(Exception):
+    """A variant changed in the database was switched to hot mode while we waited for its row lock."""
+
+    def __init__(self, variant_ids):
+        self.variant_ids = variant_ids
+
+
+def _merge(items):
+    """Sum ``(variant_id, quantity)`` pairs per variant, in lock order (ascending id)."""
+    totals = Counter()
+    for variant_id, quantity in items:
+        if quantity <= 0:
+            raise ValueError('Quantities must be positive.')
+        totals[uuid.UUID(str(variant_id))] += quantity
+    return sorted(totals.items())
+
+
+def _lock(merged):
+    """Lock the variant rows of ``merged`` in id order; return their current stock."""
+    return dict(
+        ProductVariant.objects.filter(pk__in=[variant_id for variant_id, _ in merged])
+        .order_by('pk').select_for_update().values_list('pk', 'stock')
+    )
+
+
+def _per_variant(merged):
+    return Case(*(When(pk=variant_id, then=Value(quantity)) for variant_id, quantity in merged))
+
+
+def _db_decrement(merged):
+    """Decrement ``merged`` in the database; return shortages (nothing applied unless empty)."""
+    if len(merged) == 1:
+        (variant_id, quantity), = merged
+        updated = ProductVariant.objects.filter(pk=variant_id, stock__gte=quantity).update(
+            stock=F('stock') - quantity,
+        )
+        return {} if updated else {variant_id: quantity}
+    if not merged:
+        return {}
+    # Multi-line orders: one ordered lock query and one UPDATE, whatever the line count
+    stock = _lock(merged)
+    shortages = {
+        variant_id: quantity for variant_id, quantity in merged if stock.get(variant_id, 0) < quantity
+    }
+    if not shortages:
+        ProductVariant.objects.filter(pk__in=stock).update(stock=F('stock') - _per_variant(merged))
+    return shortages
+
+
+def _db_restock(merged):
+    if len(merged) > 1:
+        _lock(merged)
+    if merged:
+        ProductVariant.objects.filter(pk__in=[variant_id for variant_id, _ in merged]).update(
+            stock=F('stock') + _per_variant(merged),
+        )
+
+
+def _check_still_cold(cold):
+    """Raise ``_SwitchedToHot`` if a variant of ``cold`` (rows locked by us) turned hot since ``hot_ids()``."""
+    switched = hot_inventory.hot_ids(variant_id for variant_id, _ in cold)
+    if switched:
+        raise _SwitchedToHot(switched)
+
+
+def _with_hot_retry(apply, merged):
+    """Run ``apply(merged, hot)`` in a savepoint; start over with the new hot set if ``enable()`` got in between."""
+    hot = hot_inventory.hot_ids(variant_id for variant_id, _ in merged)
+    while True:
+        try:
+            with transaction.atomic():
+                return apply(merged, hot)
+        except _SwitchedToHot as exc:
+            hot |= exc.variant_ids
+
+
+def _decrement(merged, hot):
+    cold = [item for item in merged if item[0] not in hot]
+    shortages = _db_decrement(cold)
+    if cold:
+        _check_still_cold(cold)
+    if not shortages and hot:
+        wanted = {variant_id: quantity for variant_id, quantity in merged if variant_id in hot}
+        shortages, fallback = hot_inventory.adjust({variant_id: -q for variant_id, q in wanted.items()})
+        if not shortages and fallback:
+            shortages = _db_decrement([(variant_id, wanted[variant_id]) for variant_id in fallback])
+            if shortages:
+                # Undo the hot part; the database part rolls back with the exception
+                hot_inventory.adjust({v: q for v, q in wanted.items() if v not in fallback})
+    if shortages:
+        # Roll back the decrements that did succeed
+        raise OutOfStock(shortages)
+
+
+def _restock(merged, hot):
+    cold = [item for item in merged if item[0] not in hot]
+    _db_restock(cold)
+    if cold:
+        _check_still_cold(cold)
+    if hot:
+        wanted = {variant_id: quantity for variant_id, quantity in merged if variant_id in hot}
+        _, fallback = hot_inventory.adjust(wanted)
+        _db_restock([(variant_id, wanted[variant_id]) for variant_id in fallback])
+
+
+def decrement_stock(items):
+    """Atomically take ``items`` out of stock or raise ``OutOfStock`` and change nothing.
+
+    Variants in hot mode (``products.hot_inventory``) are decremented in
+    Valkey after the database part succeeded, so a shortage anywhere leaves
+    both untouched.
+    """
+    _with_hot_retry(_decrement, _merge(items))
+
+
+def restock(items):
+    _with_hot_retry(_restock, _merge(items))
+
+
+def reserve(cart_key, items, ttl=RESERVATION_TTL):
+    """Hold ``items`` for ``cart_key`` until ``now + ttl``; raises ``OutOfStock``."""
+    expires_at = timezone.now() + ttl
+    with transaction.atomic():
+        merged = _merge(items)
+        decrement_stock(merged)
+        return StockReservation.objects.bulk_create(
+            StockReservation(variant_id=variant_id, cart_key=cart_key, quantity=quantity, expires_at=expires_at)
+            for variant_id, quantity in merged
+        )
+
+
+def _take(reservations):
+    """Delete ``reservations`` nobody else is processing; return their units per variant."""
+    rows = list(reservations.select_for_update(skip_locked=True).values_list('pk', 'variant_id', 'quantity'))
+    if not rows:
+        return Counter()
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+    held = Counter()
+    for _, variant_id, quantity in rows:
+        held[variant_id] += quantity
+    return held
+
+
+def release(reservations):
+    """Return the units of ``reservations`` to stock. Safe to run concurrently."""
+    with transaction.atomic():
+        held = _take(reservations)
+        if held:
+            restock(held.items())
+        return sum(held.values())
+
+
+def release_cart(cart_key):
+    return release(StockReservation.objects.filter(cart_key=cart_key))
+
+
+def release_expired(now=None):
+    return release(StockReservation.objects.filter(expires_at__lte=now or timezone.now()))
+
+
+def commit_order_stock(items, cart_key=None):
+    """Take stock for an order, using the cart's live reservations first.
+
+    Reserved units cover what they can, surplus reservations go back to
+    stock, and the remainder is decremented directly.
+    """
+    with transaction.atomic():
+        held = Counter()
+        if cart_key:
+            held = _take(StockReservation.objects.filter(cart_key=cart_key, expires_at__gt=timezone.now()))
+        needed = Counter()
+        for variant_id, quantity in _merge(items):
+            needed[variant_id] = quantity
+        surplus = held - needed
+        remainder = needed - held
+        if surplus:
+            restock(surplus.items())
+        if remainder:
+            decrement_stock(remainder.items())
@@ -0,0 +1,93 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from products import hot_inventory, inventory
+from products.models import Product, ProductVariant
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one hot variant with concurrent stock decrements, in database-only and/or Valkey (hot) "
+        "mode, and report throughput and whether anything was oversold. Fixture rows are committed "
+        "(threads need their own connections) and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=('db', 'hot', 'both'), default='both')
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=200, help='Decrement attempts per thread.')
+        parser.add_argument('--stock', type=int, default=1000, help='Initial stock of the hot variant.')
+        parser.add_argument('--quantity', type=int, default=1, help='Units per decrement.')
+
+    def handle(self, *args, **options):
+        modes = ('db', 'hot') if options['mode'] == 'both' else (options['mode'],)
+        for mode in modes:
+            self.bench(mode, options)
+
+    def bench(self, mode, options):
+        tag = uuid.uuid4().hex[:8]
+        product = Product.objects.create(
+            name=f'Inventory benchmark {tag}', slug=f'inventory-bench-{tag}', description='d',
+            short_description='s', sku=f'INV-BENCH-{tag}', price=Decimal('10.00'),
+        )
+        variant = ProductVariant.objects.create(
+            product=product, name='Hot', sku=f'INV-BENCH-{tag}-HOT', price=Decimal('10.00'), stock=options['stock'],
+        )
+        try:
+            with override_settings(INVENTORY_HOT_MODE=mode == 'hot'):
+                if mode == 'hot':
+                    hot_inventory.enable([variant.pk])
+                try:
+                    sold, rejected, elapsed = self.run(variant.pk, options)
+                finally:
+                    if mode == 'hot':
+                        hot_inventory.disable([variant.pk])  # applies the journal
+            variant.refresh_from_db(fields=['stock'])
+        finally:
+            product.delete()
+
+        attempts = options['threads'] * options['attempts']
+        self.stdout.write(
+            f"[{mode}] {attempts} attempts from {options['threads']} threads in {elapsed:.2f}s "
+            f"({attempts / elapsed:.0f} ops/s): {sold} sold, {rejected} rejected"
+        )
+        expected = options['stock'] - sold * options['quantity']
+        if variant.stock == expected and variant.stock >= 0:
+            self.stdout.write(self.style.SUCCESS(f"[{mode}] No oversell: {variant.stock} units left."))
+        else:
+            self.stderr.write(self.style.ERROR(f"[{mode}] Stock mismatch: {variant.stock} left, expected {expected}."))
+
+    def run(self, variant_id, options):
+        results = {'sold': 0, 'rejected': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(options['threads'])
+
+        def worker():
+            sold = rejected = 0
+            try:
+                start.wait()
+                for _ in range(options['attempts']):
+                    try:
+                        inventory.decrement_stock([(variant_id, options['quantity'])])
+                        sold += 1
+                    except inventory.OutOfStock:
+                        rejected += 1
+            finally:
+                connection.close()
+                with lock:
+                    results['sold'] += sold
+                    results['rejected'] += rejected
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results['sold'], results['rejected'], time.perf_counter() - started
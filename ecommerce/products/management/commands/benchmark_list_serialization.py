@@ -0,0 +1,86 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce.serialization import flat_plan, serialize_rows
+from payments.models import Payment
+from payments.serializers import PaymentSerializer
+from products.models import Product
+from products.serializers import ProductListSerializer
+from users.serializers import UserSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the regular DRF list serialization with the values()-based fast path for products, "
+        "payments and users. Fixture rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='20,100', help='Comma-separated page sizes.')
+        parser.add_argument('--repeat', type=int, default=200, help='Timed runs per measurement.')
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        try:
+            with transaction.atomic():
+                self.create_fixtures(max(page_sizes))
+                cases = [
+                    ('products', Product.objects.order_by('-created_at', 'id'), ProductListSerializer),
+                    ('payments', Payment.objects.order_by('-created_at', 'id'), PaymentSerializer),
+                    ('users', get_user_model().objects.order_by('username'), UserSerializer),
+                ]
+                self.stdout.write(f"{'endpoint':<10}{'page':>6}{'drf (ms)':>12}{'fast (ms)':>12}{'speedup':>10}")
+                for name, queryset, serializer_class in cases:
+                    for size in page_sizes:
+                        slow = self.measure(lambda: self.regular(queryset, serializer_class, size), options['repeat'])
+                        fast = self.measure(lambda: self.fast(queryset, serializer_class, size), options['repeat'])
+                        self.stdout.write(f"{name:<10}{size:>6}{slow:>12.3f}{fast:>12.3f}{slow / fast:>9.1f}x")
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixtures(self, count):
+        Product.objects.bulk_create(
+            Product(
+                name=f'Benchmark product {i}', slug=f'bench-product-{i}', description='d' * 200,
+                short_description='Short description', sku=f'BENCH-{i}', price=Decimal('19.99') + i,
+                min_variant_price=Decimal('9.99'), max_variant_price=Decimal('29.99'), active_variant_count=3,
+            )
+            for i in range(count)
+        )
+        Payment.objects.bulk_create(
+            Payment(gateway='stripe', amount=Decimal('10.00') + i, reference=f'bench-{i}') for i in range(count)
+        )
+        get_user_model().objects.bulk_create(
+            get_user_model()(
+                username=f'bench-user-{i}', email=f'bench{i}@example.com', first_name='Bench', last_name=str(i),
+            )
+            for i in range(count)
+        )
+
+    def regular(self, queryset, serializer_class, size):
+        return JSONRenderer().render(serializer_class(list(queryset[:size]), many=True).data)
+
+    def fast(self, queryset, serializer_class, size):
+        plan = flat_plan(serializer_class())
+        rows = queryset.values(*[source for _, source, _ in plan])[:size]
+        return JSONRenderer().render(serialize_rows(plan, rows))
+
+    def measure(self, func, repeat):
+        func()  # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
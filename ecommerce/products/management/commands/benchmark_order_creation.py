@@ -0,0 +1,76 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from products.models import Product, ProductVariant
+from products.serializers import OrderCreateSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and latency of OrderCreateSerializer (validate + save) against the number of "
+        "order lines. Fixture rows and orders are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', default='1,10,100', help='Comma-separated line counts.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed orders per line count.')
+
+    def handle(self, *args, **options):
+        line_counts = [int(count) for count in options['lines'].split(',')]
+        try:
+            with transaction.atomic():
+                user, variants = self.create_fixtures(max(line_counts))
+                self.stdout.write(f"{'lines':>6}{'queries':>10}{'median (ms)':>14}")
+                for count in line_counts:
+                    payload = self.payload(variants[:count])
+                    with CaptureQueriesContext(connection) as queries:
+                        self.place(user, payload)
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        self.place(user, payload)
+                        timings.append(time.perf_counter() - started)
+                    median = statistics.median(timings) * 1000
+                    self.stdout.write(f"{count:>6}{len(queries):>10}{median:>14.2f}")
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_fixtures(self, count):
+        user = get_user_model().objects.create_user(username='bench-order-user', email='bench-order@example.com')
+        product = Product.objects.create(
+            name='Benchmark order product', slug='bench-order-product', description='d', short_description='s',
+            sku='BENCH-ORDER', price=Decimal('5.00'),
+        )
+        variants = ProductVariant.objects.bulk_create(
+            ProductVariant(
+                product=product, name=f'Variant {i}', sku=f'BENCH-ORDER-{i}', price=Decimal('5.00') + i,
+                stock=1_000_000,
+            )
+            for i in range(count)
+        )
+        return user, variants
+
+    def payload(self, variants):
+        address = {'line1': '1 Bench Street', 'city': 'Nairobi'}
+        return {
+            'billing_first_name': 'Bench', 'billing_last_name': 'Mark',
+            'billing_email': 'bench@example.com', 'billing_phone': '555', 'billing_address': address,
+            'shipping_first_name': 'Bench', 'shipping_last_name': 'Mark', 'shipping_address': address,
+            'items': [{'product_variant': str(variant.pk), 'quantity': 2} for variant in variants],
+        }
+
+    def place(self, user, payload):
+        serializer = OrderCreateSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save(user=user)
@@ -0,0 +1,111 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from products import order_numbers
+from products.models import Order, OrderItem, Product, ProductVariant
+from products.views_api import OrderViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the first and the deepest page of /api/orders/ for customers with growing order counts. "
+        "Fixture rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', default='10,1000,10000', help='Comma-separated orders per customer.')
+        parser.add_argument('--items', type=int, default=3, help='Lines per order.')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed requests per page.')
+
+    def handle(self, *args, **options):
+        counts = [int(count) for count in options['orders'].split(',')]
+        view = OrderViewSet.as_view({'get': 'list'})
+        try:
+            with transaction.atomic():
+                variants = self.create_variants(options['items'])
+                customers = [(count, self.create_customer(count, variants)) for count in counts]
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE orders, order_items')
+                self.stdout.write(f"{'orders':>8}{'pages':>7}{'queries':>9}{'first (ms)':>12}{'deepest (ms)':>14}")
+                for count, user in customers:
+                    first_url, last_url, pages = self.walk(view, user)
+                    with CaptureQueriesContext(connection) as queries:
+                        self.get(view, user, last_url)
+                    first = self.measure(lambda: self.get(view, user, first_url), options['repeat'])
+                    deepest = self.measure(lambda: self.get(view, user, last_url), options['repeat'])
+                    self.stdout.write(f"{count:>8}{pages:>7}{len(queries):>9}{first:>12.2f}{deepest:>14.2f}")
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_variants(self, count):
+        product = Product.objects.create(
+            name='Benchmark history product', slug='bench-history-product', description='d',
+            short_description='s', sku='BENCH-HISTORY', price=Decimal('5.00'),
+        )
+        return ProductVariant.objects.bulk_create(
+            ProductVariant(product=product, name=f'Variant {i}', sku=f'BENCH-HISTORY-{i}', price=Decimal('5.00'))
+            for i in range(count)
+        )
+
+    def create_customer(self, count, variants):
+        user = get_user_model().objects.create_user(
+            username=f'bench-history-{count}', email=f'bench-history-{count}@example.com',
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                order_number=order_numbers.generate(), user=user, total_amount=Decimal('15.00'),
+                billing_first_name='Bench', billing_last_name='Mark', billing_email='bench@example.com',
+                billing_phone='555', billing_address={}, shipping_first_name='Bench', shipping_last_name='Mark',
+                shipping_address={},
+            )
+            for _ in range(count)
+        )
+        with connection.cursor() as cursor:
+            # Spread the history over three years
+            cursor.execute(
+                "UPDATE orders SET created_at = now() - random() * interval '3 years' WHERE user_id = %s",
+                [user.pk],
+            )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product_variant=variant, quantity=3, unit_price=Decimal('5.00'),
+                      total_price=Decimal('15.00'))
+            for order in orders for variant in variants
+        )
+        return user
+
+    def get(self, view, user, url):
+        request = APIRequestFactory().get(url, HTTP_HOST=(settings.ALLOWED_HOSTS or ['localhost'])[0].lstrip('.'))
+        force_authenticate(request, user)
+        response = view(request)
+        response.render()
+        return response
+
+    def walk(self, view, user):
+        first = url = '/api/orders/?page_size=20'
+        pages = 0
+        while url:
+            last, pages = url, pages + 1
+            url = self.get(view, user, url).data['next']
+        return first, last, pages
+
+    def measure(self, func, repeat):
+        func()  # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
@@ -0,0 +1,134 @@
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from products import partitioning
+from products.models import Order, OrderItem, Product, ProductVariant
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one-month queries on orders and order_items before and after monthly partitioning, "
+        "and show how many partitions each query reads. Fixture rows and the conversion itself "
+        "happen in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200000, help='Orders spread over --months.')
+        parser.add_argument('--months', type=int, default=24, help='Months of history.')
+        parser.add_argument('--items', type=int, default=3, help='Lines per order.')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query.')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            if partitioning.is_partitioned(cursor, Order._meta.db_table):
+                raise CommandError("orders is already partitioned; run this against an unpartitioned database.")
+        now = datetime.now(timezone.utc)
+        month = partitioning.add_months(partitioning.month_start(now), -(options['months'] // 2))
+        end = partitioning.add_months(month, 1)
+        queries = {
+            'orders: revenue by status': lambda: list(
+                Order.objects.filter(created_at__gte=month, created_at__lt=end).order_by()
+                .values('status').annotate(orders=Count('id'), revenue=Sum('total_amount'))
+            ),
+            'order_items: units by variant': lambda: list(
+                OrderItem.objects.filter(created_at__gte=month, created_at__lt=end).order_by()
+                .values('product_variant').annotate(units=Sum('quantity'))
+            ),
+        }
+        try:
+            with transaction.atomic():
+                self.create_history(options['orders'], options['months'], options['items'], now)
+                self.stdout.write(f"{options['orders']} orders over {options['months']} months; querying {month:%Y-%m}")
+                before = self.run(queries, options['repeat'])
+                partitioning.convert(now=now)
+                after = self.run(queries, options['repeat'])
+                self.stdout.write(
+                    f"{'query':<32}{'before (ms)':>12}{'tables':>8}{'after (ms)':>12}{'partitions':>12}"
+                )
+                for label in queries:
+                    (slow, read_before), (fast, read_after) = before[label], after[label]
+                    self.stdout.write(f"{label:<32}{slow:>12.2f}{len(read_before):>8}{fast:>12.2f}{len(read_after):>12}")
+                    self.stdout.write(f"  after reads: {', '.join(sorted(read_after))}")
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_history(self, count, months, items, now):
+        user = get_user_model().objects.create_user(username='bench-partitions', email='bench-partitions@example.com')
+        product = Product.objects.create(
+            name='Benchmark partition product', slug='bench-partition-product', description='d',
+            short_description='s', sku='BENCH-PARTITION', price=Decimal('5.00'),
+        )
+        variants = ProductVariant.objects.bulk_create(
+            ProductVariant(product=product, name=f'Variant {i}', sku=f'BENCH-PARTITION-{i}', price=Decimal('5.00'))
+            for i in range(10)
+        )
+        with connection.cursor() as cursor:
+            # Generated server-side: the point is the volume, not the ORM insert path
+            cursor.execute("""
+                INSERT INTO orders (id, order_number, user_id, status, total_amount, tax_amount, shipping_amount,
+                    discount_amount, billing_first_name, billing_last_name, billing_email, billing_phone,
+                    billing_address, shipping_first_name, shipping_last_name, shipping_address, notes,
+                    created_at, updated_at)
+                SELECT gen_random_uuid(), 'BENCH-PART-' || i, %s,
+                    (ARRAY['pending', 'confirmed', 'shipped', 'delivered', 'cancelled'])[1 + i %% 5],
+                    15, 0, 0, 0, 'Bench', 'Mark', 'bench@example.com', '555', '{}', 'Bench', 'Mark', '{}', '',
+                    t, t
+                FROM (SELECT i, %s - random() * (%s * interval '1 month') AS t
+                      FROM generate_series(1, %s) AS i) AS history
+            """, [user.pk, now, months, count])
+            cursor.execute("""
+                INSERT INTO order_items (id, order_id, product_variant_id, quantity, unit_price, total_price, created_at)
+                SELECT gen_random_uuid(), o.id, (%s::uuid[])[1 + (abs(hashtext(o.order_number)) + line) %% %s],
+                    3, 5, 15, o.created_at
+                FROM orders o CROSS JOIN generate_series(1, %s) AS line
+                WHERE o.user_id = %s
+            """, [[str(variant.pk) for variant in variants], len(variants), items, user.pk])
+
+    def run(self, queries, repeat):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE orders, order_items')
+        return {label: (self.measure(query, repeat), self.tables_read(query)) for label, query in queries.items()}
+
+    def tables_read(self, query):
+        """Tables the planner keeps in the plan of ``query`` (pruned partitions do not appear)."""
+        with connection.execute_wrapper(self.capture):
+            self.sql = None
+            query()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {self.sql}', self.params)
+            plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        tables = set()
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if 'Relation Name' in node:
+                tables.add(node['Relation Name'])
+            nodes += node.get('Plans', [])
+        return tables
+
+    def capture(self, execute, sql, params, many, context):
+        self.sql, self.params = sql, params
+        return execute(sql, params, many, context)
+
+    def measure(self, func, repeat):
+        func()  # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
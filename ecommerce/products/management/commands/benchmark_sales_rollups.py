@@ -0,0 +1,131 @@
+import statistics
+import time
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from products import sales
+from products.models import Category, DailyCategorySales, OrderItem, Product, ProductVariant
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare a 30-day revenue-by-category dashboard query on raw order lines with the same report read "
+        "from the sales rollups, and time the full build and an incremental refresh after late status changes. "
+        "Fixture rows are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=100000, help='Orders spread over --days.')
+        parser.add_argument('--days', type=int, default=30, help='Days of history.')
+        parser.add_argument('--items', type=int, default=3, help='Lines per order.')
+        parser.add_argument('--changed', type=int, default=500, help='Orders cancelled before the incremental refresh.')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per dashboard query.')
+
+    def handle(self, *args, **options):
+        end = timezone.localdate() + timedelta(days=1)
+        start = end - timedelta(days=options['days'])
+        since, until = (timezone.make_aware(datetime.combine(day, day_time.min)) for day in (start, end))
+
+        def raw():
+            return list(
+                OrderItem.objects.filter(order__created_at__gte=since, order__created_at__lt=until)
+                .annotate(day=TruncDate('order__created_at'), category=F('product_variant__product__categories'),
+                          status=F('order__status'))
+                .values('day', 'category', 'status')
+                .annotate(lines=Count('id'), units=Sum('quantity'), revenue=Sum('total_price')).order_by()
+            )
+
+        def rollup():
+            return sales.report('day', start, end, ['category', 'status'])
+
+        try:
+            with transaction.atomic():
+                self.create_history(options['orders'], options['days'], options['items'])
+                started = time.perf_counter()
+                hours = sales.rebuild()
+                build = time.perf_counter() - started
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE orders SET status = 'cancelled', updated_at = clock_timestamp() "
+                        "WHERE id IN (SELECT id FROM orders ORDER BY random() LIMIT %s)",
+                        [options['changed']],
+                    )
+                    cursor.execute('ANALYZE orders, order_items, sales_hourly_variant, sales_daily_category')
+                started = time.perf_counter()
+                refreshed = sales.refresh()
+                refresh = time.perf_counter() - started
+                self.stdout.write(
+                    f"{options['orders']} orders, {OrderItem.objects.count()} lines over {options['days']} days"
+                )
+                self.stdout.write(f"Full build: {hours} hours in {build:.2f} s")
+                self.stdout.write(
+                    f"Refresh after {options['changed']} late cancellations: {refreshed} hours in {refresh:.2f} s"
+                )
+                raw_rows = OrderItem.objects.filter(order__created_at__gte=since, order__created_at__lt=until).count()
+                rollup_rows = DailyCategorySales.objects.filter(day__gte=start, day__lt=end).count()
+                self.stdout.write(f"{'30-day revenue by category':<28}{'rows read':>11}{'result rows':>13}{'median (ms)':>13}")
+                for label, query, read in (('raw order lines', raw, raw_rows), ('rollups', rollup, rollup_rows)):
+                    self.stdout.write(
+                        f"{label:<28}{read:>11}{len(query()):>13}{self.measure(query, options['repeat']):>13.2f}"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_history(self, count, days, items):
+        user = get_user_model().objects.create_user(username='bench-sales', email='bench-sales@example.com')
+        categories = Category.objects.bulk_create(
+            Category(name=f'Bench sales {i}', slug=f'bench-sales-{i}') for i in range(10)
+        )
+        variants = []
+        for i in range(25):
+            product = Product.objects.create(
+                name=f'Benchmark sales product {i}', slug=f'bench-sales-product-{i}', description='d',
+                short_description='s', sku=f'BENCH-SALES-{i}', price=Decimal('5.00'),
+            )
+            product.categories.set([categories[i % 10], categories[(i + 3) % 10]])
+            variants += ProductVariant.objects.bulk_create(
+                ProductVariant(product=product, name=f'Variant {j}', sku=f'BENCH-SALES-{i}-{j}', price=Decimal('5.00'))
+                for j in range(4)
+            )
+        with connection.cursor() as cursor:
+            # Generated server-side: the point is the volume, not the ORM insert path
+            cursor.execute("""
+                INSERT INTO orders (id, order_number, user_id, status, total_amount, tax_amount, shipping_amount,
+                    discount_amount, billing_first_name, billing_last_name, billing_email, billing_phone,
+                    billing_address, shipping_first_name, shipping_last_name, shipping_address, notes,
+                    created_at, updated_at)
+                SELECT gen_random_uuid(), 'BENCH-SALES-' || i, %s,
+                    (ARRAY['pending', 'confirmed', 'shipped', 'delivered'])[1 + i %% 4],
+                    15, 0, 0, 0, 'Bench', 'Mark', 'bench@example.com', '555', '{}', 'Bench', 'Mark', '{}', '',
+                    t, t
+                FROM (SELECT i, now() - random() * (%s * interval '1 day') AS t
+                      FROM generate_series(1, %s) AS i) AS history
+            """, [user.pk, days, count])
+            cursor.execute("""
+                INSERT INTO order_items (id, order_id, product_variant_id, quantity, unit_price, total_price, created_at)
+                SELECT gen_random_uuid(), o.id, (%s::uuid[])[1 + (abs(hashtext(o.order_number)) + line) %% %s],
+                    1 + line %% 3, 5, 5 * (1 + line %% 3), o.created_at
+                FROM orders o CROSS JOIN generate_series(1, %s) AS line
+                WHERE o.user_id = %s
+            """, [[str(variant.pk) for variant in variants], len(variants), items, user.pk])
+
+    def measure(self, func, repeat):
+        func()  # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
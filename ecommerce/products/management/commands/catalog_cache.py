@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from products import cache as catalog_cache
+
+
+class Command(BaseCommand):
+    help = "Show catalog cache hit/miss counters and generation. Use --bump to invalidate all catalog entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bump', action='store_true', help='Increment the catalog generation (invalidates every entry).')
+        parser.add_argument('--reset-stats', action='store_true', help='Zero the hit/miss counters.')
+
+    def handle(self, *args, **options):
+        if options['bump']:
+            version = catalog_cache.bump_version()
+            self.stdout.write(self.style.SUCCESS(f"Catalog generation bumped to {version}."))
+        if options['reset_stats']:
+            catalog_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Hit/miss counters reset."))
+        stats = catalog_cache.get_stats()
+        rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else 'n/a'
+        self.stdout.write(f"Generation: {stats['version']}")
+        self.stdout.write(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {rate}")
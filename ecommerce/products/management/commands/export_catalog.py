@@ -0,0 +1,39 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.export import DEFAULT_CHUNK_SIZE, FORMATS, export_catalog
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Stream the full catalog (products with variants and category slugs) as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--output', default='-', help="Target file ('-' for stdout). A .gz suffix implies --gzip.")
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output.')
+        parser.add_argument('--active-only', action='store_true', help='Skip inactive products.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Products fetched per round trip.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size must be positive.')
+        queryset = Product.objects.all()
+        if options['active_only']:
+            queryset = queryset.filter(is_active=True)
+        path = options['output']
+        compress = options['gzip'] or path.endswith('.gz')
+        started = time.monotonic()
+        written = 0
+        target = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            for chunk in export_catalog(queryset, options['format'], options['chunk_size'], compress):
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+        elapsed = time.monotonic() - started
+        self.stderr.write(f"Exported {written:,} bytes in {elapsed:.1f}s.")
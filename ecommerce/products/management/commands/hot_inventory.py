@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from products import hot_inventory
+from products.models import HotStockSync, ProductVariant
+
+
+class Command(BaseCommand):
+    help = (
+        "Move flash-sale variants' stock into Valkey counters (enable), back to the database (disable), "
+        "apply pending journal entries (reconcile) or show counters and journal backlog (status)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('enable', 'disable', 'reconcile', 'status'))
+        parser.add_argument('skus', nargs='*', help='Variant SKUs (enable/disable/status).')
+
+    def handle(self, *args, **options):
+        action, skus = options['action'], options['skus']
+        variants = dict(ProductVariant.objects.filter(sku__in=skus).values_list('sku', 'pk'))
+        unknown = sorted(set(skus) - set(variants))
+        if unknown:
+            raise CommandError(f"Unknown variant SKU(s): {', '.join(unknown)}")
+        if action in ('enable', 'disable') and not skus:
+            raise CommandError(f"'{action}' needs at least one SKU.")
+
+        if action == 'enable':
+            if not settings.INVENTORY_HOT_MODE:
+                raise CommandError("Set INVENTORY_HOT_MODE=true first; otherwise checkouts ignore the counters.")
+            enabled = hot_inventory.enable(variants.values())
+            self.stdout.write(self.style.SUCCESS(f"{len(enabled)} of {len(variants)} variant(s) switched to Valkey."))
+        elif action == 'disable':
+            applied = hot_inventory.disable(variants.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(variants)} variant(s) back on database stock; {applied} journal entries applied."
+            ))
+        elif action == 'reconcile':
+            applied = hot_inventory.reconcile(limit=None)
+            self.stdout.write(self.style.SUCCESS(f"{applied} journal entries applied."))
+
+        if action == 'status' or action == 'enable':
+            mark = HotStockSync.objects.filter(pk=hot_inventory.SYNC_NAME).first()
+            self.stdout.write(
+                f"Journal backlog: {hot_inventory.journal_length()}  "
+                f"Applied through seq {mark.applied_seq if mark else 0}"
+            )
+            levels = hot_inventory.levels(variants.values())
+            stock = dict(ProductVariant.objects.filter(pk__in=variants.values()).values_list('pk', 'stock'))
+            for sku, variant_id in sorted(variants.items()):
+                level = levels[variant_id]
+                live = 'not hot' if level is None else level
+                self.stdout.write(f"{sku}: valkey={live} database={stock[variant_id]}")
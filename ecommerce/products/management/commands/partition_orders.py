@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from products import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition orders and order_items by month on created_at (convert, run once in a maintenance window), "
+        "pre-create upcoming partitions (ensure), detach old months into the archive schema (archive) "
+        "or list partitions (status)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('convert', 'ensure', 'archive', 'status'))
+        parser.add_argument('--months-ahead', type=int, default=3, help='Future months to create (convert/ensure).')
+        parser.add_argument('--keep-months', type=int, help='Months to keep attached, current one included (archive).')
+        parser.add_argument('--schema', default=partitioning.ARCHIVE_SCHEMA, help='Target schema (archive).')
+
+    def handle(self, *args, **options):
+        action = options['action']
+        with connection.cursor() as cursor:
+            partitioned = all(partitioning.is_partitioned(cursor, table) for table in partitioning.partitioned_tables())
+        if action in ('ensure', 'archive') and not partitioned:
+            raise CommandError("orders and order_items are not partitioned yet; run 'convert' first.")
+
+        if action == 'convert':
+            converted = partitioning.convert(months_ahead=options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Partitioned {', '.join(converted)}." if converted else "Already partitioned."
+            ))
+        elif action == 'ensure':
+            created = partitioning.ensure_partitions(months_ahead=options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS(f"{len(created)} partition(s) created."))
+            for name in created:
+                self.stdout.write(f"  {name}")
+        elif action == 'archive':
+            if not options['keep_months'] or options['keep_months'] < 1:
+                raise CommandError("'archive' needs --keep-months (1 or more).")
+            archived = partitioning.archive_partitions(options['keep_months'], schema=options['schema'])
+            self.stdout.write(self.style.SUCCESS(f"{len(archived)} partition(s) detached and archived."))
+            for name in archived:
+                self.stdout.write(f"  {name}")
+        else:
+            with connection.cursor() as cursor:
+                for table in partitioning.partitioned_tables():
+                    if not partitioning.is_partitioned(cursor, table):
+                        self.stdout.write(f"{table}: not partitioned")
+                        continue
+                    partitions = partitioning.list_partitions(cursor, table)
+                    self.stdout.write(f"{table}: {len(partitions)} partition(s)")
+                    for name, bound in partitions:
+                        cursor.execute(f'SELECT count(*) FROM {name}')
+                        self.stdout.write(f"  {name}: {bound} rows={cursor.fetchone()[0]}")
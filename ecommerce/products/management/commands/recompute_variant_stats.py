@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.cache import bump_version
+from products.models import Product
+from products.variant_stats import refresh_variant_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild Product.min_variant_price / max_variant_price / active_variant_count from active variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Products updated per UPDATE statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        total = 0
+        last_pk = None
+        # Walk the primary key in batches so each UPDATE stays short and locks few rows
+        while True:
+            ids = Product.objects.order_by('pk')
+            if last_pk is not None:
+                ids = ids.filter(pk__gt=last_pk)
+            batch = list(ids.values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            total += refresh_variant_stats(Product.objects.filter(pk__in=batch))
+            last_pk = batch[-1]
+            self.stdout.write(f"{total} products updated...")
+        bump_version()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Recomputed variant stats for {total} products in {elapsed:.1f}s."))
@@ -0,0 +1,55 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from products import inventory
+from products.importer import open_feed
+from products.models import ProductVariant
+
+
+class Command(BaseCommand):
+    help = (
+        "Add units to variants' stock through products.inventory.restock (hot variants included). "
+        "Give SKU=QUANTITY pairs and/or --file with a sku,quantity CSV; everything is applied in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('pairs', nargs='*', metavar='SKU=QUANTITY')
+        parser.add_argument('--file', help='CSV (optionally .gz) with sku and quantity columns.')
+
+    def handle(self, *args, **options):
+        lines = [self.parse_pair(pair) for pair in options['pairs']]
+        if options['file']:
+            with open_feed(options['file']) as handle:
+                lines += [(row.get('sku', ''), row.get('quantity', '')) for row in csv.DictReader(handle)]
+        if not lines:
+            raise CommandError("Nothing to restock; give SKU=QUANTITY pairs or --file.")
+
+        quantities = []
+        for sku, quantity in lines:
+            try:
+                quantity = int(quantity)
+            except ValueError:
+                raise CommandError(f"Quantity for {sku!r} is not a whole number: {quantity!r}")
+            if quantity <= 0:
+                raise CommandError(f"Quantity for {sku!r} must be positive.")
+            quantities.append((sku.strip(), quantity))
+        variants = dict(
+            ProductVariant.objects.filter(sku__in=[sku for sku, _ in quantities]).values_list('sku', 'pk')
+        )
+        unknown = sorted({sku for sku, _ in quantities} - set(variants))
+        if unknown:
+            raise CommandError(f"Unknown variant SKU(s): {', '.join(unknown)}")
+
+        with transaction.atomic():
+            inventory.restock([(variants[sku], quantity) for sku, quantity in quantities])
+        self.stdout.write(self.style.SUCCESS(
+            f"Restocked {sum(quantity for _, quantity in quantities)} unit(s) across {len(variants)} variant(s)."
+        ))
+
+    def parse_pair(self, pair):
+        sku, separator, quantity = pair.rpartition('=')
+        if not separator or not sku:
+            raise CommandError(f"Expected SKU=QUANTITY, got {pair!r}")
+        return sku, quantity
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from products import sales
+from products.models import SalesRollupSync
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold changed orders into the sales rollups (default), or recompute them from scratch "
+        "(--rebuild, optionally from --since) after bulk order updates or deletions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every bucket instead of changed ones.')
+        parser.add_argument('--since', help='Local date (YYYY-MM-DD) to rebuild from (with --rebuild).')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            if not options['rebuild']:
+                raise CommandError("--since only applies to --rebuild.")
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("--since expects a date such as 2026-01-31.")
+        hours = sales.rebuild(since) if options['rebuild'] else sales.refresh()
+        mark = SalesRollupSync.objects.filter(pk=sales.SYNC_NAME).first()
+        self.stdout.write(self.style.SUCCESS(
+            f"{hours} hour bucket(s) recomputed; orders folded in through {mark.high_water if mark else 'never'}."
+        ))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    rows = list(Category.objects.values_list('id', 'parent_id'))
+    children = {}
+    for pk, parent_id in rows:
+        children.setdefault(parent_id, []).append(pk)
+    stack = [(pk, '') for pk in children.get(None, [])]
+    while stack:
+        pk, prefix = stack.pop()
+        path = f'{prefix}{pk.hex}/'
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count('/') - 1)
+        stack.extend((child, path) for child in children.get(pk, []))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_category_productvariant_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='products.category'),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:29
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_variant_stats(apps, schema_editor):
+    # Inlined rather than imported from products.variant_stats so later changes there cannot alter this migration
+    Product = apps.get_model('products', 'Product')
+    ProductVariant = apps.get_model('products', 'ProductVariant')
+    active = ProductVariant.objects.filter(product=OuterRef('pk'), is_active=True).order_by().values('product')
+    Product.objects.update(
+        min_variant_price=Subquery(active.annotate(v=Min('price')).values('v')),
+        max_variant_price=Subquery(active.annotate(v=Max('price')).values('v')),
+        active_variant_count=Coalesce(
+            Subquery(active.annotate(v=Count('pk')).values('v')), Value(0), output_field=IntegerField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='active_variant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='max_variant_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='min_variant_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['min_variant_price', 'id'], name='products_min_var_686328_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['max_variant_price', 'id'], name='products_max_var_6f513d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['active_variant_count', 'id'], name='products_active__dbe12f_idx'),
+        ),
+        migrations.RunPython(backfill_variant_stats, migrations.RunPython.noop),
+    ]
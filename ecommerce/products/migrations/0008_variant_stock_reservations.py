@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:42
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_variant_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productvariant',
+            name='low_stock_alert_sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('cart_key', models.CharField(max_length=64)),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='products.productvariant')),
+            ],
+            options={
+                'db_table': 'stock_reservations',
+                'indexes': [models.Index(fields=['cart_key'], name='stock_reser_cart_ke_c9140c_idx'), models.Index(fields=['expires_at'], name='stock_reser_expires_fdd22d_idx')],
+            },
+        ),
+    ]
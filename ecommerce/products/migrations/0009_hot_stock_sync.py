@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_variant_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotStockSync',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('applied_seq', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'hot_stock_sync',
+            },
+        ),
+    ]
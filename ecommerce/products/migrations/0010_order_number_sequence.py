@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_hot_stock_sync'),
+    ]
+
+    operations = [
+        # Each nextval() reserves a block of 100 order numbers for one process
+        # (products.order_numbers.BLOCK_SIZE).
+        migrations.RunSQL(
+            'CREATE SEQUENCE order_number_seq INCREMENT BY 100 START WITH 1',
+            'DROP SEQUENCE order_number_seq',
+        ),
+    ]
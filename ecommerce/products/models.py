@@ -1,6 +1,9 @@
-from django.db import models
-from django.db.models import JSONField
+from django.db import models, transaction
+from django.db.models import F, Func, JSONField, Value
+from django.db.models.functions import Concat, Substr
 from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.utils import timezone
 import uuid
 from django.contrib.auth import get_user_model
 from users.models import User
@@ -8,20 +11,65 @@ from users.models import User
 user = get_user_model()
 
 class Category(models.Model):
+    PATH_SEPARATOR = '/'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
-    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE)
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='children')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Materialized path: ancestor ids (hex) from the root down to self, e.g. "<root>/<child>/".
+    # Maintained by save(); subtree = path__startswith, ancestors = ids in the path.
+    path = models.CharField(max_length=1000, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     
     class Meta:
         db_table = 'categories'
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['is_active']),
+            GinIndex(fields=['name'], name='categories_name_trgm', opclasses=['gin_trgm_ops']),
         ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        if self.parent_id:
+            parent_path = Category.objects.values_list('path', flat=True).get(pk=self.parent_id)
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError('A category cannot be moved under itself or one of its descendants.')
+            self.path = f'{parent_path}{self.pk.hex}{self.PATH_SEPARATOR}'
+        else:
+            self.path = f'{self.pk.hex}{self.PATH_SEPARATOR}'
+        self.depth = self.path.count(self.PATH_SEPARATOR) - 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'path', 'depth'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.path:
+                # Move: rewrite the whole subtree's prefix in one UPDATE
+                Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                    depth=F('depth') + (self.depth - (old_path.count(self.PATH_SEPARATOR) - 1)),
+                )
+
+    @property
+    def ancestor_ids(self):
+        return [uuid.UUID(part) for part in self.path.split(self.PATH_SEPARATOR)[:-2]]
+
+    def get_ancestors(self):
+        return Category.objects.filter(pk__in=self.ancestor_ids).order_by('depth')
+
+    def get_descendants(self, include_self=False):
+        qs = Category.objects.filter(path__startswith=self.path)
+        return qs if include_self else qs.exclude(pk=self.pk)
+
 class Product(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200)
@@ -39,6 +87,26 @@ class Product(models.Model):
     dimensions = JSONField(default=dict)  # {"length": 10, "width": 5, "height": 3}
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from active variants (see products.variant_stats); NULL/0 when there are none
+    min_variant_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    max_variant_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
+    active_variant_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted full-text document (name > sku > short_description > description),
+    # computed by PostgreSQL on every write so bulk loads stay in sync too.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config='english')
+            # 'HUB-4' would otherwise parse as 'hub' and the signed number '-4'
+            + SearchVector(
+                Func(F('sku'), Value('[^[:alnum:]]+'), Value(' '), Value('g'), function='regexp_replace'),
+                weight='B', config='simple',
+            )
+            + SearchVector('short_description', weight='C', config='english')
+            + SearchVector('description', weight='D', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     class Meta:
         db_table = 'products'
@@ -48,6 +116,18 @@ class Product(models.Model):
             models.Index(fields=['is_active']),
             models.Index(fields=['price']),
             GinIndex(fields=['attributes']),  # For JSON field queries
+            # (sort column, id) pairs back keyset pagination for each ordering field
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['min_variant_price', 'id']),
+            models.Index(fields=['max_variant_price', 'id']),
+            models.Index(fields=['active_variant_count', 'id']),
+            GinIndex(fields=['search_vector']),
+            # pg_trgm indexes for typo-tolerant autocomplete (products.suggest)
+            GinIndex(fields=['name'], name='products_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['sku'], name='products_sku_trgm', opclasses=['gin_trgm_ops']),
         ]
 class ProductVariant(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -57,7 +137,12 @@ class ProductVariant(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     attributes = JSONField(default=dict)  # {"color": "red", "size": "L"}
     is_active = models.BooleanField(default=True)
+    # Units available to sell; only changed through products.inventory (conditional UPDATEs).
+    # save() never writes these two on existing rows (see INVENTORY_FIELDS).
+    stock = models.PositiveIntegerField(default=0)
+    low_stock_alert_sent = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'product_variants'
@@ -68,8 +153,54 @@ class ProductVariant(models.Model):
             GinIndex(fields=['attributes']),
         ]
 
+    # Written by products.inventory / notifications.tasks with UPDATEs; a stale
+    # instance saved from elsewhere (admin edit, loaded-and-saved variant) would
+    # otherwise undo concurrent decrements and reservations.
+    INVENTORY_FIELDS = ('stock', 'low_stock_alert_sent')
+
     def __str__(self):
         return f"{self.product.name} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name not in self.INVENTORY_FIELDS]
+        super().save(*args, **kwargs)
+
+
+class StockReservation(models.Model):
+    """Units held for a cart; already subtracted from ``ProductVariant.stock`` until released or ordered."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    variant = models.ForeignKey(ProductVariant, related_name='reservations', on_delete=models.CASCADE)
+    cart_key = models.CharField(max_length=64)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stock_reservations'
+        indexes = [
+            models.Index(fields=['cart_key']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.variant_id} for {self.cart_key}"
+
+
+class HotStockSync(models.Model):
+    """How far the Valkey stock journal (``products.hot_inventory``) has been applied to ``ProductVariant.stock``."""
+    name = models.CharField(max_length=32, primary_key=True)
+    applied_seq = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'hot_stock_sync'
+
+    def __str__(self):
+        return f"{self.name} @ {self.applied_seq}"
     
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -83,6 +214,10 @@ class Order(models.Model):
     ]
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Once products.partitioning.convert() has run, the database no longer enforces this:
+    # a partitioned table's unique indexes must include created_at, so the index becomes
+    # a plain one. New numbers stay unique through order_number_seq (products.order_numbers);
+    # validate_unique() (admin, forms) still checks with a query.
     order_number = models.CharField(max_length=50, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -114,6 +249,10 @@ class Order(models.Model):
             models.Index(fields=['order_number']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            # Order history: one user's orders newest first, keyset-paginated on (created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='orders_user_created_idx'),
+            # Incremental sales rollups (products.sales) scan orders changed since their high-water mark
+            models.Index(fields=['updated_at'], name='orders_updated_idx'),
         ]
 class OrderItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -122,11 +261,89 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # The order's created_at, so an order and its items share a monthly partition
+    # (products.partitioning); bulk_create() callers copy it themselves
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'order_items'
         indexes = [
             models.Index(fields=['order']),
             models.Index(fields=['product_variant']),
-        ]
\ No newline at end of file
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.order_id:
+            self.created_at = self.order.created_at
+        super().save(*args, **kwargs)
+
+
+class SalesRollup(models.Model):
+    """Order lines of one bucket and order status, maintained by ``products.sales``."""
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    lines = models.PositiveIntegerField(default=0)
+    units = models.PositiveBigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class HourlyVariantSales(SalesRollup):
+    hour = models.DateTimeField()
+    variant = models.ForeignKey(ProductVariant, related_name='+', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'sales_hourly_variant'
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'variant', 'status'], name='sales_hourly_variant_uniq'),
+        ]
+
+
+class DailyVariantSales(SalesRollup):
+    day = models.DateField()
+    variant = models.ForeignKey(ProductVariant, related_name='+', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'sales_daily_variant'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'variant', 'status'], name='sales_daily_variant_uniq'),
+        ]
+
+
+class HourlyCategorySales(SalesRollup):
+    """A line counts once in every category of its product, so categories do not add up to the total."""
+    hour = models.DateTimeField()
+    category = models.ForeignKey(Category, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'sales_hourly_category'
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'category', 'status'], name='sales_hourly_category_uniq'),
+        ]
+
+
+class DailyCategorySales(SalesRollup):
+    day = models.DateField()
+    category = models.ForeignKey(Category, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'sales_daily_category'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category', 'status'], name='sales_daily_category_uniq'),
+        ]
+
+
+class SalesRollupSync(models.Model):
+    """High-water mark of ``Order.updated_at`` already folded into the sales rollups."""
+    name = models.CharField(max_length=32, primary_key=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sales_rollup_sync'
+
+    def __str__(self):
+        return f"{self.name} @ {self.high_water}"
@@ -0,0 +1,81 @@
+"""Collision-free, time-ordered order numbers.
+
+An order number is 17 Crockford base32 characters (digits and upper-case
+letters without I, L, O, U):
+
+    TTTTTTTTT SSSSSSSS
+    |         `- 8 chars: value from the ``order_number_seq`` Postgres sequence
+    `- 9 chars: milliseconds since 2024-01-01 UTC
+
+Uniqueness comes from the sequence alone, so clock skew between servers can
+never produce a duplicate. Each process reserves ``BLOCK_SIZE`` values per
+``nextval()`` (the sequence increments by ``BLOCK_SIZE``) and hands them out
+under a process-local lock, so there is one database round trip per
+``BLOCK_SIZE`` orders and no lock shared between processes. Blocks are never
+reused after ``fork()``. Unused values are simply skipped.
+
+The timestamp prefix makes numbers sort by creation time (within a process,
+strictly). Legacy numbers (8 hex characters, issued before this scheme)
+carry no timestamp: those starting with ``00``-``02`` sort below or among
+new numbers, the rest above them. Date filters on orders therefore use
+``created_at``, never a range of numbers.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+
+from django.db import connection
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+TIME_CHARS = 9
+SEQUENCE_CHARS = 8
+LENGTH = TIME_CHARS + SEQUENCE_CHARS
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SEQUENCE = 'order_number_seq'
+BLOCK_SIZE = 100  # must match the sequence's INCREMENT BY (migration 0010)
+
+_lock = threading.Lock()
+_state = {'pid': None, 'next': 0, 'end': 0, 'last_ms': 0}
+
+
+def _encode(value, width):
+    chars = []
+    for _ in range(width):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    if value:
+        raise OverflowError(f'{width} base32 characters are not enough.')
+    return ''.join(reversed(chars))
+
+
+def _millis(moment):
+    if moment.tzinfo is None:
+        raise ValueError('Order number timestamps need an aware datetime.')
+    return max(int((moment - EPOCH).total_seconds() * 1000), 0)
+
+
+def _next_sequence_value():
+    if _state['pid'] != os.getpid() or _state['next'] >= _state['end']:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [SEQUENCE])
+            start = cursor.fetchone()[0]
+        _state.update(pid=os.getpid(), next=start, end=start + BLOCK_SIZE)
+    value = _state['next']
+    _state['next'] += 1
+    return value
+
+
+def generate(now=None):
+    """Return a new order number."""
+    now = now or datetime.now(timezone.utc)
+    with _lock:
+        # Never go back in time within a process, even if the clock does
+        millis = max(_millis(now), _state['last_ms'])
+        _state['last_ms'] = millis
+        sequence_value = _next_sequence_value()
+    return _encode(millis, TIME_CHARS) + _encode(sequence_value, SEQUENCE_CHARS)
+
+
+def is_valid(number):
+    return len(number) == LENGTH and all(char in ALPHABET for char in number)
+
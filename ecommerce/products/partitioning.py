@@ -0,0 +1,238 @@
+"""Monthly range partitioning of ``orders`` and ``order_items`` on ``created_at``.
+
+``convert()`` turns both tables into declaratively partitioned tables (one
+partition per calendar month in UTC, plus a ``<table>_default`` catch-all).
+It copies the rows, and recreates indexes, CHECKs and outgoing foreign keys
+under their original names. It runs in one transaction and holds
+``ACCESS EXCLUSIVE`` locks on both tables while copying, so it belongs in a
+maintenance window. Afterwards:
+
+* date-bounded queries (``created_at__gte`` / ``__lt``) only read the
+  matching partitions (partition pruning);
+* ``ensure_partitions()`` pre-creates upcoming months (Celery runs it daily;
+  rows that reached the default partition meanwhile are moved into their
+  month), ``archive_partitions()`` detaches old months and moves them to the
+  ``archive`` schema, where they remain queryable but leave the hot tables.
+
+PostgreSQL requires every unique index of a partitioned table to include the
+partition key. The primary keys therefore become ``(id, created_at)``, the
+unique index on ``order_number`` becomes a plain index (numbers are
+collision-free by construction, see ``products.order_numbers``), and the
+foreign key from ``order_items.order_id`` to ``orders`` is dropped. Django
+still treats ``id`` as the primary key and performs ``on_delete`` cascades
+itself, so ORM queries on ``Order`` / ``OrderItem`` are unaffected.
+
+Nothing in the database ties an item to its order's partition, so an item
+stamped a moment after an order placed at the end of a month would land in
+the next month and be left behind (or archived alone) by
+``archive_partitions()``. Items therefore carry their order's ``created_at``
+(``OrderItem.save()``, ``OrderCreateSerializer``), and ``convert()`` and
+``archive_partitions()`` first move any item whose month differs from its
+order's into the order's month.
+"""
+import re
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+
+from .models import Order, OrderItem
+
+PARTITION_KEY = 'created_at'
+ARCHIVE_SCHEMA = 'archive'
+
+
+def partitioned_tables():
+    return [Order._meta.db_table, OrderItem._meta.db_table]
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(%s)", [table],
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def list_partitions(cursor, table):
+    """``[(name, bound expression), ...]`` of the partitions attached to ``table``, by name."""
+    cursor.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+    """, [table])
+    return cursor.fetchall()
+
+
+def _create_partition(cursor, table, month):
+    name, end = partition_name(table, month), add_months(month, 1)
+    bounds = [month, end]
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s)',
+        bounds,
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f'CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)', bounds)
+        return name
+    # The month already has rows in the default partition, which would make
+    # PARTITION OF fail: move them into a new table and attach that instead.
+    cursor.execute(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {table}_default WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """, bounds)
+    cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)', bounds)
+    return name
+
+
+def _month_bounds(cursor, table):
+    cursor.execute(f'SELECT min({PARTITION_KEY}), max({PARTITION_KEY}) FROM {table}')
+    return cursor.fetchone()
+
+
+def _align_items(cursor, before=None):
+    """Give order items in a different month than their order the order's ``created_at``.
+
+    With ``before``, only pairs where either side is older than it are
+    considered. Returns the number of items moved.
+    """
+    orders, items = partitioned_tables()
+    month = "date_trunc('month', {} AT TIME ZONE 'UTC')"
+    sql = f"""
+        UPDATE {items} i SET {PARTITION_KEY} = o.{PARTITION_KEY} FROM {orders} o
+        WHERE o.id = i.order_id
+          AND {month.format(f'i.{PARTITION_KEY}')} <> {month.format(f'o.{PARTITION_KEY}')}
+    """
+    params = []
+    if before:
+        sql += f' AND (i.{PARTITION_KEY} < %s OR o.{PARTITION_KEY} < %s)'
+        params = [before, before]
+    cursor.execute(sql, params)
+    return cursor.rowcount
+
+
+def _convert_table(cursor, table, first_month, last_month):
+    old = f'{table}_unpartitioned'
+    cursor.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    # Index and constraint definitions of the original table (other than its primary key)
+    cursor.execute("""
+        SELECT pg_get_indexdef(x.indexrelid), x.indisunique
+        FROM pg_index x
+        WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+    """, [old])
+    indexes = cursor.fetchall()
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid), confrelid::regclass::text
+        FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'
+    """, [old])
+    foreign_keys = cursor.fetchall()
+
+    cursor.execute(
+        f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED) '
+        f'PARTITION BY RANGE ({PARTITION_KEY})'
+    )
+    cursor.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    month = first_month
+    while month <= last_month:
+        _create_partition(cursor, table, month)
+        month = add_months(month, 1)
+    cursor.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+    # Drops the old indexes (freeing their names) and foreign keys that point at the old table
+    cursor.execute(f'DROP TABLE {old} CASCADE')
+
+    cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {PARTITION_KEY})')
+    for definition, unique in indexes:
+        # Created on the parent, the index cascades to every partition (present and future)
+        definition = re.sub(rf' ON (public\.)?{old} ', f' ON {table} ', definition, count=1)
+        if unique and PARTITION_KEY not in definition.split(' USING ', 1)[1]:
+            # Unique indexes must contain the partition key; keep the index for lookups only
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        cursor.execute(definition)
+    partitioned = set(partitioned_tables())
+    for name, definition, target in foreign_keys:
+        if target.split('.')[-1] in partitioned:
+            continue  # would have to include the target's partition key
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+
+
+@transaction.atomic
+def convert(months_ahead=3, now=None):
+    """Partition ``orders`` and ``order_items`` by month; returns the tables converted."""
+    converted = []
+    this_month = month_start(now or datetime.now(timezone.utc))
+    with connection.cursor() as cursor:
+        # Deferred foreign key checks queued in this transaction would block dropping the old tables
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        if not is_partitioned(cursor, OrderItem._meta.db_table):
+            _align_items(cursor)
+        for table in partitioned_tables():
+            if is_partitioned(cursor, table):
+                continue
+            first, last = _month_bounds(cursor, table)
+            first_month = month_start(first) if first else this_month
+            last_month = max(month_start(last) if last else this_month, add_months(this_month, months_ahead))
+            _convert_table(cursor, table, first_month, last_month)
+            cursor.execute(f'ANALYZE {table}')
+            converted.append(table)
+    return converted
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    """Create the partitions for this month and the next ``months_ahead``; returns the new ones."""
+    created = []
+    this_month = month_start(now or datetime.now(timezone.utc))
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in partitioned_tables():
+            if not is_partitioned(cursor, table):
+                continue
+            existing = {name for name, _ in list_partitions(cursor, table)}
+            for offset in range(months_ahead + 1):
+                month = add_months(this_month, offset)
+                if partition_name(table, month) not in existing:
+                    created.append(_create_partition(cursor, table, month))
+    return created
+
+
+def archive_partitions(keep_months, now=None, schema=ARCHIVE_SCHEMA):
+    """Detach monthly partitions older than ``keep_months`` and move them to ``schema``.
+
+    The current month counts as the first kept month. Items are first moved
+    into their order's month, so an order and its items are archived
+    together. Returns the archived table names (schema-qualified).
+    """
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -(keep_months - 1))
+    archived = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {schema}')
+        if all(is_partitioned(cursor, table) for table in partitioned_tables()):
+            _align_items(cursor, before=cutoff)
+        for table in partitioned_tables():
+            if not is_partitioned(cursor, table):
+                continue
+            for name, _ in list_partitions(cursor, table):
+                suffix = name[len(table) + 2:]
+                if not name.startswith(f'{table}_p') or len(suffix) != 7:
+                    continue  # the default partition or a foreign one
+                month = datetime.strptime(suffix, '%Y_%m').replace(tzinfo=timezone.utc)
+                if month >= cutoff:
+                    continue
+                cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {name}')
+                cursor.execute(f'ALTER TABLE {name} SET SCHEMA {schema}')
+                archived.append(f'{schema}.{name}')
+    return archived
@@ -0,0 +1,219 @@
+"""Incremental sales rollups for reporting.
+
+Dashboards read these tables instead of aggregating ``OrderItem`` joined
+to ``Order``:
+
+* ``HourlyVariantSales`` / ``DailyVariantSales``: lines, units and revenue
+  per bucket, variant (with its product) and order status;
+* ``HourlyCategorySales`` / ``DailyCategorySales``: the same per category. A
+  line counts in every category of its product.
+
+An order belongs to the bucket of its ``created_at`` and the rows of its
+*current* status. Hours are UTC. Days are local days in ``TIME_ZONE`` and are
+summed from the hourly rows, which assumes a whole-hour UTC offset.
+
+``refresh()`` (Celery, every few minutes) finds the orders whose
+``updated_at`` passed the high-water mark stored in ``SalesRollupSync`` and
+recomputes every hour they were placed in from the raw rows, then the days
+containing those hours. Recomputing whole buckets (``DELETE`` + ``INSERT``)
+makes the job idempotent. A late status change moves the order's lines from
+the old status row to the new one, whatever its age. Each run rereads
+``OVERLAP`` before the mark, so a transaction that commits shortly after it
+set ``updated_at`` is not missed.
+
+Changes that do not bump ``Order.updated_at`` are invisible here:
+``QuerySet.update()`` calls on orders and order deletions. After those,
+``rebuild(since)`` recomputes a whole period.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from .models import (
+    DailyCategorySales, DailyVariantSales, HourlyCategorySales, HourlyVariantSales, Order, OrderItem,
+    SalesRollupSync,
+)
+
+SYNC_NAME = 'sales'
+HOUR = timedelta(hours=1)
+OVERLAP = timedelta(minutes=5)
+CHUNK_HOURS = 24 * 7  # hours recomputed per statement
+GROUPINGS = ('variant', 'product', 'category', 'status')
+# Grouping -> (rollup column, labels returned with it)
+DIMENSIONS = {
+    'variant': ('variant_id', {'variant_sku': F('variant__sku')}),
+    'product': ('product_id', {'product_name': F('product__name')}),
+    'category': ('category_id', {'category_name': F('category__name')}),
+    'status': ('status', {}),
+}
+# Aggregates are prefixed: an annotation cannot reuse a model field name
+LINE_METRICS = {'sum_lines': Count('id'), 'sum_units': Sum('quantity'), 'sum_revenue': Sum('total_price')}
+ROLLUP_METRICS = {'sum_lines': Sum('lines'), 'sum_units': Sum('units'), 'sum_revenue': Sum('revenue')}
+
+
+def _ranges(starts, width):
+    """Merge bucket starts into ``[(start, end), ...]`` with adjacent buckets joined."""
+    ranges = []
+    for start in sorted(starts):
+        end = start + width if isinstance(width, timedelta) else width(start)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def _within(field, ranges):
+    condition = Q()
+    for start, end in ranges:
+        condition |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    return condition
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _next_day_start(start):
+    return _day_start(timezone.localtime(start).date() + timedelta(days=1))
+
+
+def _build(model, rows):
+    """``INSERT INTO <model> SELECT ...`` from the ``values().annotate()`` queryset ``rows``, server-side."""
+    names = [*rows.query.values_select, *rows.query.annotation_select]
+    targets = ', '.join(model._meta.get_field(name.removeprefix('sum_')).column for name in names)
+    sources = ', '.join(connection.ops.quote_name(name) for name in names)
+    sql, params = rows.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {model._meta.db_table} ({targets}) SELECT {sources} FROM ({sql}) AS rollup', params)
+
+
+def _rebuild_hours(hours):
+    ranges = _ranges(hours, HOUR)
+    items = (
+        OrderItem.objects.filter(_within('order__created_at', ranges))
+        .annotate(hour=Trunc('order__created_at', 'hour', tzinfo=dt_timezone.utc)).order_by()
+    )
+    HourlyVariantSales.objects.filter(_within('hour', ranges)).delete()
+    HourlyCategorySales.objects.filter(_within('hour', ranges)).delete()
+    _build(HourlyVariantSales, items.values(
+        'hour', variant_id=F('product_variant'), product_id=F('product_variant__product'), status=F('order__status'),
+    ).annotate(**LINE_METRICS))
+    _build(HourlyCategorySales, items.filter(product_variant__product__categories__isnull=False).values(
+        'hour', category_id=F('product_variant__product__categories'), status=F('order__status'),
+    ).annotate(**LINE_METRICS))
+
+
+def _rebuild_days(days):
+    ranges = _ranges([_day_start(day) for day in days], _next_day_start)
+    zone = timezone.get_current_timezone()
+    for hourly, daily, dimensions in (
+        (HourlyVariantSales, DailyVariantSales, ('variant_id', 'product_id', 'status')),
+        (HourlyCategorySales, DailyCategorySales, ('category_id', 'status')),
+    ):
+        daily.objects.filter(day__in=days).delete()
+        _build(daily, hourly.objects.filter(_within('hour', ranges)).annotate(day=TruncDate('hour', tzinfo=zone))
+               .values('day', *dimensions).annotate(**ROLLUP_METRICS).order_by())
+
+
+def _rebuild(hours):
+    hours = sorted(hours)
+    for i in range(0, len(hours), CHUNK_HOURS):
+        _rebuild_hours(hours[i:i + CHUNK_HOURS])
+    days = sorted({timezone.localtime(hour).date() for hour in hours})
+    for i in range(0, len(days), CHUNK_HOURS // 24):
+        _rebuild_days(days[i:i + CHUNK_HOURS // 24])
+
+
+def _hours_of(orders):
+    return list(
+        orders.annotate(hour=Trunc('created_at', 'hour', tzinfo=dt_timezone.utc))
+        .values_list('hour', flat=True).order_by('hour').distinct()
+    )
+
+
+def _lock_mark():
+    mark, _ = SalesRollupSync.objects.select_for_update().get_or_create(pk=SYNC_NAME)
+    return mark
+
+
+def _advance(mark, high):
+    if high and (mark.high_water is None or high > mark.high_water):
+        mark.high_water = high
+        mark.save(update_fields=['high_water', 'updated_at'])
+
+
+def refresh():
+    """Recompute the buckets of orders changed since the last run; returns the number of hours rebuilt."""
+    with transaction.atomic():
+        mark = _lock_mark()
+        orders = Order.objects.all()
+        if mark.high_water is not None:
+            orders = orders.filter(updated_at__gte=mark.high_water - OVERLAP)
+        # Read the new mark first: orders changed after it are picked up again next run
+        high = orders.aggregate(high=Max('updated_at'))['high']
+        if high is None:
+            return 0
+        hours = _hours_of(orders)
+        _rebuild(hours)
+        _advance(mark, high)
+        return len(hours)
+
+
+def rebuild(since=None):
+    """Recompute every bucket from the local day ``since`` (a date or datetime; default: all history).
+
+    Returns the number of hours rebuilt.
+    """
+    if isinstance(since, datetime):
+        since = timezone.localtime(since).date()
+    with transaction.atomic():
+        mark = _lock_mark()
+        high = Order.objects.aggregate(high=Max('updated_at'))['high']
+        hourly, daily, orders = {}, {}, Order.objects.all()
+        if since is not None:
+            start = _day_start(since)
+            hourly, daily, orders = {'hour__gte': start}, {'day__gte': since}, orders.filter(created_at__gte=start)
+        # Buckets whose orders were all deleted would otherwise survive
+        for model in (HourlyVariantSales, HourlyCategorySales):
+            model.objects.filter(**hourly).delete()
+        for model in (DailyVariantSales, DailyCategorySales):
+            model.objects.filter(**daily).delete()
+        hours = _hours_of(orders)
+        _rebuild(hours)
+        _advance(mark, high)
+        return len(hours)
+
+
+def report(granularity, start, end, group_by, statuses=None):
+    """Rollup rows in ``[start, end)`` summed per bucket and ``group_by`` dimensions, oldest first.
+
+    ``granularity`` is ``'hour'`` (``start``/``end`` datetimes) or ``'day'``
+    (dates). ``category`` cannot be combined with ``variant`` or ``product``.
+    """
+    if 'category' in group_by:
+        model = HourlyCategorySales if granularity == 'hour' else DailyCategorySales
+    else:
+        model = HourlyVariantSales if granularity == 'hour' else DailyVariantSales
+    fields = [DIMENSIONS[grouping][0] for grouping in group_by]
+    labels = {name: label for grouping in group_by for name, label in DIMENSIONS[grouping][1].items()}
+    queryset = model.objects.filter(**{f'{granularity}__gte': start, f'{granularity}__lt': end})
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    rows = (
+        queryset.values(granularity, *fields, **labels).annotate(**ROLLUP_METRICS)
+        .order_by(granularity, *fields)
+    )
+    results = []
+    for row in rows:
+        result = {granularity: row[granularity]}
+        for grouping in group_by:
+            field, grouping_labels = DIMENSIONS[grouping]
+            result[grouping] = row[field]
+            result.update((name, row[name]) for name in grouping_labels)
+        result.update((key.removeprefix('sum_'), row[key]) for key in ROLLUP_METRICS)
+        results.append(result)
+    return results
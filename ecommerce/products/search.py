@@ -0,0 +1,38 @@
+"""PostgreSQL full-text search over ``Product.search_vector``.
+
+Queries are matched with ``@@`` against the generated, GIN-indexed tsvector
+column and ranked with ``ts_rank`` using the A/B/C/D weights set on the
+column (name > sku > short_description > description).
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+SEARCH_CONFIG = 'english'
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_search_query(text):
+    """Turn free text into a prefix-matching ``tsquery`` (``wire:* & mou:*``).
+
+    Only word characters are kept, so user input can never inject tsquery
+    operators. Returns ``None`` when nothing searchable remains.
+    """
+    terms = _TERM_RE.findall(text.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    raw = ' & '.join(f'{term}:*' for term in terms)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_products(queryset, text):
+    """Filter ``queryset`` to full-text matches annotated with ``search_rank``."""
+    query = build_search_query(text)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query),
+    )
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.db import transaction
+from . import inventory, order_numbers
+from .fieldsets import SparseFieldsetMixin
 from .models import (
     Category, Product, ProductVariant,
     Order, OrderItem
@@ -19,13 +21,22 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = ('id', 'name', 'slug', 'short_description', 'sku', 'price', 'is_active')
+        fields = (
+            'id', 'name', 'slug', 'short_description', 'sku', 'price', 'is_active',
+            'min_variant_price', 'max_variant_price', 'active_variant_count'
+        )
+        # rendered only with ?expand=
+        expandable_fields = {
+            'categories': (CategorySerializer, {'many': True}),
+            'variants': (ProductVariantSerializer, {'many': True}),
+        }
+        prefetch_filters = {'categories': {'is_active': True}, 'variants': {'is_active': True}}
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     variants = ProductVariantSerializer(many=True, read_only=True)
 
@@ -34,9 +45,12 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'name', 'slug', 'description', 'short_description', 'sku',
             'price', 'compare_price', 'categories', 'attributes', 'is_active',
-            'is_digital', 'weight', 'dimensions', 'created_at', 'updated_at', 'variants'
+            'is_digital', 'weight', 'dimensions', 'created_at', 'updated_at', 'variants',
+            'min_variant_price', 'max_variant_price', 'active_variant_count'
         )
         read_only_fields = ('created_at', 'updated_at')
+        # inactive variants and categories are never rendered
+        prefetch_filters = {'categories': {'is_active': True}, 'variants': {'is_active': True}}
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -45,12 +59,44 @@ class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ('id', 'order', 'product_variant', 'quantity', 'unit_price', 'total_price', 'created_at')
-        read_only_fields = ('id', 'unit_price', 'total_price', 'created_at')
+        read_only_fields = ('id', 'order', 'unit_price', 'total_price', 'created_at')
+
+
+class OrderHistoryItemSerializer(serializers.ModelSerializer):
+    sku = serializers.CharField(source='product_variant.sku', read_only=True)
+    variant_name = serializers.CharField(source='product_variant.name', read_only=True)
+    product_name = serializers.CharField(source='product_variant.product.name', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'product_variant', 'sku', 'variant_name', 'product_name', 'quantity', 'unit_price', 'total_price')
+        read_only_fields = fields
+
+
+class OrderHistorySerializer(serializers.ModelSerializer):
+    """Compact order rows for the history list; lines come from one prefetch (see ``OrderViewSet``)."""
+    items = OrderHistoryItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            'id', 'order_number', 'status', 'total_amount', 'tax_amount', 'shipping_amount', 'discount_amount',
+            'created_at', 'items',
+        )
+        read_only_fields = fields
+
+
+class OrderLineSerializer(serializers.Serializer):
+    """One requested order line; variants are resolved in bulk by ``OrderCreateSerializer.validate_items``."""
+    product_variant = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, write_only=True)
+    items = OrderLineSerializer(many=True, write_only=True)
     order_items = OrderItemSerializer(many=True, source='items', read_only=True)
+    # consume this cart's stock reservations (products.inventory.reserve) before taking free stock
+    cart_key = serializers.CharField(max_length=64, required=False, write_only=True)
 
     class Meta:
         model = Order
@@ -58,45 +104,92 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             'id', 'order_number', 'user', 'status', 'total_amount', 'tax_amount', 'shipping_amount', 'discount_amount',
             'billing_first_name', 'billing_last_name', 'billing_email', 'billing_phone', 'billing_address',
             'shipping_first_name', 'shipping_last_name', 'shipping_address', 'notes',
-            'created_at', 'items', 'order_items'
+            'created_at', 'items', 'order_items', 'cart_key'
         ]
-        read_only_fields = ('id', 'order_number', 'total_amount', 'created_at')
+        # Customers place orders; the owner, status and amounts are set by the server (the orders
+        # endpoint saves with the requesting user, the rest keep their model defaults until staff change them)
+        read_only_fields = (
+            'id', 'order_number', 'user', 'status', 'total_amount', 'tax_amount', 'shipping_amount',
+            'discount_amount', 'created_at',
+        )
 
     def validate_items(self, value):
         if not value:
             raise serializers.ValidationError("Order must contain at least one item.")
-        return value
+        # One query for every line instead of a PrimaryKeyRelatedField lookup per line
+        variants = ProductVariant.objects.filter(is_active=True).only('id', 'price').in_bulk(
+            {line['product_variant'] for line in value}
+        )
+        errors = [
+            {} if line['product_variant'] in variants
+            else {'product_variant': [f'Invalid pk "{line["product_variant"]}" - object does not exist.']}
+            for line in value
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return [{**line, 'product_variant': variants[line['product_variant']]} for line in value]
 
     @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop('items')
-        # create order skeleton
-        order = Order.objects.create(**validated_data, order_number=self._generate_order_number(), total_amount=0)
-        total = 0
-        for item in items_data:
-            pv = item['product_variant']
-            qty = item['quantity']
-            unit_price = pv.price
-            item_total = unit_price * qty
-            OrderItem.objects.create(
-                order=order,
-                product_variant=pv,
-                quantity=qty,
-                unit_price=unit_price,
-                total_price=item_total
+        cart_key = validated_data.pop('cart_key', None)
+        try:
+            inventory.commit_order_stock(
+                [(item['product_variant'].pk, item['quantity']) for item in items_data], cart_key=cart_key,
             )
-            total += item_total
-
-            # Optional: update inventory here (requires a stock field on ProductVariant)
-        order.total_amount = total
-        order.save(update_fields=['total_amount'])
+        except inventory.OutOfStock as exc:
+            raise serializers.ValidationError(
+                {'items': [f'Insufficient stock for variant {variant_id}.' for variant_id in exc.shortages]}
+            )
+        # Price every line in memory so the order is written once, with its total
+        lines = [
+            OrderItem(
+                product_variant=item['product_variant'],
+                quantity=item['quantity'],
+                unit_price=item['product_variant'].price,
+                total_price=item['product_variant'].price * item['quantity'],
+            )
+            for item in items_data
+        ]
+        order = Order.objects.create(
+            **validated_data, order_number=self._generate_order_number(),
+            total_amount=sum((line.total_price for line in lines), 0),
+        )
+        for line in lines:
+            line.order = order
+            line.created_at = order.created_at
+        OrderItem.objects.bulk_create(lines)
         return order
 
     def _generate_order_number(self):
-        import uuid
-        return str(uuid.uuid4()).split('-')[0].upper()
+        return order_numbers.generate()
+
+
+class SalesRollupRowSerializer(serializers.Serializer):
+    """One report row of ``products.sales``; only the bucket and the requested ``group_by`` columns are present."""
+    hour = serializers.DateTimeField(required=False)
+    day = serializers.DateField(required=False)
+    variant = serializers.UUIDField(required=False)
+    variant_sku = serializers.CharField(required=False)
+    product = serializers.UUIDField(required=False)
+    product_name = serializers.CharField(required=False)
+    category = serializers.UUIDField(required=False)
+    category_name = serializers.CharField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+    lines = serializers.IntegerField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SalesReportSerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=['hour', 'day'])
+    start = serializers.CharField(help_text='First bucket (inclusive), ISO 8601.')
+    end = serializers.CharField(help_text='Last bucket (exclusive), ISO 8601.')
+    group_by = serializers.ListField(child=serializers.CharField())
+    results = SalesRollupRowSerializer(many=True)
 from rest_framework import serializers
 from .models import Product, ProductVariant, Category
+from .tree import children_by_parent
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -107,9 +200,12 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'children']
     
     def get_children(self, obj):
-        if hasattr(obj, 'children'):
-            return CategorySerializer(obj.children.filter(is_active=True), many=True).data
-        return []
+        # CategoryViewSet supplies every subtree up front; elsewhere load this one via its path
+        context = self.context
+        if context.get('category_children') is None:
+            context = {**context, 'category_children': children_by_parent([obj])}
+        children = context['category_children'].get(obj.pk, [])
+        return CategorySerializer(children, many=True, context=context).data
 class ProductVariantSerializer(serializers.ModelSerializer):
     is_available = serializers.SerializerMethodField()
     
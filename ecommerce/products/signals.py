@@ -0,0 +1,66 @@
+"""Catalog cache invalidation.
+
+Any write to products, variants, categories or product/category links bumps
+the catalog generation (see ``products.cache``); category writes also bump
+the ``categories`` generation used by the cached tree (``products.tree``). ``QuerySet.update()`` and
+``bulk_create()`` do not send these signals; code using them must call
+``products.cache.bump_version()`` itself.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Category, Product, ProductVariant
+from .variant_stats import refresh_variant_stats
+
+
+def _bump_catalog(**kwargs):
+    # after commit, so a concurrent reader can't re-cache pre-commit data under the new version
+    transaction.on_commit(bump_version)
+
+
+def _bump_categories(**kwargs):
+    transaction.on_commit(lambda: bump_version('categories'))
+
+
+for _model in (Product, ProductVariant, Category):
+    post_save.connect(_bump_catalog, sender=_model, dispatch_uid=f'catalog_cache_save_{_model.__name__}')
+    post_delete.connect(_bump_catalog, sender=_model, dispatch_uid=f'catalog_cache_delete_{_model.__name__}')
+
+post_save.connect(_bump_categories, sender=Category, dispatch_uid='category_tree_save')
+post_delete.connect(_bump_categories, sender=Category, dispatch_uid='category_tree_delete')
+
+
+@receiver(m2m_changed, sender=Product.categories.through, dispatch_uid='catalog_cache_categories')
+def _bump_catalog_on_links(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _bump_catalog()
+
+
+@receiver(m2m_changed, sender=Product.categories.through, dispatch_uid='product_touch_on_links')
+def _touch_products_on_links(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump ``Product.updated_at`` when its categories change so ETags/Last-Modified move."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        products = Product.objects.filter(pk=instance.pk)
+    elif pk_set:
+        products = Product.objects.filter(pk__in=pk_set)
+    else:  # category.products.clear()
+        products = Product.objects.filter(categories=instance)
+    products.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=ProductVariant, dispatch_uid='product_touch_on_variant_delete')
+def _touch_product_on_variant_delete(sender, instance, **kwargs):
+    """A deleted variant leaves no newer timestamp behind; move ``Product.updated_at`` so Last-Modified does."""
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=ProductVariant, dispatch_uid='variant_stats_save')
+@receiver(post_delete, sender=ProductVariant, dispatch_uid='variant_stats_delete')
+def _refresh_variant_stats(sender, instance, **kwargs):
+    """Keep Product.min/max_variant_price and active_variant_count in step with its variants."""
+    refresh_variant_stats(Product.objects.filter(pk=instance.product_id))
@@ -0,0 +1,113 @@
+"""Typo-tolerant autocomplete backed by ``pg_trgm`` GIN indexes.
+
+``word_similarity`` (the ``%>`` operator) matches partial and misspelled
+input against product names, SKUs and category names. Rows are read with
+``values()`` so no model instances or serializers are built, and the most
+recent prefixes are kept in a small per-process cache because keystroke
+traffic repeats the same short prefixes constantly.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from .models import Category, Product
+
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 64
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# pg_trgm defaults to 0.6, which rejects common transpositions ('keybaord')
+WORD_SIMILARITY_THRESHOLD = 0.4
+
+
+class PrefixCache:
+    """Thread-safe LRU of recent suggestion results with a short TTL."""
+
+    def __init__(self, maxsize=2048, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+prefix_cache = PrefixCache()
+
+
+def set_similarity_threshold(sender, connection, **kwargs):
+    """``connection_created`` hook: configure ``%>`` once per DB session."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            [str(WORD_SIMILARITY_THRESHOLD)],
+        )
+
+
+def normalize_query(text):
+    return ' '.join(text.lower().split())[:MAX_QUERY_LENGTH]
+
+
+def suggest_products(text, limit):
+    return list(
+        Product.objects.filter(is_active=True)
+        .filter(Q(name__trigram_word_similar=text) | Q(sku__trigram_word_similar=text))
+        .annotate(similarity=Greatest(
+            TrigramWordSimilarity(text, 'name'),
+            TrigramWordSimilarity(text, 'sku'),
+        ))
+        .order_by('-similarity', 'name')
+        .values('id', 'name', 'slug')[:limit]
+    )
+
+
+def suggest_categories(text, limit):
+    return list(
+        Category.objects.filter(is_active=True, name__trigram_word_similar=text)
+        .annotate(similarity=TrigramWordSimilarity(text, 'name'))
+        .order_by('-similarity', 'name')
+        .values('id', 'name', 'slug')[:limit]
+    )
+
+
+def suggest(text, limit=DEFAULT_LIMIT):
+    """Return ``{'products': [...], 'categories': [...]}`` for ``text``."""
+    text = normalize_query(text)
+    if len(text) < MIN_QUERY_LENGTH:
+        return {'products': [], 'categories': []}
+    key = (text, limit)
+    result = prefix_cache.get(key)
+    if result is None:
+        result = {
+            'products': suggest_products(text, limit),
+            'categories': suggest_categories(text, limit),
+        }
+        prefix_cache.set(key, result)
+    return result
@@ -0,0 +1,64 @@
+import uuid
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.batch import MAX_BATCH_SIZE
+from products.models import Category, Product, ProductVariant
+
+
+class ProductBatchLookupTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Audio', slug='audio')
+        self.products = []
+        for i in range(4):
+            p = Product.objects.create(
+                name=f'Speaker {i}', slug=f'speaker-{i}', description='d', short_description='s',
+                sku=f'SP-{i}', price=10 + i,
+            )
+            p.categories.add(cat)
+            ProductVariant.objects.create(product=p, name='Black', sku=f'SP-{i}-B', price=10 + i)
+            self.products.append(p)
+        self.url = reverse('product-batch')
+
+    def test_results_follow_request_order_and_report_missing(self):
+        p0, p1, p2, _ = self.products
+        unknown = str(uuid.uuid4())
+        ids = [str(p2.pk), unknown, str(p0.pk), 'not-a-uuid', str(p2.pk).upper()]
+        resp = self.client.get(self.url, {'ids': ','.join(ids)})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r['sku'] for r in resp.data['results']], ['SP-2', 'SP-0'])
+        self.assertEqual(resp.data['missing'], [unknown, 'not-a-uuid'])
+        self.assertEqual(resp.data['results'][0]['variants'][0]['name'], 'Black')
+
+    def test_only_misses_hit_the_database(self):
+        p0, p1, p2, p3 = self.products
+        with self.assertNumQueries(3):  # products + variants + categories
+            self.client.get(self.url, {'ids': f'{p0.pk},{p1.pk}'})
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'ids': f'{p1.pk},{p0.pk}'})
+        with self.assertNumQueries(3):
+            resp = self.client.get(self.url, {'ids': f'{p0.pk},{p2.pk},{p3.pk}'})
+        self.assertEqual(len(resp.data['results']), 3)
+
+    def test_skus_and_fields(self):
+        resp = self.client.get(self.url, {'skus': 'SP-3,NOPE,SP-1', 'fields': 'sku,price'})
+        self.assertEqual(resp.data['results'], [{'sku': 'SP-3', 'price': '13.00'}, {'sku': 'SP-1', 'price': '11.00'}])
+        self.assertEqual(resp.data['missing'], ['NOPE'])
+
+    def test_catalog_writes_invalidate_cached_products(self):
+        p0 = self.products[0]
+        self.client.get(self.url, {'skus': 'SP-0'})
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=p0.pk).update(name='Renamed')
+            p0.refresh_from_db()
+            p0.save()
+        resp = self.client.get(self.url, {'skus': 'SP-0'})
+        self.assertEqual(resp.data['results'][0]['name'], 'Renamed')
+
+    def test_validation(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': 'a', 'skus': 'b'}).status_code, 400)
+        too_many = ','.join(f'S{i}' for i in range(MAX_BATCH_SIZE + 1))
+        self.assertEqual(self.client.get(self.url, {'skus': too_many}).status_code, 400)
@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products import cache as catalog_cache
+from products.models import Category, Product, ProductVariant
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            name='Lamp', slug='lamp', description='d', short_description='s', sku='L-1', price=30,
+        )
+        self.url = reverse('product-list')
+
+    def names(self):
+        return [row['name'] for row in self.client.get(self.url).json()['results']]
+
+    def test_repeat_request_is_a_hit_without_queries(self):
+        self.names()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(), ['Lamp'])
+        stats = catalog_cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_writes_invalidate_immediately(self):
+        self.names()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.product.pk).update(name='Desk Lamp')
+            self.product.refresh_from_db()
+            self.product.save()
+        self.assertEqual(self.names(), ['Desk Lamp'])
+
+        version = catalog_cache.get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVariant.objects.create(product=self.product, name='Red', sku='L-1-R', price=30)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.categories.add(Category.objects.create(name='Home', slug='home'))
+        self.assertGreater(catalog_cache.get_version(), version + 2)
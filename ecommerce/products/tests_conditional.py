@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from products.models import Category, Product, ProductVariant
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(
+            name='Kettle', slug='kettle', description='d', short_description='s', sku='K-1', price=40,
+        )
+        self.variant = ProductVariant.objects.create(product=self.product, name='Steel', sku='K-1-S', price=40)
+        self.url = reverse('product-detail', args=[self.product.pk])
+
+    def test_unchanged_product_returns_304_in_one_query(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertTrue(etag)
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_last_modified_round_trip(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        resp = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_variant_and_category_changes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.variant.price = 35
+        self.variant.save()
+        etag2 = self.client.get(self.url)['ETag']
+        self.assertNotEqual(etag, etag2)
+        self.variant.delete()
+        etag3 = self.client.get(self.url)['ETag']
+        self.assertNotEqual(etag2, etag3)
+        self.product.categories.add(Category.objects.create(name='Kitchen', slug='kitchen'))
+        self.assertNotEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag3).status_code, 304)
+
+    def test_deleting_an_older_variant_moves_last_modified(self):
+        older = ProductVariant.objects.create(product=self.product, name='Copper', sku='K-1-C', price=45)
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Product.objects.filter(pk=self.product.pk).update(updated_at=an_hour_ago)
+        ProductVariant.objects.filter(pk=older.pk).update(updated_at=an_hour_ago - timedelta(minutes=1))
+        ProductVariant.objects.filter(pk=self.variant.pk).update(updated_at=an_hour_ago)
+        last_modified = self.client.get(self.url)['Last-Modified']
+        older.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_list_etag_follows_catalog_generation(self):
+        list_url = reverse('product-list')
+        etag = self.client.get(list_url)['ETag']
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,89 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.export import export_catalog
+from products.models import Category, Product, ProductVariant
+
+
+class CatalogExportTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = get_user_model().objects.create_user(
+            username='merch', email='merch@example.com', password='x', is_staff=True,
+        )
+        self.client.force_authenticate(self.staff)
+        audio = Category.objects.create(name='Audio', slug='audio')
+        sale = Category.objects.create(name='Sale', slug='sale')
+        for i in range(5):
+            p = Product.objects.create(
+                name=f'Speaker {i}', slug=f'speaker-{i}', description='d', short_description='s',
+                sku=f'SP-{i}', price=10 + i, attributes={'watts': i}, is_active=i != 4,
+            )
+            p.categories.add(audio, *([sale] if i % 2 else []))
+            ProductVariant.objects.create(product=p, name='Black', sku=f'SP-{i}-B', price=10 + i)
+
+    def export(self, **params):
+        resp = self.client.get(reverse('product-export'), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp, b''.join(resp.streaming_content)
+
+    def test_ndjson_includes_variants_and_category_slugs(self):
+        resp, body = self.export()
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(sorted(r['sku'] for r in rows), [f'SP-{i}' for i in range(5)])
+        one = next(r for r in rows if r['sku'] == 'SP-1')
+        self.assertEqual(one['categories'], ['audio', 'sale'])
+        self.assertEqual([v['sku'] for v in one['variants']], ['SP-1-B'])
+        self.assertEqual((one['price'], one['attributes']), ('11.00', {'watts': 1}))
+
+    def test_csv_respects_filters(self):
+        _, body = self.export(export_format='csv', is_active='true', category='sale')
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(sorted(r['sku'] for r in rows), ['SP-1', 'SP-3'])
+        self.assertEqual(rows[0]['categories'], 'audio|sale')
+        self.assertEqual(json.loads(rows[0]['variants'])[0]['name'], 'Black')
+
+    def test_gzip_when_accepted(self):
+        resp = self.client.get(reverse('product-export'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', resp['Vary'])
+        body = gzip.decompress(b''.join(resp.streaming_content))
+        self.assertEqual(len(body.decode().splitlines()), 5)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get(reverse('product-export')).status_code, (401, 403))
+        shopper = get_user_model().objects.create_user(username='shopper', email='s@example.com', password='x')
+        self.client.force_authenticate(shopper)
+        self.assertEqual(self.client.get(reverse('product-export')).status_code, 403)
+
+    def test_unknown_format_rejected(self):
+        self.assertEqual(self.client.get(reverse('product-export'), {'export_format': 'xml'}).status_code, 400)
+
+    def test_queries_grow_per_chunk_not_per_product(self):
+        with CaptureQueriesContext(connection) as ctx:
+            lines = b''.join(export_catalog(Product.objects.all(), chunk_size=2)).splitlines()
+        self.assertEqual(len(lines), 5)
+        # one product cursor plus variants + categories for each of the 3 chunks
+        self.assertLessEqual(len(ctx.captured_queries), 1 + 3 * 2 + 2)
+
+    def test_command_writes_gzip_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'catalog.csv.gz')
+            call_command('export_catalog', format='csv', output=path, active_only=True, stderr=StringIO())
+            with gzip.open(path, 'rt') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.models import Category, Product, ProductVariant
+
+
+class ProductFacetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        shoes = Category.objects.create(name='Shoes', slug='shoes')
+        shirts = Category.objects.create(name='Shirts', slug='shirts')
+        rows = [
+            ('S-1', 20, {'brand': 'acme', 'color': 'red'}, [shoes]),
+            ('S-2', 60, {'brand': 'acme', 'color': 'blue'}, [shoes]),
+            ('T-1', 30, {'brand': 'zed'}, [shirts]),
+            ('T-2', 600, {}, [shirts, shoes]),
+        ]
+        for sku, price, attrs, cats in rows:
+            p = Product.objects.create(
+                name=sku, slug=sku.lower(), description='d', short_description='s', sku=sku, price=price, attributes=attrs,
+            )
+            p.categories.add(*cats)
+            ProductVariant.objects.create(product=p, name='M', sku=f'{sku}-M', price=price, attributes={'size': 'M'})
+        ProductVariant.objects.create(product=p, name='L', sku=f'{sku}-L', price=price, attributes={'size': 'L'})
+
+    def facets(self, **params):
+        resp = self.client.get(reverse('product-facets'), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_counts_cover_all_facets(self):
+        data = self.facets()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual({c['slug']: c['count'] for c in data['categories']}, {'shoes': 3, 'shirts': 2})
+        self.assertEqual([b['count'] for b in data['price']], [1, 1, 1, 0, 0, 1])
+        self.assertEqual(data['attributes']['brand'], [{'value': 'acme', 'count': 2}, {'value': 'zed', 'count': 1}])
+        self.assertEqual(data['variant_attributes']['size'], [{'value': 'M', 'count': 4}, {'value': 'L', 'count': 1}])
+
+    def test_facets_respect_filters_and_are_cached(self):
+        data = self.facets(category='shirts', facet_keys='brand')
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(list(data['attributes']), ['brand'])
+        with self.assertNumQueries(0):
+            self.facets(facet_keys='brand', category='shirts', page=3)
+
+    def test_empty_search_returns_zero_counts(self):
+        data = self.facets(q='!!!')
+        self.assertEqual(data['total'], 0)
+        self.assertEqual(data['categories'], [])
+
+
+class AttributeFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        rows = [
+            ('A', {'color': 'red', 'size': 42}, [{'size': 'M', 'color': 'red'}]),
+            ('B', {'color': 'blue'}, [{'size': 'L', 'color': 'red'}, {'size': 'M', 'color': 'blue'}]),
+            ('C', {'color': 'green'}, []),
+        ]
+        for sku, attrs, variants in rows:
+            p = Product.objects.create(
+                name=sku, slug=sku.lower(), description='d', short_description='s', sku=sku, price=1, attributes=attrs,
+            )
+            for i, vattrs in enumerate(variants):
+                ProductVariant.objects.create(product=p, name=str(i), sku=f'{sku}-{i}', price=1, attributes=vattrs)
+
+    def skus(self, query):
+        resp = self.client.get(reverse('product-list') + '?' + query)
+        self.assertEqual(resp.status_code, 200)
+        return sorted(r['sku'] for r in resp.data['results'])
+
+    def test_product_attribute_containment(self):
+        self.assertEqual(self.skus('attr.color=red'), ['A'])
+        self.assertEqual(self.skus('attr.color=red,blue'), ['A', 'B'])
+        self.assertEqual(self.skus('attr.color=red&attr.color=green'), ['A', 'C'])
+        self.assertEqual(self.skus('attr.size=42'), ['A'])
+        self.assertEqual(self.skus('attr.color=red&attr.size=41'), [])
+
+    def test_non_finite_numbers_match_as_text(self):
+        for query in ('attr.size=NaN', 'vattr.size=Infinity', 'attr.size=1e999'):
+            self.assertEqual(self.skus(query), [])
+
+    def test_variant_attributes_match_on_one_variant(self):
+        self.assertEqual(self.skus('vattr.size=M'), ['A', 'B'])
+        # B has a red variant and an M variant, but no red M variant
+        self.assertEqual(self.skus('vattr.size=M&vattr.color=red'), ['A'])
+
+    def test_attribute_filters_feed_facets(self):
+        resp = self.client.get(reverse('product-facets') + '?attr.color=red,blue')
+        self.assertEqual(resp.json()['total'], 2)
@@ -0,0 +1,74 @@
+import json
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from ecommerce.pagination import KeysetPagination
+from ecommerce.serialization import flat_plan
+from products.models import Category, Product, ProductVariant
+from products.serializers import ProductDetailSerializer, ProductListSerializer
+from products.views_api import ProductViewSet
+
+
+class FastListSerializationTests(APITestCase):
+    def setUp(self):
+        cat = Category.objects.create(name='Audio', slug='audio')
+        for i in range(5):
+            p = Product.objects.create(
+                name=f'Speaker "{i}" ü', slug=f'speaker-{i}', description='d', short_description='s',
+                sku=f'SP-{i}', price=f'{10 + i}.5', is_active=i != 2,
+            )
+            p.categories.add(cat)
+            if i % 2:
+                ProductVariant.objects.create(product=p, name='Black', sku=f'SP-{i}-B', price=9 + i)
+
+    def fetch(self, url, fast):
+        cache.clear()
+        with mock.patch.object(ProductViewSet, 'fast_list_serialization', fast):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp.content
+
+    def assertIdentical(self, url):
+        self.assertEqual(self.fetch(url, True), self.fetch(url, False))
+
+    def test_plan_only_for_flat_serializers(self):
+        self.assertIsNotNone(flat_plan(ProductListSerializer()))
+        self.assertIsNone(flat_plan(ProductDetailSerializer()))
+        self.assertIsNone(flat_plan(ProductListSerializer(context={'expand': ('variants',)})))
+
+    def test_output_is_byte_identical(self):
+        url = reverse('product-list')
+        for query in ('', '?page_size=2&page=2', '?ordering=min_variant_price', '?fields=id,price',
+                      '?is_active=false', '?format=json&ordering=-price'):
+            with self.subTest(query=query):
+                self.assertIdentical(url + query)
+
+    def test_keyset_pages_are_identical(self):
+        def normalize(content):
+            # cursors are timestamp-signed, so compare their payloads
+            data = json.loads(content)
+            for link in ('next', 'previous'):
+                if data[link]:
+                    token = parse_qs(urlsplit(data[link]).query)['cursor'][0]
+                    data[link] = signing.loads(token, salt=KeysetPagination.cursor_salt)
+            return data
+
+        url = reverse('product-list') + '?pagination=cursor&page_size=2&ordering=-max_variant_price'
+        pages = 0
+        while url:
+            fast = self.fetch(url, True)
+            self.assertEqual(normalize(fast), normalize(self.fetch(url, False)))
+            url = json.loads(fast)['next']
+            pages += 1
+        self.assertEqual(pages, 3)
+
+    def test_fast_path_skips_to_representation(self):
+        with mock.patch.object(ProductListSerializer, 'to_representation', side_effect=AssertionError):
+            self.fetch(reverse('product-list'), True)
+
+    def test_expand_falls_back_to_serializer(self):
+        self.assertIdentical(reverse('product-list') + '?expand=variants')
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.fieldsets import parse_field_list
+from products.models import Category, Product, ProductVariant
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        cat = Category.objects.create(name='Audio', slug='audio')
+        for i in range(3):
+            p = Product.objects.create(
+                name=f'Speaker {i}', slug=f'speaker-{i}', description='long text', short_description='s',
+                sku=f'SP-{i}', price=10 + i,
+            )
+            p.categories.add(cat)
+            ProductVariant.objects.create(product=p, name='Black', sku=f'SP-{i}-B', price=10 + i)
+        self.product = p
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, params)
+        self.assertEqual(resp.status_code, 200)
+        return resp, [q['sql'] for q in ctx.captured_queries]
+
+    def test_parse_field_list(self):
+        self.assertEqual(parse_field_list(' id,name,,name,DROP TABLE,price '), ('id', 'name', 'price'))
+        self.assertEqual(parse_field_list(None), ())
+
+    def test_list_fields_narrow_columns(self):
+        resp, queries = self.get(reverse('product-list'), fields='id,name,bogus')
+        self.assertEqual(set(resp.data['results'][0]), {'id', 'name'})
+        select = next(q for q in queries if q.startswith('SELECT "products"."id"'))
+        self.assertNotIn('"short_description"', select)
+        self.assertIn('"created_at"', select)  # default ordering column stays loaded
+
+    def test_list_expand_adds_one_prefetch_per_relation(self):
+        _, plain = self.get(reverse('product-list'))
+        resp, expanded = self.get(reverse('product-list'), expand='variants,categories')
+        row = resp.data['results'][0]
+        self.assertEqual(row['variants'][0]['name'], 'Black')
+        self.assertEqual(row['categories'][0]['slug'], 'audio')
+        self.assertEqual(len(expanded), len(plain) + 2)
+
+    def test_detail_fields_skip_prefetches(self):
+        url = reverse('product-detail', args=[self.product.pk])
+        full, full_queries = self.get(url)
+        self.assertIn('variants', full.data)
+        lean, lean_queries = self.get(url, fields='name,price')
+        self.assertEqual(set(lean.data), {'name', 'price'})
+        self.assertFalse(any('product_variants' in q and 'IN (' in q for q in lean_queries))
+        self.assertLess(len(lean_queries), len(full_queries))
+        self.assertNotEqual(full['ETag'], lean['ETag'])
+
+    def test_keyset_cursor_with_sparse_fields(self):
+        params = {'pagination': 'cursor', 'page_size': 1, 'ordering': 'price', 'fields': 'name'}
+        resp, queries = self.get(reverse('product-list'), **params)
+        self.assertEqual(list(resp.data['results'][0]), ['name'])
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(resp.data['next'])
+        self.assertEqual(resp.data['results'][0]['name'], 'Speaker 1')
+        self.assertEqual(len(ctx.captured_queries), len(queries))
@@ -0,0 +1,140 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django_redis import get_redis_connection
+from products import hot_inventory, inventory
+from products.models import HotStockSync, Product, ProductVariant
+
+
+def make_variants(*stocks):
+    product = Product.objects.create(
+        name='Sneaker', slug='sneaker', description='d', short_description='s', sku='SNK', price=Decimal('90.00'),
+    )
+    return [
+        ProductVariant.objects.create(product=product, name=f'V{i}', sku=f'SNK-{i}', price=Decimal('90.00'), stock=stock)
+        for i, stock in enumerate(stocks)
+    ]
+
+
+def stock_of(variant):
+    variant.refresh_from_db(fields=['stock'])
+    return variant.stock
+
+
+def flush_inventory_keys():
+    r = get_redis_connection('default')
+    keys = list(r.scan_iter('{inventory}:*'))
+    if keys:
+        r.delete(*keys)
+
+
+@override_settings(INVENTORY_HOT_MODE=True)
+class HotInventoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(flush_inventory_keys)
+        self.hot, self.cold = make_variants(5, 5)
+        hot_inventory.enable([self.hot.pk])
+
+    def level(self):
+        return hot_inventory.levels([self.hot.pk])[self.hot.pk]
+
+    def test_decrements_hit_valkey_until_reconciled(self):
+        inventory.decrement_stock([(self.hot.pk, 2), (self.cold.pk, 1)])
+        self.assertEqual(self.level(), 3)
+        self.assertEqual((stock_of(self.hot), stock_of(self.cold)), (5, 4))
+        self.assertEqual(hot_inventory.reconcile(), 1)
+        self.assertEqual(stock_of(self.hot), 3)
+
+    def test_hot_shortage_rolls_back_database_part(self):
+        with self.assertRaises(inventory.OutOfStock) as ctx:
+            inventory.decrement_stock([(self.hot.pk, 6), (self.cold.pk, 1)])
+        self.assertEqual(ctx.exception.shortages, {self.hot.pk: 6})
+        self.assertEqual((self.level(), stock_of(self.cold)), (5, 5))
+        self.assertEqual(hot_inventory.journal_length(), 0)
+
+    def test_restock_goes_through_the_journal(self):
+        inventory.decrement_stock([(self.hot.pk, 5)])
+        inventory.restock([(self.hot.pk, 2)])
+        self.assertEqual(self.level(), 2)
+        hot_inventory.reconcile()
+        self.assertEqual(stock_of(self.hot), 2)
+
+    def test_replayed_journal_is_not_applied_twice(self):
+        inventory.decrement_stock([(self.hot.pk, 1)])
+        hot_inventory.reconcile()  # TestCase never commits, so the entry is not trimmed: like a crash before trim
+        self.assertEqual(hot_inventory.journal_length(), 1)
+        inventory.decrement_stock([(self.hot.pk, 1)])
+        self.assertEqual(hot_inventory.reconcile(), 1)
+        self.assertEqual(stock_of(self.hot), 3)
+        self.assertEqual(HotStockSync.objects.get().applied_seq, 2)
+
+    def test_disable_hands_stock_back_to_the_database(self):
+        inventory.decrement_stock([(self.hot.pk, 4)])
+        hot_inventory.disable([self.hot.pk])
+        self.assertIsNone(self.level())
+        self.assertEqual(stock_of(self.hot), 1)
+        inventory.decrement_stock([(self.hot.pk, 1)])
+        self.assertEqual(stock_of(self.hot), 0)
+
+    def test_variant_disabled_mid_checkout_falls_back_to_database(self):
+        get_redis_connection('default').delete(hot_inventory.STOCK_KEY.format(variant_id=self.hot.pk))
+        shortages, fallback = hot_inventory.adjust({self.hot.pk: -1})
+        self.assertEqual((shortages, fallback), ({}, [self.hot.pk]))
+
+    def test_variant_enabled_mid_checkout_is_taken_from_valkey(self):
+        # Each call reads hot_ids() as it was just before enable() switched the variant,
+        # then gets the row lock once enable() has copied the stock into Valkey
+        stale_then_hot = [set(), {self.hot.pk}, set(), {self.hot.pk}]
+        with mock.patch.object(hot_inventory, 'hot_ids', side_effect=stale_then_hot):
+            inventory.decrement_stock([(self.hot.pk, 2)])
+            inventory.restock([(self.hot.pk, 1)])
+        self.assertEqual((self.level(), stock_of(self.hot)), (4, 5))
+        self.assertEqual(hot_inventory.reconcile(), 2)
+        self.assertEqual(stock_of(self.hot), 4)
+
+    def test_mode_off_ignores_counters(self):
+        with override_settings(INVENTORY_HOT_MODE=False):
+            inventory.decrement_stock([(self.hot.pk, 1)])
+        self.assertEqual((self.level(), stock_of(self.hot)), (5, 4))
+
+
+@override_settings(INVENTORY_HOT_MODE=True)
+class HotInventoryConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(flush_inventory_keys)
+
+    def test_no_oversell_and_journal_reconciles(self):
+        (variant,) = make_variants(30)
+        hot_inventory.enable([variant.pk])
+        sold = []
+        lock = threading.Lock()
+        start = threading.Barrier(8)
+
+        def buyer():
+            try:
+                start.wait()
+                for _ in range(10):
+                    try:
+                        inventory.decrement_stock([(variant.pk, 1)])
+                    except inventory.OutOfStock:
+                        continue
+                    with lock:
+                        sold.append(1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buyer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(sold), 30)
+        self.assertEqual(hot_inventory.reconcile(), 30)
+        self.assertEqual(stock_of(variant), 0)
+        self.assertEqual(hot_inventory.journal_length(), 0)  # trimmed after commit
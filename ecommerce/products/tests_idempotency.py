@@ -0,0 +1,94 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from ecommerce import idempotency
+from products.models import Order, Product, ProductVariant
+
+
+class OrderIdempotencyTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='retry', email='retry@example.com', password='x')
+        self.client.force_authenticate(self.user)
+        product = Product.objects.create(
+            name='Cap', slug='cap', description='d', short_description='s', sku='CAP', price=Decimal('12.00'),
+        )
+        self.variant = ProductVariant.objects.create(
+            product=product, name='Red', sku='CAP-R', price=Decimal('12.00'), stock=10,
+        )
+        self.url = reverse('order-list')
+
+    def payload(self, quantity=1):
+        return {
+            'billing_first_name': 'A', 'billing_last_name': 'B', 'billing_email': 'a@example.com',
+            'billing_phone': '555', 'billing_address': {'city': 'X'}, 'shipping_first_name': 'A',
+            'shipping_last_name': 'B', 'shipping_address': {'city': 'X'},
+            'items': [{'product_variant': str(self.variant.pk), 'quantity': quantity}],
+        }
+
+    def post(self, key, quantity=1):
+        return self.client.post(self.url, self.payload(quantity), format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_without_writing(self):
+        first = self.post('k-1')
+        self.assertEqual(first.status_code, 201)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.post('k-1')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.content, first.content)
+        self.assertFalse([q for q in queries if not q['sql'].startswith('SELECT')])
+        self.assertEqual(Order.objects.count(), 1)
+        self.variant.refresh_from_db()
+        self.assertEqual(self.variant.stock, 9)
+
+    def test_key_reused_for_another_payload_is_rejected(self):
+        self.post('k-1')
+        self.assertEqual(self.post('k-1', quantity=2).status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_without_key_every_post_runs(self):
+        self.client.post(self.url, self.payload(), format='json')
+        self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post('k-1')
+        other = get_user_model().objects.create_user(username='other', email='other@example.com', password='x')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.post('k-1').status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_validation_errors_are_not_stored(self):
+        self.assertEqual(self.post('k-1', quantity=0).status_code, 400)
+        self.assertEqual(self.post('k-1', quantity=1).status_code, 201)
+
+    def test_duplicate_waits_for_in_flight_result(self):
+        first = self.post('k-1')
+        record_key = idempotency._cache_key('orders', mock.Mock(user=self.user), 'k-2')
+        record = cache.get(idempotency._cache_key('orders', mock.Mock(user=self.user), 'k-1'))
+        cache.add(f'{record_key}:lock', 'someone-else', 30)
+
+        def first_request_finishes(seconds):
+            cache.set(record_key, record)
+
+        with mock.patch.object(idempotency.time, 'sleep', side_effect=first_request_finishes) as sleep:
+            second = self.post('k-2')
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_duplicate_gives_up_with_409(self):
+        record_key = idempotency._cache_key('orders', mock.Mock(user=self.user), 'k-1')
+        cache.add(f'{record_key}:lock', 'someone-else', 30)
+        with mock.patch.object(idempotency, 'WAIT_TIMEOUT', 0):
+            response = self.post('k-1')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,98 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+from products.cache import get_version
+from products.models import Category, Product, ProductVariant
+
+
+class ImportCatalogCommandTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.category = Category.objects.create(name='Audio', slug='audio')
+        Product.objects.create(
+            name='Old Name', slug='headphones', description='d', short_description='s', sku='HP-1', price=99,
+        )
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, **feeds):
+        out = StringIO()
+        call_command('import_catalog', stdout=out, stderr=StringIO(), **feeds)
+        return out.getvalue()
+
+    def test_upserts_products_variants_and_links(self):
+        products = self.write('products.csv', (
+            'sku,name,price,slug,attributes,is_active\n'
+            'HP-1,Headphones,79.50,headphones,"{""brand"": ""acme""}",\n'
+            'SP-1,Speaker,120,,,false\n'
+            ',Missing sku,1,,,\n'
+        ))
+        variants = self.write('variants.jsonl.gz', '\n'.join(json.dumps(v) for v in [
+            {'sku': 'HP-1-B', 'product_sku': 'HP-1', 'name': 'Black', 'price': '79.50'},
+            {'sku': 'HP-1-W', 'product_sku': 'HP-1', 'price': 85, 'attributes': {'color': 'white'}},
+            {'sku': 'XX-1', 'product_sku': 'UNKNOWN', 'price': 1},
+        ]))
+        links = self.write('links.csv', 'product_sku,category_slug\nHP-1,audio\nSP-1,audio\nSP-1,nope\n')
+        version = get_version()
+
+        output = self.run_import(products=products, variants=variants, links=links)
+
+        self.assertIn('products: 2 staged, 2 written, 0 unresolved, 1 rejected', output)
+        self.assertIn('variants: 3 staged, 2 written, 1 unresolved', output)
+        self.assertIn('links: 3 staged, 2 written, 1 unresolved', output)
+        self.assertIn('rows/s', output)
+        headphones = Product.objects.get(sku='HP-1')
+        self.assertEqual((headphones.name, headphones.price, headphones.attributes), ('Headphones', 79.5, {'brand': 'acme'}))
+        self.assertEqual((headphones.min_variant_price, headphones.max_variant_price, headphones.active_variant_count), (79.5, 85, 2))
+        speaker = Product.objects.get(sku='SP-1')
+        self.assertEqual((speaker.slug, speaker.is_active), ('sp-1', False))
+        self.assertEqual(ProductVariant.objects.get(sku='HP-1-W').name, 'HP-1-W')
+        self.assertEqual(set(self.category.products.values_list('sku', flat=True)), {'HP-1', 'SP-1'})
+        self.assertGreater(get_version(), version)
+
+        # Re-running the same feeds changes nothing
+        output = self.run_import(products=products, variants=variants, links=links)
+        self.assertIn('products: 2 staged, 0 written', output)
+        self.assertIn('variants: 3 staged, 0 written', output)
+        self.assertIn('links: 3 staged, 0 written', output)
+
+    def test_last_duplicate_wins_and_bad_feed_rolls_back(self):
+        products = self.write('p.csv', 'sku,name,price\nNEW-1,First,1\nNEW-1,Second,2\n')
+        self.run_import(products=products)
+        self.assertEqual(Product.objects.get(sku='NEW-1').name, 'Second')
+
+        broken = self.write('broken.csv', 'sku,name,price\nNEW-2,Fine,1\nNEW-3,Broken,not-a-number\n')
+        with self.assertRaises(CommandError):
+            self.run_import(products=broken)
+        self.assertFalse(Product.objects.filter(sku='NEW-2').exists())
+
+    def test_moved_variant_refreshes_its_old_product(self):
+        Product.objects.create(name='Case', slug='case', description='d', short_description='s', sku='CS-1', price=5)
+        first = self.write('v1.csv', 'sku,product_sku,price\nV-1,HP-1,10\nV-2,HP-1,20\n')
+        self.run_import(variants=first)
+        moved = self.write('v2.csv', 'sku,product_sku,price\nV-2,CS-1,20\n')
+        self.run_import(variants=moved)
+        headphones, case = Product.objects.get(sku='HP-1'), Product.objects.get(sku='CS-1')
+        self.assertEqual((headphones.min_variant_price, headphones.max_variant_price, headphones.active_variant_count), (10, 10, 1))
+        self.assertEqual((case.min_variant_price, case.max_variant_price, case.active_variant_count), (20, 20, 1))
+
+    def test_non_object_json_lines_are_rejected(self):
+        variants = self.write('v.jsonl', '[1, 2]\n"V-9"\n{"sku": "V-1", "product_sku": "HP-1", "price": 3}\n')
+        err = StringIO()
+        call_command('import_catalog', variants=variants, stdout=StringIO(), stderr=err)
+        self.assertIn('line 1: not an object', err.getvalue())
+        self.assertEqual(list(ProductVariant.objects.values_list('sku', flat=True)), ['V-1'])
@@ -0,0 +1,181 @@
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from notifications.tasks import update_low_stocks_alerts
+from products import inventory
+from products.models import Product, ProductVariant, StockReservation
+from products.serializers import OrderCreateSerializer
+
+
+def make_variants(*stocks):
+    product = Product.objects.create(
+        name='Mug', slug='mug', description='d', short_description='s', sku='MUG', price=Decimal('8.00'),
+    )
+    return [
+        ProductVariant.objects.create(product=product, name=f'V{i}', sku=f'MUG-{i}', price=Decimal('8.00'), stock=stock)
+        for i, stock in enumerate(stocks)
+    ]
+
+
+def stock_of(variant):
+    variant.refresh_from_db(fields=['stock'])
+    return variant.stock
+
+
+class InventoryTests(TestCase):
+    def setUp(self):
+        self.a, self.b = make_variants(10, 2)
+
+    def test_decrement_merges_duplicate_lines(self):
+        inventory.decrement_stock([(self.a.pk, 3), (str(self.a.pk), 2), (self.b.pk, 2)])
+        self.assertEqual((stock_of(self.a), stock_of(self.b)), (5, 0))
+
+    def test_shortage_changes_nothing(self):
+        with self.assertRaises(inventory.OutOfStock) as ctx:
+            inventory.decrement_stock([(self.a.pk, 3), (self.b.pk, 5)])
+        self.assertEqual(ctx.exception.shortages, {self.b.pk: 5})
+        self.assertEqual((stock_of(self.a), stock_of(self.b)), (10, 2))
+
+    def test_non_positive_quantity_is_rejected(self):
+        with self.assertRaises(ValueError):
+            inventory.decrement_stock([(self.a.pk, 0)])
+
+    def test_reserve_holds_stock_until_expiry(self):
+        inventory.reserve('cart-1', [(self.a.pk, 4)])
+        self.assertEqual(stock_of(self.a), 6)
+        self.assertEqual(inventory.release_expired(), 0)
+        self.assertEqual(inventory.release_expired(now=timezone.now() + timedelta(minutes=16)), 4)
+        self.assertEqual(stock_of(self.a), 10)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_failed_reservation_creates_nothing(self):
+        with self.assertRaises(inventory.OutOfStock):
+            inventory.reserve('cart-1', [(self.a.pk, 1), (self.b.pk, 3)])
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(stock_of(self.a), 10)
+
+    def test_commit_consumes_reservations_and_returns_surplus(self):
+        inventory.reserve('cart-1', [(self.a.pk, 4), (self.b.pk, 2)])
+        inventory.commit_order_stock([(self.a.pk, 6), (self.b.pk, 1)], cart_key='cart-1')
+        # a: 4 reserved + 2 more; b: 1 of the 2 reserved goes back
+        self.assertEqual((stock_of(self.a), stock_of(self.b)), (4, 1))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_commit_ignores_expired_reservations(self):
+        StockReservation.objects.create(
+            variant=self.a, cart_key='cart-1', quantity=3, expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        inventory.commit_order_stock([(self.a.pk, 3)], cart_key='cart-1')
+        self.assertEqual(stock_of(self.a), 7)
+        self.assertEqual(StockReservation.objects.count(), 1)  # left for release_expired
+
+    def test_order_creation_reports_shortage(self):
+        user = get_user_model().objects.create_user(username='buyer', email='buyer@example.com', password='x')
+        serializer = OrderCreateSerializer(data={
+            'billing_first_name': 'A', 'billing_last_name': 'B', 'billing_email': 'a@example.com',
+            'billing_phone': '555', 'billing_address': {}, 'shipping_first_name': 'A', 'shipping_last_name': 'B',
+            'shipping_address': {}, 'items': [{'product_variant': str(self.b.pk), 'quantity': 3}],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(ValidationError) as ctx:
+            serializer.save(user=user)
+        self.assertIn('items', ctx.exception.detail)
+        self.assertEqual(stock_of(self.b), 2)
+
+    def test_order_creation_takes_stock(self):
+        user = get_user_model().objects.create_user(username='buyer', email='buyer@example.com', password='x')
+        inventory.reserve('cart-9', [(self.a.pk, 2)])
+        serializer = OrderCreateSerializer(data={
+            'billing_first_name': 'A', 'billing_last_name': 'B', 'billing_email': 'a@example.com',
+            'billing_phone': '555', 'billing_address': {}, 'shipping_first_name': 'A', 'shipping_last_name': 'B',
+            'shipping_address': {}, 'cart_key': 'cart-9',
+            'items': [{'product_variant': str(self.a.pk), 'quantity': 3}],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        order = serializer.save(user=user)
+        self.assertEqual(order.total_amount, Decimal('24.00'))
+        self.assertEqual(stock_of(self.a), 7)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_stale_save_keeps_decremented_stock(self):
+        stale = ProductVariant.objects.get(pk=self.a.pk)
+        inventory.decrement_stock([(self.a.pk, 3)])
+        stale.price = Decimal('9.00')
+        stale.save()
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.stock, self.a.price), (7, Decimal('9.00')))
+
+
+class RestockCommandTests(TestCase):
+    def setUp(self):
+        self.a, self.b = make_variants(0, 4)
+
+    def test_pairs_and_file_add_stock(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('sku,quantity\nMUG-1,6\n')
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('restock', 'MUG-0=10', 'MUG-0=2', '--file', f.name, stdout=out)
+        self.assertEqual((stock_of(self.a), stock_of(self.b)), (12, 10))
+        self.assertIn('Restocked 18 unit(s) across 2 variant(s)', out.getvalue())
+
+    def test_bad_input_changes_nothing(self):
+        for pairs in (['MUG-0=5', 'NOPE=1'], ['MUG-0=-1'], ['MUG-0=lots'], ['MUG-0']):
+            with self.assertRaises(CommandError):
+                call_command('restock', *pairs, stdout=StringIO())
+        self.assertEqual(stock_of(self.a), 0)
+
+
+class LowStockAlertTests(TestCase):
+    def test_alerts_once_and_rearms_after_restock(self):
+        low, ok = make_variants(3, 50)
+        with mock.patch('django.core.mail.mail_admins') as mail_admins, self.assertLogs('notifications.tasks'):
+            self.assertEqual(update_low_stocks_alerts(), 1)
+            self.assertEqual(update_low_stocks_alerts(), 0)
+        self.assertEqual(mail_admins.call_count, 1)
+        low.refresh_from_db()
+        self.assertTrue(low.low_stock_alert_sent)
+        inventory.restock([(low.pk, 10)])
+        self.assertEqual(update_low_stocks_alerts(), 0)
+        low.refresh_from_db()
+        self.assertFalse(low.low_stock_alert_sent)
+
+
+class ConcurrentDecrementTests(TransactionTestCase):
+    def test_no_oversell_under_contention(self):
+        (variant,) = make_variants(25)
+        sold = []
+        lock = threading.Lock()
+        start = threading.Barrier(8)
+
+        def buyer():
+            try:
+                start.wait()
+                for _ in range(10):
+                    try:
+                        inventory.decrement_stock([(variant.pk, 1)])
+                    except inventory.OutOfStock:
+                        continue
+                    with lock:
+                        sold.append(1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buyer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(sold), 25)
+        self.assertEqual(stock_of(variant), 0)
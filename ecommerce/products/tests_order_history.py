@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products import order_numbers
+from products.models import Order, OrderItem, Product, ProductVariant
+
+
+class OrderHistoryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='loyal', email='l@example.com', password='x')
+        cls.other = get_user_model().objects.create_user(username='other', email='o@example.com', password='x')
+        product = Product.objects.create(
+            name='Tea', slug='tea', description='d', short_description='s', sku='TEA', price=Decimal('4.00'),
+        )
+        variants = [
+            ProductVariant.objects.create(product=product, name=f'Blend {i}', sku=f'TEA-{i}', price=Decimal('4.00'))
+            for i in range(3)
+        ]
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        last_ms, order_numbers._state['last_ms'] = order_numbers._state['last_ms'], 0  # allow past timestamps
+        orders = []
+        for i in range(50):
+            owner = (cls.user, cls.other)[i % 2]
+            orders.append(Order(
+                order_number=order_numbers.generate(base + timedelta(hours=i // 4)), user=owner, total_amount=12, billing_first_name='A',
+                billing_last_name='B', billing_email='a@example.com', billing_phone='1', billing_address={},
+                shipping_first_name='A', shipping_last_name='B', shipping_address={},
+            ))
+        order_numbers._state['last_ms'] = last_ms
+        Order.objects.bulk_create(orders)
+        for i, order in enumerate(orders):
+            # Orders share timestamps so the id tiebreaker matters
+            Order.objects.filter(pk=order.pk).update(created_at=base + timedelta(hours=i // 4))
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product_variant=variant, quantity=1, unit_price=4, total_price=4)
+            for order in orders for variant in variants
+        )
+        cls.expected = list(
+            Order.objects.filter(user=cls.user).order_by('-created_at', '-id').values_list('order_number', flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_history_without_gaps_or_repeats(self):
+        url, seen = reverse('order-list'), []
+        while url:
+            with self.assertNumQueries(2):  # orders page + items with variant and product
+                resp = self.client.get(url, {'page_size': 10} if not seen else None)
+            self.assertNotIn('count', resp.data)
+            seen += [order['order_number'] for order in resp.data['results']]
+            url = resp.data['next']
+        self.assertEqual(seen, self.expected)
+
+    def test_items_carry_variant_details(self):
+        first = self.client.get(reverse('order-list')).data['results'][0]
+        self.assertEqual(len(first['items']), 3)
+        self.assertEqual(
+            {(item['sku'], item['product_name']) for item in first['items']},
+            {('TEA-0', 'Tea'), ('TEA-1', 'Tea'), ('TEA-2', 'Tea')},
+        )
+
+    def test_date_bounds_apply_to_history(self):
+        resp = self.client.get(reverse('order-list'), {
+            'placed_from': '2026-01-01T02:00:00Z', 'placed_to': '2026-01-01T04:00:00Z',
+        })
+        self.assertEqual(len(resp.data['results']), 4)  # hours 2 and 3, two of this user's orders each
+
+    def test_anonymous_users_are_rejected(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get(reverse('order-list')).status_code, (401, 403))
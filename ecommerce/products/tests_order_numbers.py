@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products import order_numbers
+from products.models import Order
+
+
+def reset_clock(test):
+    # generate() never goes back in time within a process; these tests use past timestamps
+    last_ms = order_numbers._state['last_ms']
+    order_numbers._state['last_ms'] = 0
+    test.addCleanup(order_numbers._state.__setitem__, 'last_ms', last_ms)
+
+
+class OrderNumberTests(TestCase):
+    def setUp(self):
+        reset_clock(self)
+
+    def test_numbers_are_unique_sortable_and_valid(self):
+        now = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+        numbers = [order_numbers.generate(now + timedelta(milliseconds=i // 3)) for i in range(300)]
+        self.assertEqual(len(set(numbers)), 300)
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertTrue(all(order_numbers.is_valid(number) for number in numbers))
+
+    def test_clock_going_backwards_keeps_order(self):
+        now = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        first = order_numbers.generate(now)
+        second = order_numbers.generate(now - timedelta(seconds=5))
+        self.assertLess(first, second)
+
+    def test_forked_process_takes_a_fresh_block(self):
+        order_numbers.generate()
+        start = order_numbers._state['next']
+        with mock.patch.object(order_numbers.os, 'getpid', return_value=-1):
+            order_numbers.generate()
+        self.assertNotEqual(order_numbers._state['next'], start + 1)
+        self.assertEqual(order_numbers._state['pid'], -1)
+
+
+class OrderLookupTests(APITestCase):
+    def setUp(self):
+        reset_clock(self)
+        self.user = get_user_model().objects.create_user(username='shopper', email='s@example.com', password='x')
+        self.client.force_authenticate(self.user)
+        self.may = datetime(2026, 5, 10, 9, 30, tzinfo=timezone.utc)
+        self.orders = [self.order(self.may + timedelta(days=offset)) for offset in (0, 1, 2)]
+
+    def order(self, placed, user=None):
+        order = Order.objects.create(
+            order_number=order_numbers.generate(placed), user=user or self.user, total_amount=10,
+            billing_first_name='A', billing_last_name='B', billing_email='a@example.com', billing_phone='1',
+            billing_address={}, shipping_first_name='A', shipping_last_name='B', shipping_address={},
+        )
+        Order.objects.filter(pk=order.pk).update(created_at=placed)
+        return order
+
+    def test_retrieve_by_number_is_case_insensitive(self):
+        number = self.orders[1].order_number
+        resp = self.client.get(reverse('order-detail', args=[number.lower()]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['order_number'], number)
+
+    def test_other_users_orders_are_hidden(self):
+        stranger = get_user_model().objects.create_user(username='other', email='o@example.com', password='x')
+        theirs = self.order(self.may, user=stranger)
+        self.assertEqual(self.client.get(reverse('order-detail', args=[theirs.order_number])).status_code, 404)
+
+    def test_date_range_filters_on_placement_time(self):
+        resp = self.client.get(reverse('order-list'), {'placed_from': '2026-05-11', 'placed_to': '2026-05-12T09:00:00Z'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([o['order_number'] for o in resp.data['results']], [self.orders[1].order_number])
+        resp = self.client.get(reverse('order-list'), {'placed_from': '2026-05-10'})
+        self.assertEqual([o['order_number'] for o in resp.data['results']],
+                         [o.order_number for o in reversed(self.orders)])
+
+    def test_date_range_keeps_legacy_numbers(self):
+        legacy = self.order(self.may + timedelta(days=1, hours=2))
+        Order.objects.filter(pk=legacy.pk).update(order_number='9F3A0C1E')
+        resp = self.client.get(reverse('order-list'), {'placed_from': '2026-05-11', 'placed_to': '2026-05-12T09:00:00Z'})
+        self.assertEqual([o['order_number'] for o in resp.data['results']], ['9F3A0C1E', self.orders[1].order_number])
+
+    def test_bad_date_is_rejected(self):
+        resp = self.client.get(reverse('order-list'), {'placed_from': '2026-02-30'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('placed_from', resp.data)
@@ -0,0 +1,86 @@
+from decimal import Decimal
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from products.models import Order, OrderItem, Product, ProductVariant
+from products.serializers import OrderCreateSerializer
+
+
+class OrderCreationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='b2b', email='b2b@example.com', password='x')
+        product = Product.objects.create(
+            name='Bolt', slug='bolt', description='d', short_description='s', sku='BOLT', price=Decimal('1.00'),
+        )
+        cls.variants = ProductVariant.objects.bulk_create(
+            ProductVariant(product=product, name=f'M{i}', sku=f'BOLT-{i}', price=Decimal('1.50') + i, stock=100)
+            for i in range(40)
+        )
+
+    def payload(self, lines):
+        return {
+            'billing_first_name': 'A', 'billing_last_name': 'B',
+            'billing_email': 'a@example.com', 'billing_phone': '555', 'billing_address': {},
+            'shipping_first_name': 'A', 'shipping_last_name': 'B', 'shipping_address': {},
+            'items': [{'product_variant': str(variant_id), 'quantity': quantity} for variant_id, quantity in lines],
+        }
+
+    def place(self, lines):
+        serializer = OrderCreateSerializer(data=self.payload(lines))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save(user=self.user)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        counts = []
+        for variants in (self.variants[:2], self.variants):
+            with CaptureQueriesContext(connection) as queries:
+                self.place([(variant.pk, 1) for variant in variants])
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_lines_are_priced_and_totalled(self):
+        a, b = self.variants[:2]
+        order = self.place([(a.pk, 2), (b.pk, 1), (a.pk, 1)])
+        self.assertEqual(order.total_amount, Decimal('1.50') * 3 + Decimal('2.50'))
+        self.assertEqual(
+            sorted(OrderItem.objects.filter(order=order).values_list('quantity', 'total_price')),
+            [(1, Decimal('1.50')), (1, Decimal('2.50')), (2, Decimal('3.00'))],
+        )
+        a.refresh_from_db()
+        self.assertEqual(a.stock, 97)
+
+    def test_unknown_and_inactive_variants_are_reported_per_line(self):
+        inactive = self.variants[1]
+        ProductVariant.objects.filter(pk=inactive.pk).update(is_active=False)
+        serializer = OrderCreateSerializer(data=self.payload(
+            [(self.variants[0].pk, 1), (uuid.uuid4(), 1), (inactive.pk, 1)]
+        ))
+        self.assertFalse(serializer.is_valid())
+        errors = serializer.errors['items']
+        self.assertEqual(errors[0], {})
+        self.assertIn('product_variant', errors[1])
+        self.assertIn('product_variant', errors[2])
+
+    def test_zero_quantity_is_rejected(self):
+        serializer = OrderCreateSerializer(data=self.payload([(self.variants[0].pk, 0)]))
+        self.assertFalse(serializer.is_valid())
+
+    def test_owner_status_and_amounts_are_set_by_the_server(self):
+        other = get_user_model().objects.create_user(username='other', email='other@example.com', password='x')
+        self.client.force_login(self.user)
+        resp = self.client.post(reverse('order-list'), {
+            **self.payload([(self.variants[0].pk, 2)]), 'user': other.pk, 'status': 'delivered',
+            'total_amount': '1.00', 'tax_amount': '-5.00', 'shipping_amount': '-3.00', 'discount_amount': '9999.00',
+        }, content_type='application/json')
+        self.assertEqual(resp.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(
+            (order.user, order.status, order.total_amount, order.tax_amount, order.shipping_amount,
+             order.discount_amount),
+            (self.user, 'pending', Decimal('3.00'), 0, 0, 0),
+        )
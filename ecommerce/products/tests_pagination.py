@@ -1,3 +1,6 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from products.models import Product, Category
@@ -5,6 +8,7 @@ from products.models import Product, Category
 
 class ProductPaginationTests(APITestCase):
     def setUp(self):
+        cache.clear()
         cat = Category.objects.create(name='Cat', slug='cat')
         # create 30 products
         objs = []
@@ -19,9 +23,9 @@ class ProductPaginationTests(APITestCase):
             )
             objs.append(p)
         Product.objects.bulk_create(objs)
-        # m2m after bulk
-        for p in Product.objects.all():
-            p.categories.add(cat)
+        # m2m after bulk, in one INSERT
+        Through = Product.categories.through
+        Through.objects.bulk_create([Through(product=p, category=cat) for p in objs])
 
     def test_custom_page_size(self):
         url = reverse('product-list') + '?page_size=5'
@@ -35,4 +39,55 @@ class ProductPaginationTests(APITestCase):
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, 200)
         # should cap at 100 (max_page_size)
-        self.assertLessEqual(len(resp.data['results']), 100)
\ No newline at end of file
+        self.assertLessEqual(len(resp.data['results']), 100)
+
+class ProductKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # repeated prices force the id tiebreaker to do its job
+        Product.objects.bulk_create([
+            Product(
+                name=f'Keyset {i}',
+                slug=f'keyset-{i}',
+                description='d',
+                short_description='s',
+                sku=f'KS{i}',
+                price=i % 4,
+            )
+            for i in range(23)
+        ])
+
+    def walk(self, url):
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertNotIn('count', resp.data)
+            self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+            seen.extend(row['id'] for row in resp.data['results'])
+            url = resp.data['next']
+        return seen
+
+    def test_cursor_pages_cover_every_row_once(self):
+        for ordering in ('price', '-price', 'name', '-created_at', 'updated_at'):
+            url = reverse('product-list') + f'?pagination=cursor&page_size=5&ordering={ordering}'
+            seen = self.walk(url)
+            self.assertEqual(len(seen), 23, ordering)
+            self.assertEqual(len(set(seen)), 23, ordering)
+
+    def test_previous_link_returns_prior_page(self):
+        url = reverse('product-list') + '?pagination=cursor&page_size=5&ordering=price'
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([r['id'] for r in back['results']], [r['id'] for r in first['results']])
+
+    def test_tampered_cursor_is_rejected(self):
+        resp = self.client.get(reverse('product-list') + '?cursor=not-a-cursor')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_estimated_count_is_optional(self):
+        url = reverse('product-list') + '?pagination=cursor&estimate=true'
+        resp = self.client.get(url)
+        self.assertIn('estimated_count', resp.data)
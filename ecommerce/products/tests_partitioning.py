@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from products import partitioning
+from products.models import Order, OrderItem, Product, ProductVariant
+from products.serializers import OrderCreateSerializer
+
+
+class OrderPartitioningTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='archivist', email='a@example.com', password='x')
+        product = Product.objects.create(
+            name='Map', slug='map', description='d', short_description='s', sku='MAP', price=Decimal('3.00'),
+        )
+        cls.variant = ProductVariant.objects.create(product=product, name='A1', sku='MAP-A1', price=Decimal('3.00'), stock=50)
+        cls.this_month = partitioning.month_start(datetime.now(timezone.utc))
+        cls.months = [partitioning.add_months(cls.this_month, -ago) for ago in (5, 3, 1)]
+        for i, month in enumerate(cls.months):
+            order = Order.objects.create(
+                order_number=f'LEGACY-{i}', user=cls.user, total_amount=3, billing_first_name='A',
+                billing_last_name='B', billing_email='a@example.com', billing_phone='1', billing_address={},
+                shipping_first_name='A', shipping_last_name='B', shipping_address={},
+            )
+            OrderItem.objects.create(order=order, product_variant=cls.variant, quantity=1, unit_price=3, total_price=3)
+            Order.objects.filter(pk=order.pk).update(created_at=month + timedelta(days=2))
+            OrderItem.objects.filter(order=order).update(created_at=month + timedelta(days=2))
+
+    def setUp(self):
+        # DDL is transactional: the conversion is rolled back with each test
+        self.assertEqual(partitioning.convert(), ['orders', 'order_items'])
+
+    def partitions(self, table):
+        with connection.cursor() as cursor:
+            return [name for name, _ in partitioning.list_partitions(cursor, table)]
+
+    def test_rows_land_in_their_month(self):
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(OrderItem.objects.count(), 3)
+        expected = [partitioning.add_months(self.months[0], offset) for offset in range(9)]  # through 3 months ahead
+        self.assertEqual(
+            self.partitions('orders'),
+            ['orders_default'] + [partitioning.partition_name('orders', month) for month in expected],
+        )
+        with connection.cursor() as cursor:
+            for month in self.months:
+                cursor.execute(f"SELECT count(*) FROM {partitioning.partition_name('order_items', month)}")
+                self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(partitioning.convert(), [])
+
+    def test_orm_keeps_working(self):
+        serializer = OrderCreateSerializer(data={
+            'billing_first_name': 'A', 'billing_last_name': 'B',
+            'billing_email': 'a@example.com', 'billing_phone': '555', 'billing_address': {},
+            'shipping_first_name': 'A', 'shipping_last_name': 'B', 'shipping_address': {},
+            'items': [{'product_variant': str(self.variant.pk), 'quantity': 2}],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        order = serializer.save(user=self.user)
+        order = Order.objects.prefetch_related('items').get(order_number=order.order_number)
+        self.assertEqual([(item.quantity, item.created_at) for item in order.items.all()], [(2, order.created_at)])
+        order.status = 'shipped'
+        order.save()
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'shipped')
+        order.delete()  # Django cascades to the items; there is no database FK any more
+        self.assertFalse(OrderItem.objects.filter(order_id=order.pk).exists())
+        self.assertEqual(Order.objects.count(), 3)
+
+    def test_month_bounded_queries_read_one_partition(self):
+        start = self.months[1]
+        queryset = Order.objects.filter(created_at__gte=start, created_at__lt=partitioning.add_months(start, 1))
+        self.assertEqual(queryset.count(), 1)
+        plan = queryset.explain()
+        self.assertIn(partitioning.partition_name('orders', start), plan)
+        self.assertNotIn(partitioning.partition_name('orders', self.months[0]), plan)
+        self.assertNotIn('orders_default', plan)
+
+    def test_ensure_creates_missing_months_once(self):
+        created = partitioning.ensure_partitions(months_ahead=5)
+        self.assertEqual(created, [
+            partitioning.partition_name(table, partitioning.add_months(self.this_month, offset))
+            for table in ('orders', 'order_items') for offset in (4, 5)
+        ])
+        self.assertEqual(partitioning.ensure_partitions(months_ahead=5), [])
+
+    def test_archive_detaches_old_months(self):
+        archived = partitioning.archive_partitions(keep_months=3)
+        self.assertEqual(sorted(archived), sorted(
+            f"archive.{partitioning.partition_name(table, partitioning.add_months(self.this_month, -ago))}"
+            for table in ('orders', 'order_items') for ago in (3, 4, 5)
+        ))
+        self.assertEqual(list(Order.objects.values_list('order_number', flat=True)), ['LEGACY-2'])
+        self.assertEqual(OrderItem.objects.count(), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT order_number FROM archive.{partitioning.partition_name('orders', self.months[0])}")
+            self.assertEqual(cursor.fetchall(), [('LEGACY-0',)])
+
+    def test_archive_keeps_items_with_their_order(self):
+        boundary = partitioning.add_months(self.this_month, -2)  # first kept month with keep_months=3
+        straddling = []
+        for number, order_at, item_at in (
+            ('EDGE-OLD', boundary - timedelta(seconds=1), boundary + timedelta(seconds=1)),
+            ('EDGE-NEW', boundary + timedelta(seconds=1), boundary - timedelta(seconds=1)),
+        ):
+            order = Order.objects.create(
+                order_number=number, user=self.user, total_amount=3, billing_first_name='A',
+                billing_last_name='B', billing_email='a@example.com', billing_phone='1', billing_address={},
+                shipping_first_name='A', shipping_last_name='B', shipping_address={},
+            )
+            OrderItem.objects.create(order=order, product_variant=self.variant, quantity=1, unit_price=3, total_price=3)
+            Order.objects.filter(pk=order.pk).update(created_at=order_at)
+            OrderItem.objects.filter(order=order).update(created_at=item_at)
+            straddling.append(order)
+        partitioning.archive_partitions(keep_months=3)
+        old, new = straddling
+        self.assertFalse(OrderItem.objects.filter(order=old).exists())
+        self.assertEqual(OrderItem.objects.get(order=new).created_at, boundary + timedelta(seconds=1))
+        with connection.cursor() as cursor:
+            archived_items = partitioning.partition_name('order_items', partitioning.add_months(boundary, -1))
+            cursor.execute(f'SELECT order_id FROM archive.{archived_items}')
+            self.assertIn((old.pk,), cursor.fetchall())
+
+    def test_command_reports_partitions(self):
+        out = StringIO()
+        call_command('partition_orders', 'status', stdout=out)
+        self.assertIn(f"{partitioning.partition_name('orders', self.months[0])}: FOR VALUES", out.getvalue())
+        self.assertIn('rows=1', out.getvalue())
+
+    def test_ensure_moves_rows_out_of_the_default_partition(self):
+        future = partitioning.add_months(self.this_month, 6)
+        order = Order.objects.get(order_number='LEGACY-2')
+        Order.objects.filter(pk=order.pk).update(created_at=future)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM orders_default')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            partitioning.ensure_partitions(months_ahead=6)
+            cursor.execute('SELECT count(*) FROM orders_default')
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute(f"SELECT order_number FROM {partitioning.partition_name('orders', future)}")
+            self.assertEqual(cursor.fetchall(), [('LEGACY-2',)])
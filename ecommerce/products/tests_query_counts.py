@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from payments.models import Payment
+from products.models import Category, Product, ProductVariant
+
+
+class EndpointQueryCountTests(APITestCase):
+    """Query budgets per endpoint; they must not grow with the number of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        root = Category.objects.create(name='Audio', slug='audio')
+        child = Category.objects.create(name='Speakers', slug='speakers', parent=root)
+        Category.objects.create(name='Retired', slug='retired', parent=root, is_active=False)
+        Category.objects.create(name='Portable', slug='portable', parent=child)
+        cls.hidden = Category.objects.create(name='Hidden', slug='hidden', is_active=False)
+        for i in range(6):
+            p = Product.objects.create(
+                name=f'Speaker {i}', slug=f'speaker-{i}', description='d', short_description='s',
+                sku=f'SP-{i}', price=10 + i, attributes={'color': 'black'},
+            )
+            p.categories.add(root, child, cls.hidden)
+            ProductVariant.objects.create(product=p, name='Black', sku=f'SP-{i}-B', price=10 + i)
+            ProductVariant.objects.create(product=p, name='Old', sku=f'SP-{i}-O', price=9, is_active=False)
+        cls.product = p
+        for i in range(4):
+            Payment.objects.create(gateway='stripe', amount=i)
+        cls.user = get_user_model().objects.create_user(
+            'staff', 'staff@example.com', 'pw', first_name='S', last_name='U', is_staff=True,
+        )
+        for i in range(4):
+            get_user_model().objects.create_user(f'u{i}', f'u{i}@example.com', 'pw', first_name='U', last_name=str(i))
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, queries, url, **params):
+        with self.assertNumQueries(queries):
+            resp = self.client.get(url, params)
+            if resp.streaming:
+                b''.join(resp.streaming_content)
+        self.assertEqual(resp.status_code, 200)
+        return resp
+
+    def test_product_list(self):
+        self.get(2, reverse('product-list'))  # COUNT + page
+        self.get(1, reverse('product-list'), pagination='cursor')
+        self.get(2, reverse('product-list'), q='speaker', fields='id,name')
+
+    def test_product_list_expand_uses_one_prefetch_per_relation(self):
+        resp = self.get(4, reverse('product-list'), expand='variants,categories')
+        row = resp.data['results'][0]
+        self.assertEqual([v['name'] for v in row['variants']], ['Black'])
+        self.assertNotIn('hidden', [c['slug'] for c in row['categories']])
+
+    def test_product_detail(self):
+        url = reverse('product-detail', args=[self.product.pk])
+        resp = self.get(4, url)  # validators + product + variants + categories
+        self.assertEqual([v['name'] for v in resp.data['variants']], ['Black'])
+        self.assertEqual({c['slug'] for c in resp.data['categories']}, {'audio', 'speakers'})
+        self.get(2, url, fields='name,price')
+
+    def test_product_side_endpoints(self):
+        self.get(3, reverse('product-facets'))
+        self.get(2, reverse('product-suggest'), q='speak')
+        self.client.force_authenticate(self.user)
+        self.get(3, reverse('product-export'))  # cursor + variants + categories for one chunk
+
+    def test_categories(self):
+        resp = self.get(3, reverse('category-list'))  # COUNT + page + all subtrees
+        audio = next(c for c in resp.data['results'] if c['slug'] == 'audio')
+        self.assertEqual([c['slug'] for c in audio['children']], ['speakers'])
+        self.assertEqual([c['slug'] for c in audio['children'][0]['children']], ['portable'])
+        self.get(2, reverse('category-detail', args=['audio']))
+        self.get(1, reverse('category-tree'))
+
+    def test_payments_and_users(self):
+        self.get(2, reverse('payment-list'))
+        self.client.force_authenticate(self.user)
+        self.get(2, reverse('user-list'))
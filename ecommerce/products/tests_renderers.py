@@ -0,0 +1,59 @@
+import datetime
+import io
+import unittest
+import uuid
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from ecommerce import renderers
+from ecommerce.renderers import FastJSONParser, FastJSONRenderer, MessagePackParser, MessagePackRenderer
+
+
+class FastJSONTests(SimpleTestCase):
+    payload = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'price': Decimal('19.90'),
+        'created_at': datetime.datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc),
+        'local': datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=ZoneInfo('Africa/Lagos')),
+        'day': datetime.date(2025, 1, 2),
+        'name': 'Café   line',
+        'label': gettext_lazy('Pending'),
+        'nested': ReturnDict([('b', [1, 2.5, None, True])], serializer=None),
+        1: 'int key',
+    }
+
+    def test_output_matches_drf_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    @unittest.skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_non_finite_floats_render_as_null(self):
+        # Documented difference: DRF's strict encoder raises instead
+        self.assertEqual(FastJSONRenderer().render({'a': float('nan')}), b'{"a":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'a': float('nan')})
+
+    def test_indented_requests_use_drf_renderer(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, JSONRenderer().render({'a': 1}, 'application/json; indent=2'))
+
+    def test_parser_matches_drf_parser(self):
+        body = b'{"a": [1, 2.5, "x\\u00e9"], "b": null}'
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+
+@unittest.skipIf(renderers.msgpack is None, 'msgpack is not installed')
+class MessagePackTests(SimpleTestCase):
+    def test_round_trip(self):
+        data = {'id': uuid.uuid4(), 'price': Decimal('1.50'), 'items': [1, 'two']}
+        packed = MessagePackRenderer().render(data)
+        parsed = MessagePackParser().parse(io.BytesIO(packed))
+        self.assertEqual(parsed, {'id': str(data['id']), 'price': 1.5, 'items': [1, 'two']})
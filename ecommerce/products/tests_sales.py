@@ -0,0 +1,157 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products import sales
+from products.models import (
+    Category, DailyCategorySales, DailyVariantSales, HourlyCategorySales, HourlyVariantSales, Order, OrderItem,
+    Product, ProductVariant,
+)
+
+
+def placed(hour, minute=0):
+    return datetime(2026, 3, 1, hour, minute, tzinfo=timezone.utc)
+
+
+@override_settings(TIME_ZONE='Africa/Nairobi')  # UTC+3: 21:00 UTC starts the next local day
+class SalesRollupTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='shopper', email='s@example.com', password='x')
+        cls.staff = get_user_model().objects.create_user(
+            username='analyst', email='a@example.com', password='x', is_staff=True,
+        )
+        cls.tea = Category.objects.create(name='Tea', slug='tea')
+        cls.gifts = Category.objects.create(name='Gifts', slug='gifts')
+        cls.green = Product.objects.create(
+            name='Green', slug='green', description='d', short_description='s', sku='GREEN', price=Decimal('4.00'),
+        )
+        cls.black = Product.objects.create(
+            name='Black', slug='black', description='d', short_description='s', sku='BLACK', price=Decimal('5.00'),
+        )
+        cls.green.categories.set([cls.tea, cls.gifts])
+        cls.black.categories.set([cls.tea])
+        cls.green_tin = ProductVariant.objects.create(product=cls.green, name='Tin', sku='GREEN-TIN', price=4)
+        cls.black_tin = ProductVariant.objects.create(product=cls.black, name='Tin', sku='BLACK-TIN', price=5)
+
+    def place(self, at, lines, status='pending'):
+        order = Order.objects.create(
+            order_number=f'SALES-{Order.objects.count()}', user=self.user, status=status, total_amount=0,
+            billing_first_name='A', billing_last_name='B', billing_email='a@example.com', billing_phone='1',
+            billing_address={}, shipping_first_name='A', shipping_last_name='B', shipping_address={},
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product_variant=variant, quantity=quantity, unit_price=variant.price,
+                      total_price=variant.price * quantity)
+            for variant, quantity in lines
+        )
+        # Historic orders: last changed when they were placed
+        Order.objects.filter(pk=order.pk).update(created_at=at, updated_at=at)
+        OrderItem.objects.filter(order=order).update(created_at=at)
+        return order
+
+    def hourly(self, **filters):
+        return sorted(
+            HourlyVariantSales.objects.filter(**filters).values_list('hour', 'variant__sku', 'status', 'lines', 'units', 'revenue')
+        )
+
+    def test_refresh_rolls_up_lines_per_hour_day_and_category(self):
+        self.place(placed(10, 5), [(self.green_tin, 2), (self.black_tin, 1)])
+        self.place(placed(10, 50), [(self.green_tin, 1), (self.green_tin, 3)])
+        self.place(placed(22), [(self.black_tin, 2)])  # 01:00 on 2 March in Nairobi
+        self.assertEqual(sales.refresh(), 2)
+        self.assertEqual(self.hourly(), [
+            (placed(10), 'BLACK-TIN', 'pending', 1, 1, Decimal('5.00')),
+            (placed(10), 'GREEN-TIN', 'pending', 3, 6, Decimal('24.00')),
+            (placed(22), 'BLACK-TIN', 'pending', 1, 2, Decimal('10.00')),
+        ])
+        self.assertEqual(sorted(DailyVariantSales.objects.values_list('day', 'variant__sku', 'units')), [
+            (date(2026, 3, 1), 'BLACK-TIN', 1), (date(2026, 3, 1), 'GREEN-TIN', 6), (date(2026, 3, 2), 'BLACK-TIN', 2),
+        ])
+        self.assertEqual(sorted(HourlyCategorySales.objects.values_list('hour', 'category__slug', 'units')), [
+            (placed(10), 'gifts', 6), (placed(10), 'tea', 7), (placed(22), 'tea', 2),
+        ])
+        self.assertEqual(sorted(DailyCategorySales.objects.values_list('day', 'category__slug', 'revenue')), [
+            (date(2026, 3, 1), 'gifts', Decimal('24.00')), (date(2026, 3, 1), 'tea', Decimal('29.00')),
+            (date(2026, 3, 2), 'tea', Decimal('10.00')),
+        ])
+
+    def test_late_status_change_moves_lines_between_statuses(self):
+        self.place(placed(9), [(self.green_tin, 1)])
+        cancelled = self.place(placed(9, 30), [(self.green_tin, 4)])
+        self.place(placed(15), [(self.black_tin, 1)])
+        sales.refresh()
+        cancelled.refresh_from_db()
+        cancelled.status = 'cancelled'
+        cancelled.save()  # weeks later
+        # The 09:00 bucket, plus 15:00 whose order falls within OVERLAP of the mark
+        self.assertEqual(sales.refresh(), 2)
+        self.assertEqual(self.hourly(variant=self.green_tin), [
+            (placed(9), 'GREEN-TIN', 'cancelled', 1, 4, Decimal('16.00')),
+            (placed(9), 'GREEN-TIN', 'pending', 1, 1, Decimal('4.00')),
+        ])
+        self.assertEqual(
+            sorted(DailyVariantSales.objects.filter(variant=self.green_tin).values_list('status', 'units')),
+            [('cancelled', 4), ('pending', 1)],
+        )
+
+    def test_refresh_is_idempotent(self):
+        self.place(placed(9), [(self.green_tin, 1), (self.black_tin, 2)])
+        sales.refresh()
+        before = self.hourly()
+        sales.refresh()
+        sales.refresh()
+        self.assertEqual(self.hourly(), before)
+        self.assertEqual(DailyVariantSales.objects.count(), 2)
+
+    def test_rebuild_drops_buckets_of_deleted_orders(self):
+        self.place(placed(9), [(self.green_tin, 1)])
+        gone = self.place(placed(11), [(self.black_tin, 1)])
+        sales.refresh()
+        gone.delete()  # does not touch updated_at of any remaining order
+        sales.refresh()
+        self.assertEqual(len(self.hourly()), 2)
+        self.assertEqual(sales.rebuild(since=date(2026, 3, 1)), 1)
+        self.assertEqual(self.hourly(), [(placed(9), 'GREEN-TIN', 'pending', 1, 1, Decimal('4.00'))])
+        self.assertEqual(list(DailyVariantSales.objects.values_list('variant__sku', flat=True)), ['GREEN-TIN'])
+
+    def test_report_endpoints_serve_rollups_to_staff_only(self):
+        self.place(placed(10), [(self.green_tin, 2), (self.black_tin, 1)])
+        self.place(placed(11), [(self.green_tin, 1)], status='delivered')
+        sales.refresh()
+        url = reverse('sales-daily')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_authenticate(self.staff)
+        resp = self.client.get(url, {'from': '2026-03-01', 'to': '2026-03-02', 'group_by': 'product'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            sorted((row['product_name'], row['lines'], row['units'], row['revenue']) for row in resp.data['results']),
+            [('Black', 1, 1, '5.00'), ('Green', 2, 3, '12.00')],
+        )
+        resp = self.client.get(reverse('sales-hourly'), {
+            'from': '2026-03-01T00:00:00Z', 'to': '2026-03-02T00:00:00Z', 'group_by': 'category,status',
+            'status': 'delivered',
+        })
+        self.assertEqual(
+            sorted((row['hour'], row['category_name'], row['status'], row['units']) for row in resp.data['results']),
+            [('2026-03-01T14:00:00+03:00', 'Gifts', 'delivered', 1), ('2026-03-01T14:00:00+03:00', 'Tea', 'delivered', 1)],
+        )
+
+    def test_report_rejects_invalid_parameters(self):
+        self.client.force_authenticate(self.staff)
+        hourly, daily = reverse('sales-hourly'), reverse('sales-daily')
+        for url, params in [
+            (daily, {'group_by': 'variant,category'}),
+            (daily, {'group_by': 'region'}),
+            (daily, {'status': 'lost'}),
+            (daily, {'from': '2026-03-02', 'to': '2026-03-01'}),
+            (hourly, {'from': '2026-01-01', 'to': '2026-03-01'}),
+        ]:
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+        resp = self.client.get(daily)
+        self.assertEqual((resp.data['results'], resp.data['group_by']), ([], ['status']))
+        self.assertEqual(date.fromisoformat(resp.data['end']) - date.fromisoformat(resp.data['start']), timedelta(days=30))
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.models import Product
+
+
+class ProductFullTextSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(
+            name='Wireless Mouse', slug='wireless-mouse', description='Ergonomic pointer',
+            short_description='Mouse', sku='WM-100', price=25,
+        )
+        Product.objects.create(
+            name='USB Hub', slug='usb-hub', description='Pairs well with any wireless keyboard',
+            short_description='Hub', sku='HUB-4', price=15,
+        )
+        Product.objects.create(
+            name='Desk Lamp', slug='desk-lamp', description='Warm light',
+            short_description='Lamp', sku='DL-1', price=30,
+        )
+
+    def search(self, term, **params):
+        params['q'] = term
+        return self.client.get(reverse('product-list'), params)
+
+    def test_prefix_match_ranks_name_above_description(self):
+        resp = self.search('wirel')
+        self.assertEqual(resp.status_code, 200)
+        names = [row['name'] for row in resp.data['results']]
+        self.assertEqual(names, ['Wireless Mouse', 'USB Hub'])
+
+    def test_sku_and_multi_term_queries(self):
+        self.assertEqual([r['name'] for r in self.search('hub-4').data['results']], ['USB Hub'])
+        self.assertEqual([r['name'] for r in self.search('warm lamp').data['results']], ['Desk Lamp'])
+
+    def test_explicit_ordering_overrides_rank(self):
+        resp = self.search('wireless', ordering='price')
+        self.assertEqual([r['name'] for r in resp.data['results']], ['USB Hub', 'Wireless Mouse'])
+
+    def test_operators_in_input_are_ignored(self):
+        resp = self.search("mouse & !'|")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r['name'] for r in resp.data['results']], ['Wireless Mouse'])
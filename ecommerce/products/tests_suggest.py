@@ -0,0 +1,41 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+from products.suggest import prefix_cache
+
+
+class ProductSuggestTests(APITestCase):
+    def setUp(self):
+        prefix_cache.clear()
+        Category.objects.create(name='Keyboards', slug='keyboards')
+        Product.objects.create(
+            name='Mechanical Keyboard', slug='mechanical-keyboard', description='d',
+            short_description='s', sku='KB-MECH-01', price=80,
+        )
+        Product.objects.create(
+            name='Wireless Mouse', slug='wireless-mouse', description='d',
+            short_description='s', sku='WM-100', price=25,
+        )
+
+    def suggest(self, q):
+        resp = self.client.get(reverse('product-suggest'), {'q': q})
+        self.assertEqual(resp.status_code, 200)
+        return resp.data
+
+    def test_partial_and_misspelled_input(self):
+        self.assertEqual([p['name'] for p in self.suggest('mechan')['products']], ['Mechanical Keyboard'])
+        self.assertEqual([p['name'] for p in self.suggest('keybaord')['products']], ['Mechanical Keyboard'])
+        self.assertEqual([c['slug'] for c in self.suggest('keyboa')['categories']], ['keyboards'])
+
+    def test_sku_match_returns_lean_rows(self):
+        rows = self.suggest('wm-100')['products']
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(set(rows[0]), {'id', 'name', 'slug'})
+
+    def test_repeated_prefix_is_served_from_cache(self):
+        self.suggest('wirel')
+        with self.assertNumQueries(0):
+            self.suggest('wirel')
+
+    def test_short_input_returns_nothing(self):
+        self.assertEqual(self.suggest('w'), {'products': [], 'categories': []})
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.models import Category, Product
+from products.serializers import CategorySerializer
+
+
+class CategoryTreeTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.electronics = Category.objects.create(name='Electronics', slug='electronics')
+        self.audio = Category.objects.create(name='Audio', slug='audio', parent=self.electronics)
+        self.headphones = Category.objects.create(name='Headphones', slug='headphones', parent=self.audio)
+        self.home = Category.objects.create(name='Home', slug='home')
+
+    def test_paths_and_depths(self):
+        self.headphones.refresh_from_db()
+        self.assertEqual(self.headphones.depth, 2)
+        self.assertEqual(self.headphones.ancestor_ids, [self.electronics.pk, self.audio.pk])
+        self.assertEqual(
+            set(self.electronics.get_descendants().values_list('slug', flat=True)), {'audio', 'headphones'}
+        )
+
+    def test_move_rewrites_subtree(self):
+        self.audio.parent = self.home
+        self.audio.save()
+        self.headphones.refresh_from_db()
+        self.assertEqual(self.headphones.ancestor_ids, [self.home.pk, self.audio.pk])
+        self.assertEqual(self.headphones.depth, 2)
+        self.audio.parent = None
+        self.audio.save()
+        self.headphones.refresh_from_db()
+        self.assertEqual(self.headphones.depth, 1)
+
+    def test_cannot_move_under_descendant(self):
+        self.electronics.parent = self.headphones
+        with self.assertRaises(ValueError):
+            self.electronics.save()
+
+    def test_tree_endpoint_is_one_query_then_cached(self):
+        url = reverse('category-tree')
+        with self.assertNumQueries(1):
+            tree = self.client.get(url).json()
+        self.assertEqual([n['slug'] for n in tree], ['electronics', 'home'])
+        self.assertEqual(tree[0]['children'][0]['children'][0]['slug'], 'headphones')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_nested_children_load_each_subtree_once(self):
+        for i in range(10):
+            Category.objects.create(name=f'Speaker {i}', slug=f'speaker-{i}', parent=self.audio)
+        with self.assertNumQueries(1):
+            data = CategorySerializer(self.electronics).data
+        self.assertEqual(len(data['children'][0]['children']), 11)
+        with self.assertNumQueries(3):  # count, page, every subtree on the page
+            self.client.get(reverse('category-list'))
+
+    def test_children_follow_the_tree_order(self):
+        for name in ('Mixers', 'Amplifiers', 'Cables'):
+            Category.objects.create(name=name, slug=name.lower(), parent=self.audio)
+        tree_children = self.client.get(reverse('category-tree')).json()[0]['children'][0]['children']
+        detail_children = self.client.get(reverse('category-detail', args=['audio'])).data['children']
+        self.assertEqual([c['slug'] for c in detail_children], ['amplifiers', 'cables', 'headphones', 'mixers'])
+        self.assertEqual([c['slug'] for c in tree_children], [c['slug'] for c in detail_children])
+
+    def test_tree_drops_inactive_subtrees_after_change(self):
+        self.client.get(reverse('category-tree'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.audio.is_active = False
+            self.audio.save()
+        tree = self.client.get(reverse('category-tree')).json()
+        self.assertEqual(tree[0]['children'], [])
+
+
+class CategoryTreeFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        electronics = Category.objects.create(name='Electronics', slug='electronics')
+        audio = Category.objects.create(name='Audio', slug='audio', parent=electronics)
+        garden = Category.objects.create(name='Garden', slug='garden')
+        for sku, cats in (('E-1', [electronics]), ('A-1', [audio]), ('B-1', [electronics, audio]), ('G-1', [garden])):
+            p = Product.objects.create(name=sku, slug=sku.lower(), description='d', short_description='s', sku=sku, price=1)
+            p.categories.add(*cats)
+
+    def skus(self, slug):
+        resp = self.client.get(reverse('product-list'), {'category_tree': slug})
+        return sorted(r['sku'] for r in resp.data['results'])
+
+    def test_subtree_matches_descendants_once(self):
+        self.assertEqual(self.skus('electronics'), ['A-1', 'B-1', 'E-1'])
+        self.assertEqual(self.skus('audio'), ['A-1', 'B-1'])
+        self.assertEqual(self.skus('missing'), [])
+
+    def test_retired_subcategories_are_excluded(self):
+        audio = Category.objects.get(slug='audio')
+        Category.objects.create(name='Earbuds', slug='earbuds', parent=audio)
+        audio.is_active = False
+        audio.save()
+        self.assertEqual(self.skus('electronics'), ['B-1', 'E-1'])
+
+    def test_filter_query_has_no_distinct(self):
+        self.skus('electronics')  # warm the descendant cache
+        url = reverse('product-list') + '?category_tree=electronics&page_size=7'
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertFalse(any('DISTINCT' in q['sql'] for q in ctx.captured_queries))
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from products.models import Product, ProductVariant
+
+
+class VariantStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.mouse = Product.objects.create(name='Mouse', slug='mouse', description='d', sku='M-1', price=20)
+        self.lamp = Product.objects.create(name='Lamp', slug='lamp', description='d', sku='L-1', price=30)
+        self.hub = Product.objects.create(name='Hub', slug='hub', description='d', sku='H-1', price=10)
+        self.red = ProductVariant.objects.create(product=self.mouse, name='Red', sku='M-1-R', price=25)
+        ProductVariant.objects.create(product=self.mouse, name='Blue', sku='M-1-B', price=18)
+        ProductVariant.objects.create(product=self.lamp, name='Warm', sku='L-1-W', price=12)
+        ProductVariant.objects.create(product=self.lamp, name='Old', sku='L-1-O', price=5, is_active=False)
+
+    def stats(self, product):
+        product.refresh_from_db()
+        return product.min_variant_price, product.max_variant_price, product.active_variant_count
+
+    def test_stats_follow_variant_writes(self):
+        self.assertEqual(self.stats(self.mouse), (18, 25, 2))
+        self.assertEqual(self.stats(self.lamp), (12, 12, 1))  # inactive variant ignored
+        self.assertEqual(self.stats(self.hub), (None, None, 0))
+
+        self.red.price = 40
+        self.red.save()
+        self.assertEqual(self.stats(self.mouse), (18, 40, 2))
+        self.red.delete()
+        self.assertEqual(self.stats(self.mouse), (18, 18, 1))
+
+    def test_recompute_command_repairs_drift(self):
+        Product.objects.update(min_variant_price=None, max_variant_price=None, active_variant_count=0)
+        out = StringIO()
+        call_command('recompute_variant_stats', batch_size=2, stdout=out)
+        self.assertIn('3 products', out.getvalue())
+        self.assertEqual(self.stats(self.mouse), (18, 25, 2))
+        self.assertEqual(self.stats(self.lamp), (12, 12, 1))
+
+    def test_filters_and_ordering(self):
+        url = reverse('product-list')
+        resp = self.client.get(url, {'cheapest_variant_max': 15})
+        self.assertEqual([r['name'] for r in resp.data['results']], ['Lamp'])
+        resp = self.client.get(url, {'has_variants': 'false'})
+        self.assertEqual([r['name'] for r in resp.data['results']], ['Hub'])
+        resp = self.client.get(url, {'ordering': 'min_variant_price'})
+        self.assertEqual([r['name'] for r in resp.data['results']], ['Lamp', 'Mouse', 'Hub'])
+
+    def test_keyset_pages_across_null_values(self):
+        url = reverse('product-list')
+        for ordering in ('min_variant_price', '-min_variant_price'):
+            names = []
+            params = {'pagination': 'cursor', 'page_size': 1, 'ordering': ordering}
+            next_url = url
+            while next_url:
+                resp = self.client.get(next_url, params if next_url == url else None)
+                names += [r['name'] for r in resp.data['results']]
+                next_url = resp.data['next']
+            expected = ['Lamp', 'Mouse', 'Hub']
+            self.assertEqual(names, expected if ordering == 'min_variant_price' else expected[::-1])
@@ -0,0 +1,95 @@
+"""Category tree built from the materialized path on ``Category``.
+
+The whole active tree is read in one query ordered by ``(depth, name)`` and
+nested in Python, so parents are always seen before their children. The
+finished document is cached under the ``categories`` generation, which
+``products.signals`` bumps on every category write.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .cache import DEFAULT_TIMEOUT, jittered, versioned_key
+from .models import Category
+
+TREE_NAMESPACE = 'categories'
+TREE_FIELDS = ('id', 'name', 'slug', 'description', 'parent_id', 'depth')
+
+
+def build_tree(rows):
+    """Nest ``rows`` (dicts ordered parents-first) into ``[{..., 'children': [...]}]``.
+
+    Rows whose parent is absent, i.e. below an inactive category, are
+    dropped together with their subtree.
+    """
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = {
+            'id': row['id'],
+            'name': row['name'],
+            'slug': row['slug'],
+            'description': row['description'],
+            'depth': row['depth'],
+            'children': [],
+        }
+        parent_id = row['parent_id']
+        if parent_id is None:
+            roots.append(node)
+        elif parent_id in nodes:
+            nodes[parent_id]['children'].append(node)
+        else:
+            continue
+        nodes[row['id']] = node
+    return roots
+
+
+def get_category_tree():
+    key = versioned_key(TREE_NAMESPACE, 'tree')
+    tree = cache.get(key)
+    if tree is None:
+        rows = Category.objects.filter(is_active=True).order_by('depth', 'name').values(*TREE_FIELDS)
+        tree = build_tree(rows)
+        cache.set(key, tree, jittered(DEFAULT_TIMEOUT))
+    return tree
+
+
+def get_subtree_ids(slug):
+    """Ids of the category ``slug`` and its active descendants (cached per generation).
+
+    Like the tree, an inactive category hides its whole subtree. Returns an
+    empty list for unknown or inactive categories.
+    """
+    key = versioned_key(TREE_NAMESPACE, 'subtree', slug)
+    ids = cache.get(key)
+    if ids is None:
+        ids = []
+        path = Category.objects.filter(slug=slug, is_active=True).values_list('path', flat=True).first()
+        if path:
+            retired = None
+            # Ordered by path, every subtree directly follows its root
+            rows = Category.objects.filter(path__startswith=path).order_by('path')
+            for pk, sub_path, is_active in rows.values_list('id', 'path', 'is_active'):
+                if retired and sub_path.startswith(retired):
+                    continue
+                if not is_active:
+                    retired = sub_path
+                    continue
+                ids.append(pk)
+        cache.set(key, ids, jittered(DEFAULT_TIMEOUT))
+    return ids
+
+
+def children_by_parent(categories):
+    """Map parent id -> active children (by name, as in the tree) for every subtree below ``categories``, in one query."""
+    condition = Q()
+    for category in categories:
+        condition |= Q(path__startswith=category.path)
+    children = defaultdict(list)
+    if not condition:
+        return children
+    rows = Category.objects.filter(condition, is_active=True, parent__isnull=False).order_by('name', 'path')
+    for row in rows:
+        children[row.parent_id].append(row)
+    return children
@@ -0,0 +1,33 @@
+"""Maintenance of the denormalized variant columns on ``Product``.
+
+``min_variant_price``, ``max_variant_price`` and ``active_variant_count``
+summarize a product's *active* variants so "cheapest available variant"
+sorting and filtering needs no join or aggregate at read time. They are
+refreshed per product whenever one of its variants is saved or deleted
+(``products.signals``) and can be rebuilt in bulk with
+``manage.py recompute_variant_stats``.
+"""
+from django.db.models import Count, IntegerField, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def variant_stats_expressions(variant_model):
+    """Correlated subqueries computing the stats for ``OuterRef('pk')``."""
+    active = (
+        variant_model.objects.filter(product=OuterRef('pk'), is_active=True)
+        .order_by()
+        .values('product')
+    )
+    return {
+        'min_variant_price': Subquery(active.annotate(v=Min('price')).values('v')),
+        'max_variant_price': Subquery(active.annotate(v=Max('price')).values('v')),
+        'active_variant_count': Coalesce(
+            Subquery(active.annotate(v=Count('pk')).values('v')), Value(0), output_field=IntegerField()
+        ),
+    }
+
+
+def refresh_variant_stats(products):
+    """Recompute the stats for every product in the ``products`` queryset with one UPDATE."""
+    from .models import ProductVariant
+    return products.update(**variant_stats_expressions(ProductVariant))
@@ -1,29 +1,337 @@
-from rest_framework import viewsets
+from datetime import datetime, time, timedelta
+
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser, IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+from django.utils.timezone import is_aware, make_aware
+from rest_framework.exceptions import ValidationError
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from .models import Product
-from .filters import ProductFilter
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from .serializers import ProductListSerializer, ProductDetailSerializer
+from .models import Category, Order, OrderItem, Product
+from .fieldsets import parse_field_list
+from .filters import ProductFilter, ProductOrderingFilter
+from ecommerce.idempotency import idempotent
+from ecommerce.pagination import KeysetPagination
+from ecommerce.serialization import FastListMixin
+from .serializers import (
+    CategorySerializer, OrderCreateSerializer, OrderHistorySerializer, ProductListSerializer, ProductDetailSerializer,
+    SalesReportSerializer,
+)
+from django.core.cache import cache
+from . import batch as product_batch
+from . import export as catalog_export
+from . import facets as facet_counts
+from . import sales
+from . import suggest as autocomplete
+from .cache import DEFAULT_TIMEOUT, cache_catalog_response, jittered, versioned_key
+from .conditional import catalog_list_etag, product_etag, product_last_modified
+from .tree import children_by_parent, get_category_tree
 
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all().prefetch_related('variants', 'categories')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+class ProductViewSet(FastListMixin, viewsets.ModelViewSet):
+    # columns and prefetches are chosen per request in get_queryset (?fields= / ?expand=)
+    queryset = Product.objects.all()
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, ProductOrderingFilter]
     # exact or field lookups for filtering
     filterset_class = ProductFilter
-    # simple text search
+    # simple text search (?search=); prefer the indexed full-text ?q= filter
     search_fields = ['name', 'slug', 'description', 'short_description', 'sku']
     # ordering support
-    ordering_fields = ['price', 'created_at', 'updated_at', 'name']
+    ordering_fields = [
+        'price', 'created_at', 'updated_at', 'name',
+        'min_variant_price', 'max_variant_price', 'active_variant_count',
+    ]
     ordering = ['-created_at']
+    # opt-in keyset pagination (?pagination=cursor); avoids COUNT(*) and OFFSET
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = getattr(self.request, 'query_params', {})
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
 
     def get_serializer_class(self):
         if self.action == 'list':
             return ProductListSerializer
         return ProductDetailSerializer
 
-    @method_decorator(cache_page(60))  # cache list responses for 60 seconds
+    def get_field_selection(self):
+        """``(fields, expand)`` requested by the client; writes always use the full representation."""
+        if self.request is None or self.request.method not in SAFE_METHODS or self.action == 'batch':
+            return (), ()  # batch caches full representations and narrows them afterwards
+        params = self.request.query_params
+        return parse_field_list(params.get('fields')), parse_field_list(params.get('expand'))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_field_selection()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('update', 'partial_update'):
+            # write responses render the full detail representation
+            _, prefetches = self.get_serializer_class().projection()
+            return queryset.prefetch_related(*prefetches)
+        if self.action not in ('list', 'retrieve', 'batch'):
+            return queryset  # create/destroy/facets/export/suggest render no nested relations
+        columns, prefetches = self.get_serializer_class().projection(*self.get_field_selection())
+        if self.action == 'list':
+            # sort keys must be loaded too, or keyset cursors would fetch them row by row
+            requested = self.request.query_params.get('ordering', '').split(',')
+            for name in [*self.ordering, *requested]:
+                name = name.strip().lstrip('-')
+                if name in self.ordering_fields and name not in columns:
+                    columns.append(name)
+        return queryset.only(*columns).prefetch_related(*prefetches)
+
+    @method_decorator(condition(etag_func=catalog_list_etag))
+    @cache_catalog_response()  # versioned: invalidated by catalog writes, not by TTL
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def facets(self, request):
+        """Category, price-bucket and attribute counts for the current filters (?facet_keys=color,size)."""
+        keys = facet_counts.parse_keys(request.query_params.get('facet_keys'))
+        key = versioned_key('catalog', 'facets', facet_counts.normalize_params(request.query_params, keys))
+        data = cache.get(key)
+        if data is None:
+            data = facet_counts.compute_facets(self.filter_queryset(self.get_queryset()), keys)
+            cache.set(key, data, jittered(DEFAULT_TIMEOUT))
+        return Response(data)
+
+    @action(detail=False, methods=['get'], pagination_class=None, permission_classes=[IsAdminUser])
+    def export(self, request):
+        """Stream every matching product with variants and category slugs (?export_format=ndjson|csv).
+
+        Staff only: the dump includes inactive products. Gzip-compressed on the
+        fly when the client sends ``Accept-Encoding: gzip``.
+        """
+        fmt = request.query_params.get('export_format', 'ndjson')
+        if fmt not in catalog_export.FORMATS:
+            return Response({'detail': f"export_format must be one of {', '.join(catalog_export.FORMATS)}."}, status=400)
+        compress = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = StreamingHttpResponse(
+            catalog_export.export_catalog(self.filter_queryset(self.get_queryset()), fmt, compress=compress),
+            content_type=catalog_export.CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="catalog.{fmt}"'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    # 304s are decided from timestamps alone, before the detail serializer runs
+    @method_decorator(condition(etag_func=product_etag, last_modified_func=product_last_modified))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def batch(self, request):
+        """Detail representations for up to 200 products (?ids=<uuid>,... or ?skus=...), in request order.
+
+        Unknown or malformed values are listed in ``missing``.
+        """
+        param, values, invalid = product_batch.parse_lookup(request.query_params)
+
+        def load(lookup, misses):
+            queryset = self.get_queryset().filter(**{f'{lookup}__in': misses})
+            return self.get_serializer(queryset, many=True).data
+
+        found, missing = product_batch.fetch(param, values, load)
+        fields = parse_field_list(request.query_params.get('fields'))
+        results = []
+        for value in values:
+            if value in found:
+                item = found[value]
+                results.append({k: v for k, v in item.items() if k in fields} if fields else item)
+        return Response({'results': results, 'missing': [*missing, *invalid]})
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def suggest(self, request):
+        """Autocomplete: ?q=<partial or misspelled text>&limit=<n>."""
+        try:
+            limit = min(int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT)), autocomplete.MAX_LIMIT)
+        except ValueError:
+            limit = autocomplete.DEFAULT_LIMIT
+        return Response(autocomplete.suggest(request.query_params.get('q', ''), max(limit, 1)))
+
+
+
+class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Category.objects.filter(is_active=True).order_by('path')
+    serializer_class = CategorySerializer
+    lookup_field = 'slug'
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = {
+        'parent': ['exact', 'isnull'],
+        'depth': ['exact', 'lte'],
+    }
+    search_fields = ['name', 'slug']
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.action in ('list', 'retrieve'):
+            categories = args[0] if kwargs.get('many') else [args[0]]
+            kwargs['context'] = {**self.get_serializer_context(), 'category_children': children_by_parent(categories)}
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def tree(self, request):
+        """Full active category tree (one query, cached until a category changes)."""
+        return Response(get_category_tree())
+
+
+def query_moment(request, param):
+    """Aware datetime from an ISO 8601 date or datetime query parameter (``None`` when absent)."""
+    raw = request.query_params.get(param)
+    if not raw:
+        return None
+    try:
+        moment = parse_datetime(raw)
+        if moment is None and (day := parse_date(raw)):
+            moment = datetime.combine(day, time.min)
+    except ValueError:  # well-formed but impossible, e.g. 2025-02-30
+        moment = None
+    if not moment:
+        raise ValidationError({param: 'Expected an ISO 8601 date or datetime.'})
+    return moment if is_aware(moment) else make_aware(moment)
+
+
+class OrderViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                   viewsets.GenericViewSet):
+    """The authenticated user's orders: history, lookup by order number, creation.
+
+    The history (``list``) is newest first with keyset pagination over
+    ``(created_at, id)``, which the ``(user, -created_at, -id)`` index serves
+    directly, and costs two queries per page however many orders the user
+    has. ``?placed_from=`` / ``?placed_to=`` (ISO date or datetime, ``to``
+    exclusive) bound it by date. Creating is safe to retry with an
+    ``Idempotency-Key`` header.
+    """
+    serializer_class = OrderCreateSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'order_number'
+    lookup_value_regex = '[0-9A-Za-z]+'
+    filter_backends = []
+    pagination_class = KeysetPagination
+    history_order_columns = (
+        'id', 'order_number', 'status', 'total_amount', 'tax_amount', 'shipping_amount', 'discount_amount',
+        'created_at',
+    )
+    history_item_columns = (
+        'id', 'order', 'product_variant', 'quantity', 'unit_price', 'total_price',
+        'product_variant__sku', 'product_variant__name', 'product_variant__product__name',
+    )
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return OrderHistorySerializer
+        return OrderCreateSerializer
+
+    def get_queryset(self):
+        queryset = Order.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            items = (
+                OrderItem.objects.select_related('product_variant__product')
+                .only(*self.history_item_columns).order_by('created_at', 'id')
+            )
+            return queryset.only(*self.history_order_columns).prefetch_related(
+                Prefetch('items', queryset=items),
+            )
+        return queryset.prefetch_related('items')
+
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return queryset
+        start = self._moment('placed_from')
+        end = self._moment('placed_to')
+        # A range on created_at, served by orders_user_created_idx; an order_number
+        # range would drop legacy (pre-sequence) numbers
+        if start:
+            queryset = queryset.filter(created_at__gte=start)
+        if end:
+            queryset = queryset.filter(created_at__lt=end)
+        return queryset.order_by('-created_at', '-id')
+
+    def _moment(self, param):
+        return query_moment(self.request, param)
+
+    def get_object(self):
+        # Crockford base32 is case-insensitive
+        self.kwargs[self.lookup_field] = self.kwargs[self.lookup_field].upper()
+        return super().get_object()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @idempotent('orders')
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+
+class SalesReportViewSet(viewsets.ViewSet):
+    """Sales rollups for dashboards (staff only, read-only).
+
+    ``hourly`` and ``daily`` sum lines, units and revenue per bucket over
+    ``?from=`` / ``?to=`` (``to`` exclusive; defaults: the last 24 hours, the
+    last 30 days), grouped by ``?group_by=`` (any of variant, product,
+    category, status; default status). ``?status=`` restricts the order
+    statuses. Rows come from the rollup tables kept by ``products.sales``, so
+    a response reads a few hundred rows however many orders there are.
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = SalesReportSerializer
+    default_ranges = {'hour': timedelta(hours=24), 'day': timedelta(days=30)}
+    max_ranges = {'hour': timedelta(days=31), 'day': timedelta(days=731)}
+
+    @action(detail=False, methods=['get'])
+    def hourly(self, request):
+        return Response(self.serializer_class(self._report('hour')).data)
+
+    @action(detail=False, methods=['get'])
+    def daily(self, request):
+        return Response(self.serializer_class(self._report('day')).data)
+
+    def _report(self, granularity):
+        params = self.request.query_params
+        group_by = list(dict.fromkeys(part.strip() for part in params.get('group_by', 'status').split(',') if part.strip()))
+        unknown = [grouping for grouping in group_by if grouping not in sales.GROUPINGS]
+        if unknown or not group_by:
+            raise ValidationError({'group_by': f"Expected a comma-separated subset of {', '.join(sales.GROUPINGS)}."})
+        if 'category' in group_by and {'variant', 'product'} & set(group_by):
+            raise ValidationError({'group_by': 'category cannot be combined with variant or product.'})
+        statuses = [part.strip() for part in params.get('status', '').split(',') if part.strip()]
+        valid_statuses = {value for value, _ in Order.STATUS_CHOICES}
+        if set(statuses) - valid_statuses:
+            raise ValidationError({'status': f"Expected a comma-separated subset of {', '.join(sorted(valid_statuses))}."})
+
+        end = query_moment(self.request, 'to')
+        start = query_moment(self.request, 'from')
+        if granularity == 'hour':
+            end = end or timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            start = start or end - self.default_ranges['hour']
+        else:
+            end = timezone.localtime(end).date() if end else timezone.localdate() + timedelta(days=1)
+            start = timezone.localtime(start).date() if start else end - self.default_ranges['day']
+        if start >= end:
+            raise ValidationError({'from': "Must be before 'to'."})
+        if end - start > self.max_ranges[granularity]:
+            raise ValidationError({'from': f"At most {self.max_ranges[granularity].days} days per request."})
+        return {
+            'granularity': granularity, 'start': start.isoformat(), 'end': end.isoformat(), 'group_by': group_by,
+            'results': sales.report(granularity, start, end, group_by, statuses),
+        }
@@ -1,6 +1,11 @@
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer
+from .views_api import UserViewSet
 
 
 class UserModelCompatTests(TestCase):
@@ -26,3 +31,17 @@ class UserSerializerTests(TestCase):
 		user = serializer.save()
 		self.assertEqual(user.username, data['username'])
 		self.assertNotEqual(user.password, data['password'])  # should be hashed
+
+
+class UserFastListTests(APITestCase):
+	def test_output_is_byte_identical(self):
+		User = get_user_model()
+		for i in range(3):
+			User.objects.create_user(f'user{i}', f'u{i}@example.com', 'pw', first_name='F', last_name='L', phone=None if i else '123')
+		self.client.force_authenticate(User.objects.get(username='user0'))
+		url = reverse('user-list') + '?ordering=-email'
+		with mock.patch.object(UserViewSet, 'fast_list_serialization', True):
+			fast = self.client.get(url).content
+		with mock.patch.object(UserViewSet, 'fast_list_serialization', False):
+			slow = self.client.get(url).content
+		self.assertEqual(fast, slow)